@@ -0,0 +1,21 @@
+"""Клиент API распознавания законопроектов.
+
+Пример обработчика:
+
+    import asyncio
+    from legislation_client import LegislationClient, RecognitionWorker
+
+    def recognize(pdf: bytes) -> str:
+        ...  # OCR
+
+    async def main():
+        async with LegislationClient("http://localhost:8000") as client:
+            worker = RecognitionWorker(client, worker_id=1, recognize=recognize, executor="process")
+            await worker.run()
+
+    asyncio.run(main())
+
+Зависимости: legislation_client/requirements.txt
+"""
+from legislation_client.client import LegislationClient, RetryPolicy, Document
+from legislation_client.worker import RecognitionWorker
@@ -0,0 +1,130 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+import asyncio
+import base64
+import logging
+import random
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# Ответы API, после которых запрос имеет смысл повторить
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class RetryPolicy:
+    """Повторы с экспоненциальной задержкой и полным джиттером"""
+    attempts: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        # Полный джиттер разводит обработчиков, получивших отказ одновременно
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+@dataclass
+class Document:
+    id: int
+    pdf: bytes
+
+
+class LegislationClient:
+    """Асинхронный клиент API распознавания с пулом keep-alive соединений"""
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 60.0,
+        max_connections: int = 10,
+        retry: Optional[RetryPolicy] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.retry = retry or RetryPolicy()
+        self.suggested_batch_size: Optional[int] = None
+        self._http = httpx.AsyncClient(
+            base_url=f"{base_url.rstrip('/')}/api/v1",
+            timeout=timeout,
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def __aenter__(self) -> "LegislationClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        for attempt in range(self.retry.attempts):
+            try:
+                response = await self._http.request(method, path, **kwargs)
+
+            except httpx.TransportError as e:
+                if attempt == self.retry.attempts - 1:
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(f"{method} {path} failed ({e!r}), retry in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.retry.attempts - 1:
+                response.raise_for_status()
+                return response
+
+            retry_after = response.headers.get("Retry-After")
+            delay = self.retry.delay(attempt, float(retry_after) if retry_after else None)
+            logger.warning(f"{method} {path} returned {response.status_code}, retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def get_free(self, worker_id: int, limit: int) -> List[Document]:
+        """Забронировать пачку документов на распознавание"""
+        response = await self._request(
+            "GET", "/legislation/free",
+            params={"worker_id": worker_id, "limit": limit}
+        )
+
+        suggested = response.headers.get("X-Suggested-Batch-Size")
+        if suggested:
+            self.suggested_batch_size = int(suggested)
+
+        return [Document(id=item["id"], pdf=base64.b64decode(item["binary"])) for item in response.json()]
+
+    async def update_text(self, worker_id: int, legislation_id: int, text: str) -> str:
+        response = await self._request(
+            "PATCH", "/legislation/update/text",
+            json={"worker_id": worker_id, "id": legislation_id, "text": text}
+        )
+        return response.json()["status"]
+
+    async def update_texts(self, worker_id: int, texts: Dict[int, str]) -> Dict[str, Any]:
+        """Отправить пачку текстов одним запросом"""
+        response = await self._request(
+            "PATCH", "/legislation/update/text/batch",
+            json={"worker_id": worker_id, "items": [{"id": key, "text": text} for key, text in texts.items()]}
+        )
+        return response.json()
+
+    async def get_not_binary(self, limit: int) -> List[Dict[str, Any]]:
+        """Публикационные номера документов, для которых еще не загружен PDF"""
+        response = await self._request("GET", "/legislation/not_binary", params={"limit": limit})
+        return response.json()
+
+    async def update_binary(self, legislation_id: int, pdf: bytes):
+        await self._request(
+            "PATCH", "/legislation/update/binary",
+            json={"id": legislation_id, "binary": base64.b64encode(pdf).decode("utf-8")}
+        )
+
+    async def delete_worker(self, worker_id: int) -> str:
+        """Снять обработчика: его незавершенные брони сразу возвращаются в очередь"""
+        response = await self._request("POST", "/worker/delete", json={"worker_id": worker_id})
+        return response.json()["message"]
@@ -0,0 +1,226 @@
+# Внешние зависимости
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import logging
+import signal
+import time
+import httpx
+# Внутренние модули
+from legislation_client.client import Document, LegislationClient
+
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("thread", "process")
+
+# Сервер недоступен или перегружен: тексты отправляются повторно со следующей пачкой
+TRANSIENT_STATUSES = (429, 502, 503, 504)
+
+
+class RecognitionWorker:
+    """Цикл обработчика: выдача с упреждением, распознавание в пуле, пакетная отправка текстов.
+
+    recognize(pdf: bytes) -> str выполняется в пуле потоков или процессов; для пула процессов
+    функция должна быть объявлена на уровне модуля, чтобы ее можно было передать через pickle.
+    """
+    def __init__(
+        self,
+        client: LegislationClient,
+        worker_id: int,
+        recognize: Callable[[bytes], str],
+        executor: str = "thread",
+        pool_size: int = 4,
+        batch_size: int = 10,
+        prefetch_batches: int = 1,
+        submit_batch_size: int = 20,
+        submit_interval: float = 2.0,
+        idle_delay: float = 10.0,
+        follow_suggested_batch_size: bool = True
+    ):
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {', '.join(EXECUTORS)}, got '{executor}'")
+
+        self.client = client
+        self.worker_id = worker_id
+        self.recognize = recognize
+        self.executor = executor
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.prefetch_batches = prefetch_batches
+        self.submit_batch_size = submit_batch_size
+        self.submit_interval = submit_interval
+        self.idle_delay = idle_delay
+        self.follow_suggested_batch_size = follow_suggested_batch_size
+
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Мягкая остановка: новых пачек не берем, дорабатываем полученные и отправляем результаты"""
+        if not self._stopping.is_set():
+            logger.info(f"Worker {self.worker_id} is stopping")
+            self._stopping.set()
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # Windows: остановка только через stop()
+                pass
+
+    def _next_limit(self) -> int:
+        if self.follow_suggested_batch_size and self.client.suggested_batch_size:
+            return self.client.suggested_batch_size
+        return self.batch_size
+
+    async def _fetch(self, batches: asyncio.Queue):
+        try:
+            while not self._stopping.is_set():
+                documents = await self.client.get_free(worker_id=self.worker_id, limit=self._next_limit())
+
+                if not documents:
+                    # Очередь пуста: ждем, но просыпаемся сразу при остановке
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self.idle_delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                # Очередь ограничена: следующая пачка скачивается, пока обрабатывается текущая
+                await batches.put(documents)
+
+        finally:
+            await batches.put(None)
+
+    async def _recognize_document(self, pool: Executor, document: Document, results: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+
+        try:
+            text = await loop.run_in_executor(pool, self.recognize, document.pdf)
+
+        except Exception as e:
+            # Документ остается в брони обработчика и вернется в очередь после worker/delete при остановке
+            self.failed += 1
+            logger.error(f"Recognition of legislation {document.id} failed: {e!r}")
+            return
+
+        await results.put((document.id, text))
+
+    async def _process(self, pool: Executor, batches: asyncio.Queue, results: asyncio.Queue):
+        try:
+            while True:
+                documents: Optional[List[Document]] = await batches.get()
+                if documents is None:
+                    break
+
+                await asyncio.gather(*(
+                    self._recognize_document(pool=pool, document=document, results=results)
+                    for document in documents
+                ))
+
+        finally:
+            await results.put(None)
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in TRANSIENT_STATUSES
+        return True
+
+    async def _send(self, pending: Dict[int, str]) -> Dict[int, str]:
+        """Отправка пачки текстов; возвращает тексты, которые нужно отправить повторно"""
+        try:
+            result = await self.client.update_texts(worker_id=self.worker_id, texts=pending)
+
+        except Exception as e:
+            if self._is_transient(e):
+                logger.error(f"Submitting {len(pending)} texts failed, will retry: {e!r}")
+                return pending
+
+            if len(pending) == 1:
+                # Повтор отвергнутого текста ничего не изменит: документ вернется в очередь после worker/delete
+                self.rejected += 1
+                logger.error(f"Dropping text of legislation {next(iter(pending))} rejected by the server: {e!r}")
+                return {}
+
+            # Отвергнутый текст ищем делением пачки пополам, остальные тексты отправляются
+            items = list(pending.items())
+            middle = len(items) // 2
+            retry = await self._send(dict(items[:middle]))
+            retry.update(await self._send(dict(items[middle:])))
+            return retry
+
+        self.processed += len(result["applied"])
+        if result["duplicate"] or result["not_found"]:
+            logger.info(
+                f"Texts not applied: duplicate {result['duplicate']}, not found {result['not_found']}"
+            )
+        return {}
+
+    async def _submit(self, results: asyncio.Queue):
+        pending: Dict[int, str] = {}
+        deadline = time.monotonic() + self.submit_interval
+        finished = False
+
+        while not finished:
+            try:
+                item = await asyncio.wait_for(results.get(), timeout=max(deadline - time.monotonic(), 0))
+                if item is None:
+                    finished = True
+                else:
+                    pending[item[0]] = item[1]
+
+            except asyncio.TimeoutError:
+                pass
+
+            flush_due = len(pending) >= self.submit_batch_size or time.monotonic() >= deadline or finished
+            if pending and flush_due:
+                # При недоступности сервера тексты остаются в очереди отправки до следующей попытки
+                pending = await self._send(pending)
+
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.submit_interval
+
+        if pending:
+            logger.error(f"Dropping {len(pending)} unsent texts, documents return to the queue")
+
+    async def run(self, handle_signals: bool = True):
+        """Работать до stop() (или SIGINT/SIGTERM), затем снять обработчика с сервера"""
+        if handle_signals:
+            self._install_signal_handlers()
+
+        pool_class = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+        pool = pool_class(max_workers=self.pool_size)
+
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch_batches)
+        results: asyncio.Queue = asyncio.Queue()
+
+        tasks = [
+            asyncio.create_task(self._fetch(batches)),
+            asyncio.create_task(self._process(pool=pool, batches=batches, results=results)),
+            asyncio.create_task(self._submit(results))
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+            # Брони, которые не удалось завершить, сразу возвращаются в очередь
+            try:
+                await self.client.delete_worker(worker_id=self.worker_id)
+            except Exception as e:
+                logger.error(f"Removing worker {self.worker_id} failed: {e!r}")
+
+            logger.info(
+                f"Worker {self.worker_id} stopped: processed {self.processed}, failed {self.failed}, "
+                f"rejected {self.rejected}"
+            )
@@ -0,0 +1,41 @@
+# Внешние зависимости
+from typing import Any, Awaitable, Callable
+import asyncio
+import os
+import tempfile
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# config читается при импорте web_app. Тесты с базой работают только с отдельной TEST_DATABASE_URL
+# (схема мигрируется, таблицы очищаются), поэтому DATABASE_URL окружения не используется никогда
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://localhost/unused"
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="legislation-tests-"))
+
+
+@pytest.fixture
+def run_with_database() -> Callable[[Callable[[AsyncEngine], Awaitable[Any]]], Any]:
+    """Выполнить scenario(engine) в своем event loop на пустой базе последней версии схемы"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from web_app.src.core import init_database, setup_database, close_database, get_engine
+
+    def run(scenario: Callable[[AsyncEngine], Awaitable[Any]]) -> Any:
+        async def main():
+            await init_database()
+            try:
+                await setup_database()
+                async with get_engine().begin() as conn:
+                    await conn.execute(sa.text("TRUNCATE data_legislation, authorities RESTART IDENTITY CASCADE"))
+
+                return await scenario(get_engine())
+
+            finally:
+                await close_database()
+
+        return asyncio.run(main())
+
+    return run
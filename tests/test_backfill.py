@@ -0,0 +1,33 @@
+# Внешние зависимости
+import pytest
+# Внутренние модули
+from web_app.src.utils.backfill import LAW_NUMBER_HEADER_CHARS, extract_law_number
+
+
+@pytest.mark.parametrize("text, law_number", [
+    ("Федеральный закон от 29.12.2012 № 273-ФЗ «Об образовании»", "273-ФЗ"),
+    ("Федеральный конституционный закон N 45-ФКЗ", "45-ФКЗ"),
+    ("Распоряжение от 01.02.2024 №1234-р", "1234-р"),
+    ("Закон № 123 - ФЗ", "123-ФЗ"),
+    ("Закон № 123 – ФЗ", "123-ФЗ"),
+    ("Приказ № 56‑н", "56-н"),
+    ("Постановление № 512", "512")
+])
+def test_extract_law_number(text, law_number):
+    assert extract_law_number(text) == law_number
+
+
+@pytest.mark.parametrize("text, law_number", [
+    # Дефис в начале следующей строки - пункт списка, а не часть номера
+    ("Распоряжение N 45\n- р утвердить план", "45"),
+    ("Распоряжение № 1234-р\n\n-ФЗ в редакции", "1234-р"),
+    ("Закон № 77\r\n– о внесении изменений", "77")
+])
+def test_law_number_does_not_cross_line_breaks(text, law_number):
+    assert extract_law_number(text) == law_number
+
+
+def test_law_number_outside_header_or_missing():
+    assert extract_law_number("Без номера") is None
+    assert extract_law_number(" " * LAW_NUMBER_HEADER_CHARS + "№ 5-ФЗ") is None
+    assert extract_law_number("Предписание ABCN 12") is None
@@ -0,0 +1,131 @@
+# Внешние зависимости
+from typing import Iterator, List, Set
+from contextlib import contextmanager
+from datetime import datetime
+from uuid import uuid4
+import re
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+# Внутренние модули
+from web_app.src.crud import (sql_update_text, sql_update_texts, sql_update_binary, sql_update_binaries,
+                              sql_update_priority, sql_update_authority_weight, sql_valid_legislation_ids_from_worker,
+                              sql_delete_ready_legislation)
+from web_app.src.models import Authority, DataLegislation, QUEUE_CONDITION
+
+
+# Колонки с документами: пути записи не должны читать их обратно
+BLOB_COLUMNS = ("binary_pdf", "text")
+
+
+def loaded_blob_columns(statement: str) -> Set[str]:
+    """Колонки-блобы в списках SELECT и RETURNING; условия WHERE на них допустимы"""
+    segments = re.findall(r"\bSELECT\b(.*?)\bFROM\b", statement, flags=re.S)
+    segments += re.findall(r"\bRETURNING\b(.*)$", statement, flags=re.S)
+    return {column for segment in segments for column in BLOB_COLUMNS if re.search(rf"\b{column}\b", segment)}
+
+
+def compile_statement(statement: sa.Executable) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@contextmanager
+def capture_statements(engine: AsyncEngine) -> Iterator[List[str]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa.event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def seed(engine: AsyncEngine) -> List[int]:
+    """Документы: в очереди, готовый к выгрузке, без PDF"""
+    async with engine.begin() as conn:
+        authority_id = await conn.scalar(
+            sa.insert(Authority).values(name="Authority", uuid_authority=uuid4()).returning(Authority.id)
+        )
+        result = await conn.execute(
+            sa.insert(DataLegislation).returning(DataLegislation.id),
+            [
+                {
+                    "name": f"Legislation {number}",
+                    "publication_number": f"000{number}",
+                    "publication_date": datetime(2024, 1, number),
+                    "link_pdf": f"https://example.org/{number}.pdf",
+                    "binary_pdf": binary_pdf,
+                    "text": text,
+                    "authority_id": authority_id
+                }
+                for number, (binary_pdf, text) in enumerate(
+                    [(b"%PDF-queued", None), (b"%PDF-ready", "ready text"), (None, None)],
+                    start=1
+                )
+            ]
+        )
+        return [authority_id] + list(result.scalars().all())
+
+
+def test_checker_flags_blob_columns():
+    assert loaded_blob_columns(compile_statement(sa.select(DataLegislation.binary_pdf))) == {"binary_pdf"}
+    assert loaded_blob_columns(compile_statement(
+        sa.select(DataLegislation).options(sa.orm.undefer(DataLegislation.text))
+    )) == {"text"}
+    assert loaded_blob_columns(compile_statement(
+        sa.update(DataLegislation).values(text="x").returning(DataLegislation.id, DataLegislation.text)
+    )) == {"text"}
+
+    # Сущность без явного undefer и условия по блобам документы не читают
+    assert loaded_blob_columns(compile_statement(sa.select(DataLegislation))) == set()
+    assert loaded_blob_columns(compile_statement(sa.select(DataLegislation.id).where(QUEUE_CONDITION))) == set()
+
+
+def test_write_paths_do_not_load_blobs(run_with_database):
+    async def scenario(engine: AsyncEngine) -> List[str]:
+        authority_id, queued_id, ready_id, empty_id = await seed(engine)
+
+        with capture_statements(engine) as statements:
+            assert await sql_valid_legislation_ids_from_worker(worker_legislation_ids=[queued_id, ready_id]) == [
+                queued_id
+            ]
+            assert await sql_update_text(legislation_id=queued_id, content="recognized") is True
+            assert await sql_update_text(legislation_id=queued_id, content="duplicate") is False
+            assert await sql_update_texts(texts={ready_id: "duplicate", 10 ** 6: "missing"}) == ([], [10 ** 6])
+            await sql_update_binary(legislation_id=empty_id, content=b"%PDF-uploaded")
+            assert await sql_update_binaries(binaries={empty_id: b"%PDF-spooled"}) == [empty_id]
+            assert await sql_update_priority(legislation_ids=[queued_id, empty_id], priority=5) == 2
+            await sql_update_authority_weight(authority_id=authority_id, priority_weight=3)
+            assert await sql_delete_ready_legislation(legislation_ids=[queued_id, ready_id]) == 2
+
+        return statements
+
+    statements = run_with_database(scenario)
+
+    assert statements
+    offending = {statement: columns for statement in statements if (columns := loaded_blob_columns(statement))}
+    assert not offending, f"Write paths load document columns: {offending}"
+
+
+def test_entity_load_defers_blobs(run_with_database):
+    async def scenario(engine: AsyncEngine):
+        _, queued_id, _, _ = await seed(engine)
+
+        async with AsyncSession(engine) as session:
+            with capture_statements(engine) as statements:
+                legislation = await session.get(DataLegislation, queued_id)
+
+            # Обращение к отложенной колонке без явного select падает, а не грузит документ
+            with pytest.raises(sa.exc.InvalidRequestError):
+                _ = legislation.binary_pdf
+
+        return statements
+
+    statements = run_with_database(scenario)
+
+    assert len(statements) == 1
+    assert loaded_blob_columns(statements[0]) == set()
@@ -0,0 +1,179 @@
+# Внешние зависимости
+from contextlib import ExitStack
+from unittest import mock
+import asyncio
+import importlib
+import json
+import random
+import httpx
+import pytest
+from fastapi import Response
+# Внутренние модули
+from legislation_client import LegislationClient, RecognitionWorker, RetryPolicy
+from web_app.src.schemas import SchemeTextLegislation, SchemeTextBatchLegislation, RemoveWorkerRequest
+from web_app.src.utils.pipeline import Pipeline
+from web_app.simulation.fakes import FakeDatabase, FakeRedis, Latency
+from web_app.simulation.reservation import ReservationSimulation
+
+
+api_router = importlib.import_module("web_app.src.routers.api_router")
+redis_service_module = importlib.import_module("web_app.src.utils.redis_service")
+
+CLIENT_IP = "10.0.0.1"
+
+
+class FakeServer:
+    """Настоящие обработчики маршрутов поверх Redis и БД в памяти, доступные клиенту через httpx"""
+    def __init__(self, stack: ExitStack, documents: int):
+        self.redis = FakeRedis(loop=asyncio.get_running_loop(), latency=Latency(rng=random.Random(1), mean=0))
+        self.database = FakeDatabase(latency=Latency(rng=random.Random(2), mean=0), documents=documents)
+        self.service = redis_service_module.RedisService()
+        self.service.redis = self.redis
+        self.endpoints = {
+            "claim": ReservationSimulation._endpoint("/legislation/free", "GET"),
+            "submit": ReservationSimulation._endpoint("/legislation/update/text", "PATCH"),
+            "submit_batch": ReservationSimulation._endpoint("/legislation/update/text/batch", "PATCH"),
+            "delete": ReservationSimulation._endpoint("/worker/delete", "POST")
+        }
+
+        stack.enter_context(mock.patch.object(api_router, "redis_service", self.service))
+        stack.enter_context(mock.patch.object(api_router, "pipeline", Pipeline(stages={})))
+        stack.enter_context(mock.patch.object(
+            api_router,
+            "sql_get_free_legislation",
+            self.database.get_free_legislation
+        ))
+        stack.enter_context(mock.patch.object(
+            api_router,
+            "sql_get_queued_legislation",
+            self.database.get_queued_legislation
+        ))
+        stack.enter_context(mock.patch.object(api_router, "sql_update_text", self.database.update_text))
+        stack.enter_context(mock.patch.object(api_router, "sql_update_texts", self.database.update_texts))
+        stack.enter_context(mock.patch.object(
+            redis_service_module,
+            "sql_valid_legislation_ids_from_worker",
+            self.database.valid_legislation_ids_from_worker
+        ))
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/api/v1")
+
+        if path == "/legislation/free":
+            response = Response()
+            result = await self.endpoints["claim"](
+                worker_id=int(request.url.params["worker_id"]),
+                response=response,
+                limit=int(request.url.params["limit"]),
+                client_ip=CLIENT_IP
+            )
+            body = b"".join([chunk async for chunk in result.body_iterator])
+            return httpx.Response(200, content=body, headers={"X-Suggested-Batch-Size": "0"})
+
+        body = json.loads(request.content)
+        if path == "/legislation/update/text":
+            result = await self.endpoints["submit"](data=SchemeTextLegislation(**body), client_ip=CLIENT_IP)
+        elif path == "/legislation/update/text/batch":
+            result = await self.endpoints["submit_batch"](data=SchemeTextBatchLegislation(**body), client_ip=CLIENT_IP)
+        elif path == "/worker/delete":
+            result = await self.endpoints["delete"](data=RemoveWorkerRequest(**body), client_ip=CLIENT_IP)
+        else:
+            return httpx.Response(404)
+
+        return httpx.Response(200, json=result)
+
+    async def reserved_ids(self) -> list:
+        return await self.service.get_legislation_ids()
+
+
+async def make_client(server: FakeServer) -> LegislationClient:
+    client = LegislationClient("http://testserver", retry=RetryPolicy(attempts=2, base_delay=0.01))
+    await client.close()
+    client._http = httpx.AsyncClient(base_url="http://testserver/api/v1", transport=httpx.MockTransport(server.handle))
+    return client
+
+
+async def run_worker(worker: RecognitionWorker, database: FakeDatabase, texts: int):
+    task = asyncio.create_task(worker.run(handle_signals=False))
+    while len(database.texts) < texts:
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await task
+
+
+def test_failed_document_from_prefetched_batch_returns_to_queue():
+    async def scenario():
+        with ExitStack() as stack:
+            server = FakeServer(stack=stack, documents=6)
+            client = await make_client(server)
+            unreadable = server.database.binaries[6]
+
+            def recognize(pdf: bytes) -> str:
+                # Первая выданная пачка (6, 5): документ 6 не распознается
+                if pdf == unreadable:
+                    raise ValueError("unreadable PDF")
+                return pdf.decode()
+
+            worker = RecognitionWorker(
+                client,
+                worker_id=1,
+                recognize=recognize,
+                batch_size=2,
+                prefetch_batches=2,
+                submit_interval=0.05,
+                idle_delay=0.05,
+                follow_suggested_batch_size=False
+            )
+            await asyncio.wait_for(run_worker(worker, database=server.database, texts=5), timeout=10)
+            await client.close()
+
+            assert worker.failed == 1
+            # worker/delete вернул документ из ранней пачки, хотя после нее были выданы еще две
+            reserved_ids = await server.reserved_ids()
+            assert 6 not in reserved_ids
+            free = await server.database.get_free_legislation(reservation_legislation_ids=reserved_ids, limit=10)
+            assert [legislation.id for legislation in free] == [6]
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("status_code", [422, 500])
+def test_rejected_text_does_not_block_other_submissions(status_code):
+    async def scenario():
+        with ExitStack() as stack:
+            server = FakeServer(stack=stack, documents=6)
+            handle = server.handle
+
+            async def reject_nul(request: httpx.Request) -> httpx.Response:
+                # Postgres не принимает NUL в text: пачка с таким текстом отвергается целиком
+                if b"\\u0000" in request.content:
+                    return httpx.Response(status_code)
+                return await handle(request)
+
+            server.handle = reject_nul
+            client = await make_client(server)
+
+            def recognize(pdf: bytes) -> str:
+                text = pdf.decode()
+                return f"{text}\x00" if text.endswith("-4") else text
+
+            worker = RecognitionWorker(
+                client,
+                worker_id=1,
+                recognize=recognize,
+                batch_size=2,
+                submit_batch_size=4,
+                submit_interval=0.05,
+                idle_delay=0.05,
+                follow_suggested_batch_size=False
+            )
+            await asyncio.wait_for(run_worker(worker, database=server.database, texts=5), timeout=10)
+            await client.close()
+
+            assert worker.rejected == 1
+            assert worker.processed == 5
+            assert sorted(server.database.texts) == [1, 2, 3, 5, 6]
+            # Документ с отвергнутым текстом освобожден при снятии обработчика
+            assert 4 not in await server.reserved_ids()
+
+    asyncio.run(scenario())
@@ -0,0 +1,44 @@
+# Внешние зависимости
+import json
+import logging
+import pytest
+# Внутренние модули
+from web_app.src.core.config import Config
+
+
+STAGE = {"input": "text", "output": "law_number"}
+
+
+def make_config(monkeypatch, stages: dict) -> Config:
+    monkeypatch.setenv("PIPELINE_STAGES", json.dumps(stages))
+    return Config()
+
+
+def test_valid_pipeline_stages(monkeypatch):
+    stages = {"law_number": STAGE, "check": {"input": "text", "requires": ["law_number"], "concurrency": 2}}
+    assert make_config(monkeypatch, stages).PIPELINE_STAGES["check"]["concurrency"] == 2
+
+
+@pytest.mark.parametrize("stage", [
+    {**STAGE, "lease_seconds": "600"},
+    {**STAGE, "max_attempts": 2.5},
+    {**STAGE, "concurrency": True},
+    {**STAGE, "retry_delay_seconds": None},
+    {**STAGE, "requires": "other"}
+])
+def test_non_numeric_stage_values_are_rejected(monkeypatch, caplog, stage):
+    with caplog.at_level(logging.CRITICAL), pytest.raises(ValueError, match="PIPELINE_STAGES is invalid"):
+        make_config(monkeypatch, {"stage": stage, "other": STAGE})
+    assert "Pipeline stage 'stage'" in caplog.text
+
+
+def test_cyclic_requires_are_rejected(monkeypatch, caplog):
+    stages = {
+        "first": {**STAGE, "requires": ["third"]},
+        "second": {**STAGE, "requires": ["first"]},
+        "third": {**STAGE, "requires": ["second"]},
+        "independent": STAGE
+    }
+    with caplog.at_level(logging.CRITICAL), pytest.raises(ValueError, match="PIPELINE_STAGES is invalid"):
+        make_config(monkeypatch, stages)
+    assert "first -> third -> second -> first" in caplog.text
@@ -0,0 +1,48 @@
+# Внешние зависимости
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import importlib
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.models import Authority, DataLegislation
+
+
+api_router = importlib.import_module("web_app.src.routers.api_router")
+
+
+async def seed_exported_text(engine: AsyncEngine, text_updated_at: datetime):
+    async with engine.begin() as conn:
+        authority_id = await conn.scalar(
+            sa.insert(Authority).values(name="Authority", uuid_authority=uuid4()).returning(Authority.id)
+        )
+        await conn.execute(sa.insert(DataLegislation).values(
+            name="Legislation",
+            publication_number="0001",
+            publication_date=datetime(2026, 1, 1),
+            link_pdf="https://example.org/1.pdf",
+            binary_pdf=b"%PDF",
+            text="text",
+            text_updated_at=text_updated_at,
+            authority_id=authority_id
+        ))
+
+
+@pytest.mark.parametrize("since, rows", [
+    (datetime(2026, 1, 1, tzinfo=timezone.utc), "1"),
+    (datetime(2026, 1, 1, 3, tzinfo=timezone(timedelta(hours=3))), "1"),
+    (datetime(2100, 1, 1, tzinfo=timezone.utc), "0")
+])
+def test_export_accepts_since_with_timezone(run_with_database, monkeypatch, tmp_path, since, rows):
+    monkeypatch.setattr(config, "_export_dir", str(tmp_path))
+
+    async def scenario(engine: AsyncEngine):
+        await seed_exported_text(engine, text_updated_at=datetime(2026, 1, 1, 12))
+        return await api_router.export_legislation_parquet(since=since)
+
+    response = run_with_database(scenario)
+
+    assert response.headers["X-Export-Rows"] == rows
+    assert datetime.fromisoformat(response.headers["X-Export-Watermark"]).tzinfo is None
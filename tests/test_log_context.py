@@ -0,0 +1,35 @@
+# Внешние зависимости
+import logging
+from starlette.requests import Request
+# Внутренние модули
+from web_app import app
+from web_app.src.core.logger import SamplingFilter
+from web_app.src.middlewares.log_context import route_template
+
+
+def make_request(method: str, path: str) -> Request:
+    return Request({"type": "http", "method": method, "path": path, "app": app, "query_string": b"", "headers": []})
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+def test_route_template_groups_path_parameters():
+    assert route_template(make_request("GET", "/api/v1/pipeline/ocr/claim")) == "/api/v1/pipeline/{stage}/claim"
+    assert route_template(make_request("GET", "/api/v1/pipeline/law_number/claim")) == "/api/v1/pipeline/{stage}/claim"
+    assert route_template(make_request("GET", "/api/v1/no/such/route")) is None
+
+
+def test_sampling_limits_per_message_type():
+    sampling = SamplingFilter(limit=2, window=60, limits={"Hedged": 1, "Hedged # straggling": 3, "Worker": 0})
+
+    def emitted(message: str, count: int) -> int:
+        return sum(sampling.filter(make_record(message)) for _ in range(count))
+
+    # Самый длинный подходящий префикс
+    assert emitted("Hedged 5 straggling legislation", 10) == 3
+    assert emitted("Hedged legislation", 10) == 1
+    # Предел 0 - без выборки, остальные типы - общий limit
+    assert emitted("Worker 10.0.0.1 deleted successfully", 10) == 10
+    assert emitted("Failed to obtain lock", 10) == 2
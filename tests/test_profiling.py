@@ -0,0 +1,32 @@
+# Внешние зависимости
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.dependencies import profiling_token
+from web_app.src.middlewares.profiling import ProfilingMiddleware
+
+
+def make_request(token: bytes) -> Request:
+    # Заголовки приходят байтами и декодируются как latin-1
+    return Request({"type": "http", "headers": [(b"x-profile", b"1"), (b"x-profile-token", token)]})
+
+
+@pytest.fixture(autouse=True)
+def profiling_settings(monkeypatch):
+    monkeypatch.setattr(config, "_profiling_token", "secret")
+    monkeypatch.setattr(config, "_profiling_sample_rate", 0)
+
+
+@pytest.mark.parametrize("token", [b"wrong", "секрет".encode(), "secret\xa7".encode("latin-1")])
+def test_wrong_profiling_token_is_not_found(token):
+    with pytest.raises(HTTPException) as error:
+        profiling_token(make_request(token))
+    assert error.value.status_code == 404
+    assert not ProfilingMiddleware._should_profile(make_request(token))
+
+
+def test_profiling_token_matches():
+    profiling_token(make_request(b"secret"))
+    assert ProfilingMiddleware._should_profile(make_request(b"secret"))
@@ -0,0 +1,68 @@
+# Внешние зависимости
+from typing import List
+import asyncio
+import importlib
+import random
+import pytest
+# Внутренние модули
+from web_app.src.utils.hedging import decode_reservation
+from web_app.simulation.fakes import FakeRedis, Latency
+
+
+redis_service_module = importlib.import_module("web_app.src.utils.redis_service")
+
+OWNER = ("10.0.0.1", 1)
+HEDGE_HOLDER = ("10.0.0.2", 2)
+
+
+async def all_queued(worker_legislation_ids: List[int]) -> List[int]:
+    return worker_legislation_ids
+
+
+async def make_service(monkeypatch) -> "redis_service_module.RedisService":
+    monkeypatch.setattr(redis_service_module, "sql_valid_legislation_ids_from_worker", all_queued)
+    service = redis_service_module.RedisService()
+    service.redis = FakeRedis(loop=asyncio.get_running_loop(), latency=Latency(rng=random.Random(1), mean=0))
+
+    # Документ 7 выдан OWNER, затем переиздан HEDGE_HOLDER; документ 8 есть только у OWNER
+    await service.ping_worker(*OWNER, processed_data=0, legislation_ids=[7, 8])
+    await service.mark_hedged(*HEDGE_HOLDER, legislation_ids=[7])
+    await service.ping_worker(*HEDGE_HOLDER, processed_data=0, legislation_ids=[7])
+    return service
+
+
+@pytest.mark.parametrize("deleted, remaining", [(OWNER, HEDGE_HOLDER), (HEDGE_HOLDER, OWNER)])
+def test_hedged_legislation_stays_reserved_while_other_holder_is_alive(monkeypatch, deleted, remaining):
+    async def scenario():
+        service = await make_service(monkeypatch)
+
+        await service.delete_worker(*deleted)
+
+        # Документ 7 не выдается третьему обработчику, пока его держит оставшийся
+        reserved_ids = await service.get_legislation_ids()
+        assert 7 in reserved_ids
+        assert (8 in reserved_ids) == (deleted != OWNER)
+        assert await service.redis.hget(service.hedged_legislation_key, "7") is None
+
+        reservation = await service.redis.hget(service.reservation_times_key, "7")
+        assert decode_reservation(reservation)[1] == service.worker_key(*remaining)
+
+        # Снятие оставшегося держателя освобождает документ
+        await service.delete_worker(*remaining)
+        assert await service.get_legislation_ids() == []
+        assert await service.redis.hlen(service.reservation_times_key) == 0
+
+    asyncio.run(scenario())
+
+
+def test_hedged_legislation_is_released_when_other_holder_is_gone(monkeypatch):
+    async def scenario():
+        service = await make_service(monkeypatch)
+        await service.redis.delete(service.worker_key(*HEDGE_HOLDER))
+
+        await service.delete_worker(*OWNER)
+
+        assert await service.get_legislation_ids() == []
+        assert await service.redis.hlen(service.hedged_legislation_key) == 0
+
+    asyncio.run(scenario())
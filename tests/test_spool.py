@@ -0,0 +1,68 @@
+# Внешние зависимости
+import asyncio
+import fcntl
+import glob
+import importlib
+import os
+# Внутренние модули
+from web_app.src.utils.spool import BinarySpool, encode_record
+
+
+spool_module = importlib.import_module("web_app.src.utils.spool")
+
+
+def write_segment(directory: str, name: str, records: list):
+    with open(os.path.join(directory, name), "wb") as file:
+        for legislation_id, data, appended_at in records:
+            file.write(encode_record(legislation_id=legislation_id, data=data, appended_at=appended_at))
+
+
+def capture_updates(monkeypatch) -> list:
+    updates = []
+
+    async def sql_update_binaries(binaries):
+        updates.append(dict(binaries))
+        return list(binaries)
+
+    monkeypatch.setattr(spool_module, "sql_update_binaries", sql_update_binaries)
+    return updates
+
+
+def test_segment_is_locked_before_it_is_visible(tmp_path, monkeypatch):
+    spool = BinarySpool(directory=str(tmp_path), segment_bytes=1 << 20, flush_interval=60, flush_batch=10)
+    locked_before_rename = []
+    rename = os.rename
+
+    def checked_rename(source, destination):
+        # Чужой flush() видит только *.seg: к этому моменту файл уже должен быть заблокирован
+        with open(source, "rb") as file:
+            try:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked_before_rename.append(False)
+            except BlockingIOError:
+                locked_before_rename.append(True)
+        rename(source, destination)
+
+    monkeypatch.setattr(os, "rename", checked_rename)
+    spool._write([(1, b"%PDF-1", 1.0)])
+
+    assert locked_before_rename == [True]
+    assert glob.glob(os.path.join(str(tmp_path), "*.seg")) == [spool._path]
+    assert spool._lock_segment(spool._path) is None
+    spool._seal_segment()
+
+
+def test_flush_keeps_latest_upload_across_segments(tmp_path, monkeypatch):
+    updates = capture_updates(monkeypatch)
+    # Сегмент, созданный раньше, содержит более позднюю загрузку документа 1
+    write_segment(str(tmp_path), "1000-host-1000.seg", [(1, b"%PDF-new", 30.0), (2, b"%PDF-2", 10.0)])
+    write_segment(str(tmp_path), "2000-host-999.seg", [(1, b"%PDF-old", 20.0), (3, b"%PDF-3", 20.0)])
+
+    spool = BinarySpool(directory=str(tmp_path), segment_bytes=1 << 20, flush_interval=60, flush_batch=10)
+    asyncio.run(spool.flush())
+
+    written = {}
+    for update in updates:
+        written.update(update)
+    assert written == {1: b"%PDF-new", 2: b"%PDF-2", 3: b"%PDF-3"}
+    assert glob.glob(os.path.join(str(tmp_path), "*.seg")) == []
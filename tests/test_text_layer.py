@@ -0,0 +1,82 @@
+# Внешние зависимости
+import asyncio
+import importlib
+import multiprocessing
+import time
+import pytest
+# Внутренние модули
+from web_app.src.utils.text_layer import TextLayerExtractor, assess_text_layer
+
+
+text_layer_module = importlib.import_module("web_app.src.utils.text_layer")
+
+
+RUSSIAN_PAGE = (
+    "Председатель Правительства Российской Федерации постановляет утвердить прилагаемые "
+    "изменения, которые вносятся в Положение о порядке рассмотрения обращений граждан. "
+) * 3
+
+
+def test_russian_text_layer_is_accepted():
+    assert assess_text_layer(pages=[RUSSIAN_PAGE] * 3, min_chars_per_page=200) is None
+
+
+def test_russian_text_with_latin_fragments_is_accepted():
+    page = f"{RUSSIAN_PAGE} Сведения размещаются на портале regulation.gov.ru (ID 01/05/12-25/00161234)."
+    assert assess_text_layer(pages=[page] * 3, min_chars_per_page=200) is None
+
+
+def test_cp1251_read_as_latin1_is_rejected():
+    # Самая частая поломка текстового слоя русских PDF: все символы - буквы по isalpha()
+    mojibake = RUSSIAN_PAGE.encode("cp1251").decode("latin-1")
+    assert mojibake.startswith("Ïðåäñåäàòåëü Ïðàâèòåëüñòâà")
+    assert assess_text_layer(pages=[mojibake] * 3, min_chars_per_page=200) == "mojibake"
+
+
+def test_text_without_cyrillic_is_rejected():
+    page = "The Chairman of the Government of the Russian Federation hereby resolves to approve. " * 4
+    assert assess_text_layer(pages=[page] * 3, min_chars_per_page=200) == "not_cyrillic"
+
+
+@pytest.mark.parametrize("pages, reason", [
+    ([], "empty"),
+    (["Статья 1."] * 3, "too_short"),
+    ([RUSSIAN_PAGE * 2, RUSSIAN_PAGE * 2, ""], "partial"),
+    ([RUSSIAN_PAGE.replace("о", "�")] * 3, "garbled"),
+    (["1.2.3 - 4.5.6 / 7.8.9 " * 20] * 3, "not_text")
+])
+def test_unusable_text_layer_reasons(pages, reason):
+    assert assess_text_layer(pages=pages, min_chars_per_page=200) == reason
+
+
+# Вызываются в процессах пула, поэтому объявлены на уровне модуля
+def hang_extraction(pdf: bytes, min_chars_per_page: int):
+    time.sleep(600)
+
+
+def quick_extraction(pdf: bytes, min_chars_per_page: int):
+    return pdf.decode(), "accepted"
+
+
+def test_hung_extraction_times_out_and_pool_is_rebuilt(monkeypatch):
+    async def scenario():
+        extractor = TextLayerExtractor(pool_size=1, min_chars_per_page=200, sweep_interval=30, timeout=2)
+        try:
+            monkeypatch.setattr(text_layer_module, "extract_text_layer", hang_extraction)
+            hung_pool = extractor._get_pool()
+            assert await extractor._extract(legislation_id=1, pdf=b"%PDF-loop") == (1, None, "timeout")
+
+            # Зависший процесс пула завершен, а не брошен работать дальше
+            deadline = time.monotonic() + 5
+            while multiprocessing.active_children() and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            assert not multiprocessing.active_children()
+
+            monkeypatch.setattr(text_layer_module, "extract_text_layer", quick_extraction)
+            assert await extractor._extract(legislation_id=2, pdf=b"text") == (2, "text", "accepted")
+            assert extractor._pool is not hung_pool
+
+        finally:
+            extractor.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,91 @@
+# Внешние зависимости
+import argparse
+import asyncio
+import json
+# Внутренние модули
+from web_app.src.core import init_database, close_database
+from web_app.src.crud import sql_get_backfill_checkpoint
+from web_app.src.utils.backfill import BACKFILLS, get_backfill_runner
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be positive: {value}")
+    return number
+
+
+def non_negative_float(value: str) -> float:
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return number
+
+
+# Заполнение производных колонок по всему корпусу из командной строки:
+#   python -m web_app.backfill run law_number           - продолжить с контрольной точки
+#   python -m web_app.backfill run law_number --reset   - пройти корпус заново
+#   python -m web_app.backfill status law_number        - вывести контрольную точку
+async def main(command: str, name: str, reset: bool, chunk_size: int, pool_size: int, rows_per_second: float):
+    await init_database()
+
+    try:
+        if command == "run":
+            runner = get_backfill_runner(
+                name,
+                chunk_size=chunk_size,
+                pool_size=pool_size,
+                rows_per_second=rows_per_second
+            )
+            result = await runner.run(reset=reset)
+
+        else:
+            checkpoint = await sql_get_backfill_checkpoint(name=name)
+            result = {
+                "backfill": checkpoint.name,
+                "last_id": checkpoint.last_id,
+                "scanned": checkpoint.scanned,
+                "updated": checkpoint.updated,
+                "started_at": checkpoint.started_at.isoformat(),
+                "updated_at": checkpoint.updated_at.isoformat(),
+                "finished_at": checkpoint.finished_at.isoformat() if checkpoint.finished_at else None
+            }
+
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    finally:
+        await close_database()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Заполнение производных колонок data_legislation")
+    parser.add_argument("command", choices=("run", "status"))
+    parser.add_argument("name", choices=tuple(BACKFILLS))
+    parser.add_argument("--reset", action="store_true", help="Начать проход с первого id")
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=None,
+        help="Строк в пачке (по умолчанию BACKFILL_CHUNK_SIZE)"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=positive_int,
+        default=None,
+        help="Процессов пула (по умолчанию BACKFILL_POOL_SIZE)"
+    )
+    parser.add_argument(
+        "--rows-per-second",
+        type=non_negative_float,
+        default=None,
+        help="Лимит строк в секунду (по умолчанию BACKFILL_ROWS_PER_SECOND)"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(
+        command=args.command,
+        name=args.name,
+        reset=args.reset,
+        chunk_size=args.chunk_size,
+        pool_size=args.pool_size,
+        rows_per_second=args.rows_per_second
+    ))
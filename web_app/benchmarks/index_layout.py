@@ -0,0 +1,126 @@
+# Внешние зависимости
+from typing import Dict, List
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import string
+import time
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.migrations.versions.v0005_hashed_uniqueness import HASH_FUNCTION_SQL
+
+
+# Сравнение прежней схемы индексов data_legislation с хэшированной:
+#   python -m web_app.benchmarks.index_layout --rows 20000
+# Таблицы создаются во временной схеме и удаляются после замера.
+SCHEMA = "bench_index_layout"
+
+WIDE_LAYOUT = [
+    "CREATE TABLE {schema}.wide ("
+    "id SERIAL PRIMARY KEY, name VARCHAR(4096) NOT NULL, publication_number VARCHAR(512) NOT NULL, "
+    "publication_date TIMESTAMP NOT NULL, law_number VARCHAR(16), authority_id INTEGER NOT NULL)",
+    "CREATE UNIQUE INDEX ON {schema}.wide (name)",
+    "CREATE UNIQUE INDEX ON {schema}.wide (publication_number)",
+    "CREATE INDEX ON {schema}.wide (publication_date)",
+    "CREATE INDEX ON {schema}.wide (law_number)",
+    "CREATE INDEX ON {schema}.wide (authority_id)"
+]
+
+HASHED_LAYOUT = [
+    "CREATE TABLE {schema}.hashed ("
+    "id SERIAL PRIMARY KEY, name VARCHAR(4096) NOT NULL, publication_number VARCHAR(512) NOT NULL, "
+    "name_hash BYTEA NOT NULL, publication_number_hash BYTEA NOT NULL, "
+    "publication_date TIMESTAMP NOT NULL, law_number VARCHAR(16), authority_id INTEGER NOT NULL)",
+    HASH_FUNCTION_SQL.replace("data_legislation_fill_hashes()", "{schema}.fill_hashes()"),
+    "CREATE TRIGGER fill_hashes BEFORE INSERT ON {schema}.hashed "
+    "FOR EACH ROW EXECUTE FUNCTION {schema}.fill_hashes()",
+    "CREATE UNIQUE INDEX ON {schema}.hashed (name_hash)",
+    "CREATE UNIQUE INDEX ON {schema}.hashed (publication_number_hash)",
+    "CREATE INDEX ON {schema}.hashed (authority_id)"
+]
+
+
+def generate_rows(count: int, seed: int) -> List[dict]:
+    """Записи с длиной названий, как у реальных законопроектов (сотни - тысячи символов)"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + " " * 8
+    start_date = datetime(2000, 1, 1)
+
+    return [
+        {
+            "name": f"{index} " + "".join(rng.choices(alphabet, k=rng.randint(200, 2000))),
+            "publication_number": f"{rng.randint(0, 10 ** 12):012d}{index}" + "".join(rng.choices(alphabet, k=60)),
+            "publication_date": start_date + timedelta(minutes=rng.randint(0, 13_000_000)),
+            "law_number": f"{rng.randint(1, 999)}-ФЗ",
+            "authority_id": rng.randint(1, 300)
+        }
+        for index in range(count)
+    ]
+
+
+async def measure(conn: AsyncConnection, table: str, rows: List[dict], batch_size: int) -> Dict[str, float]:
+    insert = sa.text(
+        f"INSERT INTO {SCHEMA}.{table} (name, publication_number, publication_date, law_number, authority_id) "
+        f"VALUES (:name, :publication_number, :publication_date, :law_number, :authority_id)"
+    )
+
+    start_time = time.perf_counter()
+    for offset in range(0, len(rows), batch_size):
+        await conn.execute(insert, rows[offset:offset + batch_size])
+        await conn.commit()
+    elapsed = time.perf_counter() - start_time
+
+    sizes = await conn.execute(sa.text(
+        "SELECT pg_relation_size(CAST(:table AS regclass)) AS heap, "
+        "pg_indexes_size(CAST(:table AS regclass)) AS indexes"
+    ), {"table": f"{SCHEMA}.{table}"})
+    heap_size, index_size = sizes.one()
+
+    return {
+        "rows_per_second": len(rows) / elapsed,
+        "seconds": elapsed,
+        "heap_mb": heap_size / 1024 / 1024,
+        "indexes_mb": index_size / 1024 / 1024
+    }
+
+
+async def main(rows_count: int, batch_size: int, seed: int):
+    engine = create_async_engine(config.DATABASE_URL)
+    rows = generate_rows(count=rows_count, seed=seed)
+    results = {}
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(sa.text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(sa.text(f"CREATE SCHEMA {SCHEMA}"))
+            for statement in WIDE_LAYOUT + HASHED_LAYOUT:
+                await conn.execute(sa.text(statement.format(schema=SCHEMA)))
+            await conn.commit()
+
+            for table in ("wide", "hashed"):
+                results[table] = await measure(conn=conn, table=table, rows=rows, batch_size=batch_size)
+
+            await conn.execute(sa.text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            await conn.commit()
+
+    finally:
+        await engine.dispose()
+
+    print(f"{'layout':<8} {'rows/s':>10} {'seconds':>9} {'heap MB':>9} {'indexes MB':>11}")
+    for table, result in results.items():
+        print(
+            f"{table:<8} {result['rows_per_second']:>10.0f} {result['seconds']:>9.2f} "
+            f"{result['heap_mb']:>9.1f} {result['indexes_mb']:>11.1f}"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Вставка и размер индексов: прежняя схема против хэшей")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(rows_count=args.rows, batch_size=args.batch_size, seed=args.seed))
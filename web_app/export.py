@@ -0,0 +1,33 @@
+# Внешние зависимости
+import argparse
+import asyncio
+import json
+# Внутренние модули
+from web_app.src.core import config, init_database, close_database
+from web_app.src.utils.export import export_incremental
+
+
+# Инкрементальная выгрузка текстов в Parquet из командной строки:
+#   python -m web_app.export --output-dir exports          - записи с текстом новее водяного знака
+#   python -m web_app.export --output-dir exports --full   - все записи заново
+# Каталог читается как набор данных: pyarrow.parquet.read_table("exports", columns=["id", "text"]);
+#   служебный _manifest.json хранит водяной знак и список файлов. Документ, текст которого
+#   перезаписан, попадает в несколько файлов: актуальна строка с последним text_updated_at
+async def main(output_dir: str, include_pdf: bool, full: bool):
+    await init_database()
+
+    try:
+        result = await export_incremental(directory=output_dir or config.EXPORT_DIR, include_pdf=include_pdf, full=full)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    finally:
+        await close_database()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Выгрузка текстов законопроектов в Parquet")
+    parser.add_argument("--output-dir", default=None, help="Каталог выгрузки (по умолчанию EXPORT_DIR)")
+    parser.add_argument("--include-pdf", action="store_true", help="Выгружать PDF в колонке binary_pdf")
+    parser.add_argument("--full", action="store_true", help="Выгрузить все записи, не учитывая водяной знак")
+    args = parser.parse_args()
+    asyncio.run(main(output_dir=args.output_dir, include_pdf=args.include_pdf, full=args.full))
@@ -3,20 +3,50 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 # Внутренние модули
-from web_app.src.core import config, setup_database
+from web_app.src.core import config, setup_database, init_database, close_database
 from web_app.src.routers import router
-from web_app.src.utils import redis_service
+from web_app.src.middlewares import MetricsMiddleware, LogContextMiddleware, ProfilingMiddleware
+from web_app.src.utils import (redis_service, process_metrics, partition_maintenance, binary_spool,
+                              payload_executor, text_layer_extractor)
 
 
+# Пулы БД и Redis создаются здесь, то есть отдельно в каждом процессе uvicorn
 async def startup():
     config.logger.info("Запускаем приложение...")
-    await setup_database()
+    await init_database()
+
+    # В многопроцессном режиме схему готовит web_app.prestart один раз до запуска процессов
+    if config.SETUP_DATABASE_ON_STARTUP:
+        await setup_database()
+
     await redis_service.init_redis()
+    process_metrics.start(redis_service.redis)
+    payload_executor.start()
+
+    # Сначала досылаем в БД загрузки, подтвержденные до остановки
+    if config.BINARY_SPOOL_ENABLED:
+        await binary_spool.start()
+
+    if config.TEXT_LAYER_ENABLED:
+        text_layer_extractor.start()
+
+    # Процессы соревнуются за advisory-блокировку, работу выполняет один из них
+    if config.PARTITIONING_MODE == "monthly" and config.PARTITION_MAINTENANCE_SECONDS > 0:
+        partition_maintenance.start()
 
 
 async def shutdown():
     config.logger.info("Останавливаем приложение...")
+    partition_maintenance.stop()
+    text_layer_extractor.stop()
+
+    if config.BINARY_SPOOL_ENABLED:
+        await binary_spool.stop()
+
+    payload_executor.stop()
+    await process_metrics.stop()
     await redis_service.close_redis()
+    await close_database()
 
 
 @asynccontextmanager
@@ -36,6 +66,11 @@ app = FastAPI(
 # Подключение маршрутов
 app.include_router(router)
 
+# Метрики процесса, профилирование и контекст логов запроса
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(LogContextMiddleware)
+
 # Настройка CORS
 app.add_middleware(
     CORSMiddleware,
@@ -48,4 +83,4 @@ app.add_middleware(
 
 if __name__ == '__main__':
     import uvicorn
-    uvicorn.run('main:app', port=8000, reload=False)
\ No newline at end of file
+    uvicorn.run('web_app:app', port=8000, reload=False, workers=config.WEB_WORKERS)
\ No newline at end of file
@@ -0,0 +1,39 @@
+# Внешние зависимости
+import argparse
+import asyncio
+import json
+# Внутренние модули
+from web_app.src.core import config, init_database, close_database, setup_database, get_engine
+from web_app.src.crud import sql_ensure_partitions, sql_release_exported_partitions, sql_get_partition_stats
+from web_app.src.migrations.partitioning import convert_to_partitioned
+
+
+# Обслуживание партиций data_legislation из командной строки:
+#   python -m web_app.partitions convert   - перевести таблицу на помесячные партиции (окно обслуживания)
+#   python -m web_app.partitions maintain  - создать будущие партиции и освободить выгруженные
+#   python -m web_app.partitions stats     - вывести статистику по партициям
+async def main(command: str):
+    await init_database()
+
+    try:
+        if command == "convert":
+            await setup_database()
+            async with get_engine().begin() as conn:
+                await convert_to_partitioned(conn=conn, premake_months=config.PARTITION_PREMAKE_MONTHS)
+
+        elif command == "maintain":
+            await sql_ensure_partitions(premake_months=config.PARTITION_PREMAKE_MONTHS)
+            await sql_release_exported_partitions(action=config.PARTITION_RELEASE_ACTION)
+
+        else:
+            stats = await sql_get_partition_stats()
+            print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+    finally:
+        await close_database()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Обслуживание партиций data_legislation")
+    parser.add_argument("command", choices=("convert", "maintain", "stats"))
+    asyncio.run(main(parser.parse_args().command))
@@ -0,0 +1,22 @@
+# Внешние зависимости
+import asyncio
+# Внутренние модули
+from web_app.src.core import config, init_database, close_database, setup_database
+from web_app.src.crud import sql_ensure_partitions
+
+
+# Однократная подготовка базы данных перед запуском процессов uvicorn
+async def prestart():
+    await init_database()
+
+    try:
+        await setup_database()
+
+        if config.PARTITIONING_MODE == "monthly":
+            await sql_ensure_partitions(premake_months=config.PARTITION_PREMAKE_MONTHS)
+    finally:
+        await close_database()
+
+
+if __name__ == '__main__':
+    asyncio.run(prestart())
\ No newline at end of file
@@ -0,0 +1,71 @@
+# Внешние зависимости
+from typing import Any, Callable, Coroutine
+import asyncio
+import selectors
+
+
+# Начало виртуального времени для time.time(): обычная отметка Unix, а не ноль
+VIRTUAL_EPOCH = 1_700_000_000.0
+
+
+class SimulationDeadlock(RuntimeError):
+    """Задачи ждут друг друга, а таймеров, которые могли бы их разбудить, нет"""
+
+
+class VirtualTimeSelector(selectors.SelectSelector):
+    """Селектор без ввода-вывода: ожидание таймера мгновенно сдвигает виртуальные часы"""
+    def __init__(self, loop: "VirtualTimeLoop"):
+        super().__init__()
+        self.loop = loop
+
+    def select(self, timeout=None):
+        if timeout is None:
+            raise SimulationDeadlock("No runnable tasks and no pending timers")
+        self.loop.advance(timeout)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop с виртуальным временем.
+
+    asyncio.sleep, wait_for и таймеры работают как обычно, но ожидание не занимает
+    реального времени: часы переводятся сразу к ближайшему таймеру. Без ввода-вывода
+    и потоков порядок выполнения задач полностью определяется программой и seed.
+    """
+    def __init__(self):
+        self._virtual_time = 0.0
+        super().__init__(VirtualTimeSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float):
+        self._virtual_time += max(seconds, 0.0)
+
+    def wall_time(self) -> float:
+        """Замена time.time() для кода под проверкой"""
+        return VIRTUAL_EPOCH + self._virtual_time
+
+
+class VirtualClock:
+    """Объект с методом time(), подставляемый вместо модуля time"""
+    def __init__(self, loop: VirtualTimeLoop):
+        self.loop = loop
+
+    def time(self) -> float:
+        return self.loop.wall_time()
+
+    def monotonic(self) -> float:
+        return self.loop.time()
+
+    def perf_counter(self) -> float:
+        return self.loop.time()
+
+
+def run_virtual(main: Callable[[VirtualTimeLoop], Coroutine[Any, Any, Any]]) -> Any:
+    """Выполнить main(loop) в собственном event loop с виртуальным временем"""
+    loop = VirtualTimeLoop()
+    try:
+        return loop.run_until_complete(main(loop))
+    finally:
+        loop.close()
@@ -0,0 +1,347 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+import asyncio
+import random
+from redis.exceptions import WatchError
+from fastapi import HTTPException, status
+# Внутренние модули
+from web_app.src.schemas import SchemeFreeLegislation
+
+
+class Latency:
+    """Задержка вызова в виртуальном времени: экспоненциальная, с редкими долгими паузами"""
+    def __init__(self, rng: random.Random, mean: float, stall_probability: float = 0.0, stall_seconds: float = 0.0):
+        self.rng = rng
+        self.mean = mean
+        self.stall_probability = stall_probability
+        self.stall_seconds = stall_seconds
+        self.stalls = 0
+
+    async def wait(self):
+        delay = self.rng.expovariate(1 / self.mean) if self.mean > 0 else 0.0
+        if self.stall_probability and self.rng.random() < self.stall_probability:
+            # Пауза GC, сетевой сбой или долгий запрос: дольше TTL блокировки
+            self.stalls += 1
+            delay += self.stall_seconds
+        # Даже нулевая задержка отдает управление: между вызовами возможны чередования
+        await asyncio.sleep(delay)
+
+
+def _command(name: str):
+    async def command(self: "FakeRedis", *args, **kwargs):
+        await self.latency.wait()
+        self.commands += 1
+        return getattr(self, f"_{name}")(*args, **kwargs)
+
+    command.__name__ = name
+    return command
+
+
+class FakeRedis:
+    """Redis в памяти с decode_responses=True: строки, хэши, списки, TTL и WATCH.
+
+    Каждая команда атомарна и выполняется после задержки, поэтому чередование
+    команд разных задач такое же, как с настоящим сервером.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, latency: Latency):
+        self.loop = loop
+        self.latency = latency
+        self.commands = 0
+
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        # Версия ключа растет при каждом изменении и истечении: основа WATCH
+        self._versions: Dict[str, int] = defaultdict(int)
+
+    # --- хранилище ---
+
+    def _purge(self, key: str):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= self.loop.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            self._versions[key] += 1
+
+    def _read(self, key: str, default: Any = None) -> Any:
+        self._purge(key)
+        return self._data.get(key, default)
+
+    def _write(self, key: str, value: Any):
+        self._purge(key)
+        self._data[key] = value
+        self._versions[key] += 1
+
+    def version(self, key: str) -> int:
+        self._purge(key)
+        return self._versions[key]
+
+    # --- строки и ключи ---
+
+    def _set(self, key: str, value: Any, ex: Optional[float] = None, nx: bool = False) -> Optional[bool]:
+        if nx and self._read(key) is not None:
+            return None
+        self._write(key, str(value))
+        if ex:
+            self._expires[key] = self.loop.time() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    def _get(self, key: str) -> Optional[str]:
+        return self._read(key)
+
+    def _mget(self, *keys: str) -> List[Optional[str]]:
+        return [self._read(key) for key in keys]
+
+    def _delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if self._read(key) is not None:
+                del self._data[key]
+                self._expires.pop(key, None)
+                self._versions[key] += 1
+                deleted += 1
+        return deleted
+
+    def _exists(self, *keys: str) -> int:
+        return sum(self._read(key) is not None for key in keys)
+
+    def _expire(self, key: str, seconds: float) -> bool:
+        if self._read(key) is None:
+            return False
+        self._expires[key] = self.loop.time() + seconds
+        return True
+
+    def _incrby(self, key: str, amount: int) -> int:
+        value = int(self._read(key, "0")) + amount
+        self._write(key, str(value))
+        return value
+
+    def _incr(self, key: str) -> int:
+        return self._incrby(key, 1)
+
+    # --- хэши ---
+
+    def _hash(self, key: str) -> Dict[str, str]:
+        return self._read(key, {})
+
+    def _hset(self, key: str, field: Any = None, value: Any = None, mapping: Optional[Dict] = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+
+        current = dict(self._hash(key))
+        added = sum(str(name) not in current for name in items)
+        current.update({str(name): str(item) for name, item in items.items()})
+        self._write(key, current)
+        return added
+
+    def _hsetnx(self, key: str, field: Any, value: Any) -> int:
+        if str(field) in self._hash(key):
+            return 0
+        return self._hset(key, field, value) or 1
+
+    def _hget(self, key: str, field: Any) -> Optional[str]:
+        return self._hash(key).get(str(field))
+
+    def _hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self._hash(key))
+
+    def _hmget(self, key: str, *fields: Any) -> List[Optional[str]]:
+        current = self._hash(key)
+        return [current.get(str(field)) for field in fields]
+
+    def _hdel(self, key: str, *fields: Any) -> int:
+        current = dict(self._hash(key))
+        deleted = sum(current.pop(str(field), None) is not None for field in fields)
+        if deleted:
+            if current:
+                self._write(key, current)
+            else:
+                self._delete(key)
+        return deleted
+
+    def _hkeys(self, key: str) -> List[str]:
+        return list(self._hash(key))
+
+    def _hlen(self, key: str) -> int:
+        return len(self._hash(key))
+
+    def _hincrby(self, key: str, field: Any, amount: int = 1) -> int:
+        value = int(self._hash(key).get(str(field), "0")) + amount
+        self._hset(key, field, value)
+        return value
+
+    # --- списки ---
+
+    def _lpush(self, key: str, *values: Any) -> int:
+        current = [str(value) for value in reversed(values)] + list(self._read(key, []))
+        self._write(key, current)
+        return len(current)
+
+    @staticmethod
+    def _slice(items: List[str], start: int, end: int) -> List[str]:
+        end = len(items) + end if end < 0 else end
+        return items[start:end + 1]
+
+    def _ltrim(self, key: str, start: int, end: int) -> bool:
+        self._write(key, self._slice(list(self._read(key, [])), start, end))
+        return True
+
+    def _lrange(self, key: str, start: int, end: int) -> List[str]:
+        return self._slice(list(self._read(key, [])), start, end)
+
+    set = _command("set")
+    get = _command("get")
+    mget = _command("mget")
+    delete = _command("delete")
+    exists = _command("exists")
+    expire = _command("expire")
+    incr = _command("incr")
+    incrby = _command("incrby")
+    hset = _command("hset")
+    hsetnx = _command("hsetnx")
+    hget = _command("hget")
+    hgetall = _command("hgetall")
+    hmget = _command("hmget")
+    hdel = _command("hdel")
+    hkeys = _command("hkeys")
+    hlen = _command("hlen")
+    hincrby = _command("hincrby")
+    lpush = _command("lpush")
+    ltrim = _command("ltrim")
+    lrange = _command("lrange")
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(redis=self)
+
+
+class FakePipeline:
+    """Пайплайн redis-py: команды копятся до execute(); после watch() и до multi() выполняются сразу"""
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self._commands: List[Tuple[str, tuple, dict]] = []
+        self._watched: Dict[str, int] = {}
+        self._multi = False
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.reset()
+
+    def __await__(self):
+        # await pipeline.hset(...) в режиме накопления возвращает сам пайплайн
+        if False:
+            yield
+        return self
+
+    def __getattr__(self, name: str):
+        if not hasattr(FakeRedis, f"_{name}"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            if self._watched and not self._multi:
+                return getattr(self.redis, name)(*args, **kwargs)
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    async def watch(self, *keys: str):
+        await self.redis.latency.wait()
+        self._watched.update({key: self.redis.version(key) for key in keys})
+
+    def multi(self):
+        self._multi = True
+
+    async def execute(self) -> List[Any]:
+        await self.redis.latency.wait()
+        commands, self._commands = self._commands, []
+
+        try:
+            if any(self.redis.version(key) != version for key, version in self._watched.items()):
+                raise WatchError("Watched variable changed")
+
+            # Транзакция применяется целиком без переключения задач
+            self.redis.commands += len(commands)
+            return [getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in commands]
+
+        finally:
+            self._watched = {}
+            self._multi = False
+
+    async def reset(self):
+        self._commands = []
+        self._watched = {}
+        self._multi = False
+
+
+class FakeDatabase:
+    """data_legislation в памяти: очередь документов с PDF и первый записавший текст.
+
+    Выдача идет от новых к старым (политика newest) без учета приоритетов.
+    """
+    def __init__(self, latency: Latency, documents: int):
+        self.latency = latency
+        self.queries = 0
+        self.binaries: Dict[int, bytes] = {
+            legislation_id: f"%PDF-simulated-{legislation_id}".encode()
+            for legislation_id in range(1, documents + 1)
+        }
+        self.texts: Dict[int, str] = {}
+        self._order = sorted(self.binaries, reverse=True)
+
+    async def _query(self):
+        await self.latency.wait()
+        self.queries += 1
+
+    def _queued(self, legislation_id: int) -> bool:
+        return legislation_id in self.binaries and legislation_id not in self.texts
+
+    async def get_free_legislation(
+        self,
+        reservation_legislation_ids: List[int],
+        limit: int
+    ) -> List[SchemeFreeLegislation]:
+        await self._query()
+        reserved = set(reservation_legislation_ids)
+
+        legislation = []
+        for legislation_id in self._order:
+            if len(legislation) >= limit:
+                break
+            if self._queued(legislation_id) and legislation_id not in reserved:
+                legislation.append(SchemeFreeLegislation(id=legislation_id, binary=self.binaries[legislation_id]))
+        return legislation
+
+    async def get_queued_legislation(self, legislation_ids: List[int]) -> List[SchemeFreeLegislation]:
+        await self._query()
+        return [
+            SchemeFreeLegislation(id=legislation_id, binary=self.binaries[legislation_id])
+            for legislation_id in legislation_ids if self._queued(legislation_id)
+        ]
+
+    async def valid_legislation_ids_from_worker(self, worker_legislation_ids: List[int]) -> List[int]:
+        await self._query()
+        return [legislation_id for legislation_id in worker_legislation_ids if self._queued(legislation_id)]
+
+    async def update_text(self, legislation_id: int, content: str) -> bool:
+        await self._query()
+        if legislation_id not in self.binaries:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Legislation not found")
+        if legislation_id in self.texts:
+            return False
+        self.texts[legislation_id] = content
+        return True
+
+    async def update_texts(self, texts: Dict[int, str]) -> Tuple[List[int], List[int]]:
+        await self._query()
+        applied_ids = []
+        for legislation_id, content in texts.items():
+            if self._queued(legislation_id):
+                self.texts[legislation_id] = content
+                applied_ids.append(legislation_id)
+        missing_ids = sorted(legislation_id for legislation_id in texts if legislation_id not in self.binaries)
+        return applied_ids, missing_ids
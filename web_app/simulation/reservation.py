@@ -0,0 +1,447 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Optional, Set
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict
+from unittest import mock
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import random
+import sys
+import time
+from fastapi import HTTPException, Response
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.schemas import (SchemeTextLegislation, SchemeTextBatchLegislation, SchemeTextItemLegislation,
+                                 RemoveWorkerRequest)
+from web_app.src.utils.pipeline import Pipeline
+from web_app.simulation.clock import VirtualClock, VirtualTimeLoop, run_virtual
+from web_app.simulation.fakes import FakeDatabase, FakeRedis, Latency
+
+
+# Пакеты routers и utils экспортируют объекты под именами модулей, поэтому сами модули берем явно
+api_router = importlib.import_module("web_app.src.routers.api_router")
+redis_service_module = importlib.import_module("web_app.src.utils.redis_service")
+
+
+# Моделирование протокола брони документов (выдача, сдача текста, падение, снятие обработчика):
+#   python -m web_app.simulation.reservation --workers 1000 --documents 20000 --seeds 20
+# Вызываются настоящие обработчики маршрутов и RedisService; Redis и БД заменены моделями в памяти,
+# время виртуальное. DATABASE_URL нужен только для загрузки config, соединений с БД нет.
+# Код выхода 1, если хотя бы для одного seed нарушен инвариант.
+
+
+@dataclass
+class SimulationSettings:
+    workers: int = 1000
+    documents: int = 20_000
+    duration: float = 120.0
+    limit: int = 10
+    process_seconds: float = 2.0
+    crash_rate: float = 0.001
+    restart_seconds: float = 30.0
+    batch_submit_rate: float = 0.5
+    redis_latency: float = 0.0005
+    db_latency: float = 0.005
+    stall_rate: float = 0.0005
+    stall_seconds: float = 40.0
+
+
+class ProtocolMonitor:
+    """Проверка инвариантов по событиям обработчиков.
+
+    Держатель документа - конкретный запуск обработчика. Документ выдан дважды, если
+    его получил второй держатель, пока первый жив или упал и еще не снят через
+    /worker/delete; исключение - намеренное переиздание зависшего документа.
+    """
+    def __init__(self, loop: VirtualTimeLoop, max_details: int = 20):
+        self.loop = loop
+        self.max_details = max_details
+
+        # документ -> {держатель: "alive" | "crashed"}
+        self.holders: Dict[int, Dict[str, str]] = defaultdict(dict)
+        self.held: Dict[str, Set[int]] = defaultdict(set)
+        # Переизданные документы по ключу обработчика до их выдачи
+        self.hedged: Dict[str, Set[int]] = defaultdict(set)
+
+        self.issued = 0
+        self.hedge_issued = 0
+        self.applied = 0
+        self.duplicates = 0
+        self.double_issues = 0
+        self.details: List[Dict[str, Any]] = []
+
+    def on_hedge(self, worker_key: str, legislation_ids: List[int]):
+        self.hedged[worker_key].update(legislation_ids)
+
+    def on_issue(self, holder: str, worker_key: str, legislation_ids: List[int]):
+        hedged = self.hedged.pop(worker_key, set())
+
+        for legislation_id in legislation_ids:
+            self.issued += 1
+            if legislation_id in hedged:
+                self.hedge_issued += 1
+
+            else:
+                for other, state in self.holders[legislation_id].items():
+                    if other != holder:
+                        self._double_issue(legislation_id=legislation_id, holder=holder, other=other, state=state)
+
+            self.holders[legislation_id][holder] = "alive"
+            self.held[holder].add(legislation_id)
+
+    def _double_issue(self, legislation_id: int, holder: str, other: str, state: str):
+        self.double_issues += 1
+        if len(self.details) < self.max_details:
+            self.details.append({
+                "legislation_id": legislation_id,
+                "holder": holder,
+                "previous_holder": other,
+                "previous_state": state,
+                "virtual_time": round(self.loop.time(), 3)
+            })
+
+    def on_submit(self, holder: str, legislation_id: int, applied: bool):
+        self.applied += applied
+        self.duplicates += not applied
+        self._drop(holder=holder, legislation_id=legislation_id)
+
+    def on_crash(self, holder: str):
+        for legislation_id in self.held[holder]:
+            self.holders[legislation_id][holder] = "crashed"
+
+    def on_release(self, holder: str):
+        # С начала снятия документы обработчика законно выдаются другим
+        for legislation_id in list(self.held[holder]):
+            self._drop(holder=holder, legislation_id=legislation_id)
+        self.held.pop(holder, None)
+
+    def _drop(self, holder: str, legislation_id: int):
+        self.holders[legislation_id].pop(holder, None)
+        if not self.holders[legislation_id]:
+            del self.holders[legislation_id]
+        self.held[holder].discard(legislation_id)
+
+
+class VirtualWorker:
+    """Обработчик распознавания: берет пачку, распознает, сдает тексты, иногда падает"""
+    def __init__(self, simulation: "ReservationSimulation", worker_id: int):
+        self.simulation = simulation
+        self.worker_id = worker_id
+        self.ip = f"10.{worker_id // 65536 % 256}.{worker_id // 256 % 256}.{worker_id % 256}"
+        self.worker_key = redis_service_module.RedisService().worker_key(ip=self.ip, worker_id=worker_id)
+        self.rng = random.Random(f"{simulation.seed}:{worker_id}")
+        self.incarnation = 0
+
+    @property
+    def holder(self) -> str:
+        return f"{self.worker_key}#{self.incarnation}"
+
+    async def claim(self) -> Optional[List[int]]:
+        """id выданных документов; None при отказе 503"""
+        try:
+            response = await self.simulation.endpoints["claim"](
+                worker_id=self.worker_id,
+                response=Response(),
+                limit=self.simulation.settings.limit,
+                client_ip=self.ip
+            )
+        except HTTPException as e:
+            if e.status_code != 503:
+                raise
+            self.simulation.unavailable += 1
+            return None
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        legislation_ids = [item["id"] for item in json.loads(body)]
+        self.simulation.monitor.on_issue(
+            holder=self.holder,
+            worker_key=self.worker_key,
+            legislation_ids=legislation_ids
+        )
+        return legislation_ids
+
+    async def submit(self, texts: Dict[int, str]):
+        monitor = self.simulation.monitor
+
+        if len(texts) > 1 and self.rng.random() < self.simulation.settings.batch_submit_rate:
+            result = await self.simulation.endpoints["submit_batch"](
+                data=SchemeTextBatchLegislation(
+                    worker_id=self.worker_id,
+                    items=[
+                        SchemeTextItemLegislation(id=legislation_id, text=text)
+                        for legislation_id, text in texts.items()
+                    ]
+                ),
+                client_ip=self.ip
+            )
+            applied = set(result["applied"])
+            for legislation_id in texts:
+                monitor.on_submit(holder=self.holder, legislation_id=legislation_id, applied=legislation_id in applied)
+            return
+
+        for legislation_id, text in texts.items():
+            result = await self.simulation.endpoints["submit"](
+                data=SchemeTextLegislation(worker_id=self.worker_id, id=legislation_id, text=text),
+                client_ip=self.ip
+            )
+            monitor.on_submit(holder=self.holder, legislation_id=legislation_id, applied=result["status"] == "success")
+
+    async def delete(self):
+        self.simulation.monitor.on_release(holder=self.holder)
+        await self.simulation.endpoints["delete"](data=RemoveWorkerRequest(worker_id=self.worker_id), client_ip=self.ip)
+
+    async def run_incarnation(self, stop: asyncio.Event) -> bool:
+        """Цикл одного запуска; True, если обработчик упал"""
+        settings = self.simulation.settings
+
+        while not stop.is_set():
+            legislation_ids = await self.claim()
+            if legislation_ids is None:
+                await asyncio.sleep(self.rng.uniform(1, 10))
+                continue
+            if not legislation_ids:
+                await asyncio.sleep(self.rng.uniform(1, 5))
+                continue
+
+            texts = {}
+            for legislation_id in legislation_ids:
+                await asyncio.sleep(self.rng.expovariate(1 / settings.process_seconds))
+                if self.rng.random() < settings.crash_rate:
+                    return True
+                texts[legislation_id] = f"text {legislation_id} by {self.holder}"
+
+            await self.submit(texts)
+
+        await self.delete()
+        return False
+
+    async def run(self, stop: asyncio.Event):
+        # Запуски разнесены во времени, как при раскатке обработчиков
+        await asyncio.sleep(self.rng.uniform(0, 10))
+
+        while await self.run_incarnation(stop=stop):
+            self.simulation.monitor.on_crash(holder=self.holder)
+            self.simulation.crashes += 1
+            await asyncio.sleep(self.rng.uniform(0, self.simulation.settings.restart_seconds))
+
+            # Перезапущенный обработчик сначала снимает прежнюю регистрацию и ее брони
+            await self.delete()
+            self.incarnation += 1
+
+
+class ReservationSimulation:
+    """Один прогон протокола брони для заданного seed"""
+    def __init__(self, settings: SimulationSettings, seed: int):
+        self.settings = settings
+        self.seed = seed
+        self.unavailable = 0
+        self.crashes = 0
+        self.endpoints = {
+            "claim": self._endpoint("/legislation/free", "GET"),
+            "submit": self._endpoint("/legislation/update/text", "PATCH"),
+            "submit_batch": self._endpoint("/legislation/update/text/batch", "PATCH"),
+            "delete": self._endpoint("/worker/delete", "POST")
+        }
+        self.monitor: Optional[ProtocolMonitor] = None
+
+    @staticmethod
+    def _endpoint(path: str, method: str):
+        # В модуле роутера два обработчика с одним именем, поэтому ищем по маршруту
+        for route in api_router.router.routes:
+            if route.path == f"{api_router.router.prefix}{path}" and method in route.methods:
+                return route.endpoint
+        raise LookupError(f"Route {method} {path} not found")
+
+    def _patch(self, stack: ExitStack, loop: VirtualTimeLoop, redis: FakeRedis, database: FakeDatabase):
+        service = redis_service_module.RedisService()
+        service.redis = redis
+
+        mark_hedged = service.mark_hedged
+
+        async def record_hedged(ip: str, worker_id: int, legislation_ids: List[int]):
+            await mark_hedged(ip=ip, worker_id=worker_id, legislation_ids=legislation_ids)
+            self.monitor.on_hedge(
+                worker_key=service.worker_key(ip=ip, worker_id=worker_id),
+                legislation_ids=legislation_ids
+            )
+
+        service.mark_hedged = record_hedged
+
+        stack.enter_context(mock.patch.object(api_router, "redis_service", service))
+        stack.enter_context(mock.patch.object(api_router, "pipeline", Pipeline(stages={})))
+        stack.enter_context(mock.patch.object(api_router, "sql_get_free_legislation", database.get_free_legislation))
+        stack.enter_context(mock.patch.object(
+            api_router,
+            "sql_get_queued_legislation",
+            database.get_queued_legislation
+        ))
+        stack.enter_context(mock.patch.object(api_router, "sql_update_text", database.update_text))
+        stack.enter_context(mock.patch.object(api_router, "sql_update_texts", database.update_texts))
+        stack.enter_context(mock.patch.object(
+            redis_service_module,
+            "sql_valid_legislation_ids_from_worker",
+            database.valid_legislation_ids_from_worker
+        ))
+        stack.enter_context(mock.patch.object(redis_service_module, "time", VirtualClock(loop)))
+        return service
+
+    async def _drain(self, worker: VirtualWorker) -> int:
+        """Один обработчик без сбоев выбирает остаток очереди; число его выдач"""
+        claims = empty_claims = 0
+
+        while empty_claims < 2:
+            legislation_ids = await worker.claim()
+            claims += 1
+            if not legislation_ids:
+                empty_claims += 1
+                await asyncio.sleep(config.HEDGE_MIN_AGE_SECONDS)
+                continue
+
+            empty_claims = 0
+            await worker.submit({
+                legislation_id: f"text {legislation_id} by drain"
+                for legislation_id in legislation_ids
+            })
+
+        await worker.delete()
+        return claims
+
+    async def run(self, loop: VirtualTimeLoop) -> Dict[str, Any]:
+        settings = self.settings
+        rng = random.Random(self.seed)
+        self.monitor = ProtocolMonitor(loop=loop)
+
+        redis = FakeRedis(
+            loop=loop,
+            latency=Latency(
+                rng=random.Random(rng.random()),
+                mean=settings.redis_latency,
+                stall_probability=settings.stall_rate,
+                stall_seconds=settings.stall_seconds
+            )
+        )
+        database = FakeDatabase(
+            latency=Latency(
+                rng=random.Random(rng.random()),
+                mean=settings.db_latency,
+                stall_probability=settings.stall_rate,
+                stall_seconds=settings.stall_seconds
+            ),
+            documents=settings.documents
+        )
+
+        with ExitStack() as stack:
+            service = self._patch(stack=stack, loop=loop, redis=redis, database=database)
+
+            stop = asyncio.Event()
+            workers = [VirtualWorker(simulation=self, worker_id=worker_id) for worker_id in range(settings.workers)]
+            tasks = [asyncio.create_task(worker.run(stop=stop)) for worker in workers]
+
+            await asyncio.sleep(settings.duration)
+            stop.set()
+            await asyncio.gather(*tasks)
+            load_finished_at = loop.time()
+
+            # Сбои больше не моделируются: все, что осталось в очереди, должно выдаваться
+            redis.latency.stall_probability = database.latency.stall_probability = 0.0
+            drain_claims = await self._drain(worker=VirtualWorker(simulation=self, worker_id=settings.workers))
+
+            leaked_ids = sorted(set(database.binaries) - set(database.texts))
+            reserved_ids = set(await service.get_legislation_ids())
+
+        monitor = self.monitor
+        return {
+            "seed": self.seed,
+            "ok": not monitor.double_issues and not leaked_ids,
+            "issued": monitor.issued,
+            "hedge_issued": monitor.hedge_issued,
+            "applied": monitor.applied,
+            "duplicates": monitor.duplicates,
+            "double_issues": monitor.double_issues,
+            "double_issue_examples": monitor.details,
+            "leaked": len(leaked_ids),
+            "leaked_examples": [
+                {"legislation_id": legislation_id, "in_legislation_ids": legislation_id in reserved_ids}
+                for legislation_id in leaked_ids[:monitor.max_details]
+            ],
+            "crashes": self.crashes,
+            "unavailable": self.unavailable,
+            "stalls": redis.latency.stalls + database.latency.stalls,
+            "drain_claims": drain_claims,
+            "reservation_list_size": len(reserved_ids),
+            "redis_commands": redis.commands,
+            "db_queries": database.queries,
+            "load_virtual_seconds": round(load_finished_at, 3),
+            "virtual_seconds": round(loop.time(), 3)
+        }
+
+
+def simulate(settings: SimulationSettings, seed: int) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    result = run_virtual(ReservationSimulation(settings=settings, seed=seed).run)
+    result["wall_seconds"] = round(time.perf_counter() - start_time, 3)
+    return result
+
+
+def main(settings: SimulationSettings, seeds: List[int], verbose: bool) -> int:
+    # Журнал сервиса на каждую выдачу и снятие заглушил бы отчет
+    log_level = config.logger.level
+    config.logger.setLevel(logging.DEBUG if verbose else logging.CRITICAL)
+
+    failed = []
+    try:
+        for seed in seeds:
+            result = simulate(settings=settings, seed=seed)
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+            if not result["ok"]:
+                failed.append(seed)
+
+    finally:
+        config.logger.setLevel(log_level)
+
+    print(json.dumps({"settings": asdict(settings), "seeds": len(seeds), "failed_seeds": failed}), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    defaults = SimulationSettings()
+    parser = argparse.ArgumentParser(description="Детерминированное моделирование брони документов обработчиками")
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--documents", type=int, default=defaults.documents)
+    parser.add_argument("--duration", type=float, default=defaults.duration, help="виртуальные секунды нагрузки")
+    parser.add_argument("--limit", type=int, default=defaults.limit)
+    parser.add_argument("--process-seconds", type=float, default=defaults.process_seconds)
+    parser.add_argument("--crash-rate", type=float, default=defaults.crash_rate, help="вероятность падения на документ")
+    parser.add_argument("--restart-seconds", type=float, default=defaults.restart_seconds)
+    parser.add_argument("--batch-submit-rate", type=float, default=defaults.batch_submit_rate)
+    parser.add_argument("--redis-latency", type=float, default=defaults.redis_latency)
+    parser.add_argument("--db-latency", type=float, default=defaults.db_latency)
+    parser.add_argument("--stall-rate", type=float, default=defaults.stall_rate, help="вероятность долгой паузы вызова")
+    parser.add_argument("--stall-seconds", type=float, default=defaults.stall_seconds)
+    parser.add_argument("--seed", type=int, default=1, help="первый seed")
+    parser.add_argument("--seeds", type=int, default=1, help="число seed подряд")
+    parser.add_argument("--verbose", action="store_true", help="не глушить журнал сервиса")
+    args = parser.parse_args()
+
+    sys.exit(main(
+        settings=SimulationSettings(
+            workers=args.workers,
+            documents=args.documents,
+            duration=args.duration,
+            limit=args.limit,
+            process_seconds=args.process_seconds,
+            crash_rate=args.crash_rate,
+            restart_seconds=args.restart_seconds,
+            batch_submit_rate=args.batch_submit_rate,
+            redis_latency=args.redis_latency,
+            db_latency=args.db_latency,
+            stall_rate=args.stall_rate,
+            stall_seconds=args.stall_seconds
+        ),
+        seeds=list(range(args.seed, args.seed + args.seeds)),
+        verbose=args.verbose
+    ))
@@ -1,4 +1,4 @@
 from web_app.src.core.config import get_config
-from web_app.src.core.database import setup_database, connection, engine
+from web_app.src.core.database import setup_database, connection, init_database, close_database, get_engine
 
 config = get_config()
\ No newline at end of file
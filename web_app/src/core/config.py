@@ -1,7 +1,9 @@
 # Внешние зависимости
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
 import os
+import json
 import logging
 # Внутренние модули
 from web_app.src.core.logger import setup_logger
@@ -10,17 +12,174 @@ from web_app.src.core.logger import setup_logger
 load_dotenv()
 
 
+# Режимы подбора размера выдачи для обработчика
+BATCH_SIZE_MODES = ("suggest", "enforce")
+
+# Политики очередности выдачи законопроектов на распознавание
+SCHEDULING_POLICIES = ("newest", "authority_weight", "priority", "fair_share")
+
+# Схема хранения data_legislation: обычная таблица или помесячные партиции по created_at
+PARTITIONING_MODES = ("none", "monthly")
+
+# Что делать с партицией, все записи которой выгружены
+PARTITION_RELEASE_ACTIONS = ("drop", "detach", "archive")
+
+# Пул для обработки больших данных запросов (base64, JSON) вне event loop
+PAYLOAD_EXECUTORS = ("thread", "process")
+
+# Колонки, которые стадии конвейера получают на вход и заполняют результатом
+PIPELINE_INPUTS = ("text", "binary_pdf")
+PIPELINE_OUTPUTS = ("law_number",)
+
+# Политика стадии конвейера по умолчанию
+PIPELINE_STAGE_DEFAULTS = {
+    "output": None,
+    "requires": [],
+    "lease_seconds": 600,
+    "max_attempts": 3,
+    "retry_delay_seconds": 60,
+    "concurrency": 16
+}
+PIPELINE_STAGE_LIMITS = ("lease_seconds", "max_attempts", "retry_delay_seconds", "concurrency")
+
+
+def _find_requires_cycle(stages: Dict[str, Dict[str, Any]]) -> Optional[List[str]]:
+    """Цикл в зависимостях стадий конвейера (обход в глубину) или None"""
+    finished = set()
+
+    def visit(name: str, path: List[str]) -> Optional[List[str]]:
+        if name in path:
+            return path[path.index(name):] + [name]
+        if name in finished:
+            return None
+        for required in stages[name]["requires"]:
+            cycle = visit(required, path + [name])
+            if cycle:
+                return cycle
+        finished.add(name)
+        return None
+
+    for name in stages:
+        cycle = visit(name, [])
+        if cycle:
+            return cycle
+    return None
+
+
 @dataclass
 class Config:
     _database_url: str = field(default_factory=lambda: os.getenv("DATABASE_URL"))
     _redis_url: str = field(default_factory=lambda: os.getenv("REDIS_URL"))
+    _scheduling_policy: str = field(default_factory=lambda: os.getenv("SCHEDULING_POLICY", "newest"))
+    _batch_size_mode: str = field(default_factory=lambda: os.getenv("BATCH_SIZE_MODE", "suggest"))
+    _batch_lease_seconds: int = field(default_factory=lambda: int(os.getenv("BATCH_LEASE_SECONDS", "600")))
+    _batch_min_size: int = field(default_factory=lambda: int(os.getenv("BATCH_MIN_SIZE", "1")))
+    _batch_max_size: int = field(default_factory=lambda: int(os.getenv("BATCH_MAX_SIZE", "100")))
+    _batch_ewma_alpha: float = field(default_factory=lambda: float(os.getenv("BATCH_EWMA_ALPHA", "0.3")))
+    _hedge_enabled: bool = field(default_factory=lambda: os.getenv("HEDGE_ENABLED", "true").lower() == "true")
+    _hedge_percentile: float = field(default_factory=lambda: float(os.getenv("HEDGE_PERCENTILE", "0.95")))
+    _hedge_min_samples: int = field(default_factory=lambda: int(os.getenv("HEDGE_MIN_SAMPLES", "20")))
+    _hedge_sample_size: int = field(default_factory=lambda: int(os.getenv("HEDGE_SAMPLE_SIZE", "1000")))
+    _hedge_min_age_seconds: int = field(default_factory=lambda: int(os.getenv("HEDGE_MIN_AGE_SECONDS", "60")))
+    _web_workers: int = field(default_factory=lambda: int(os.getenv("WEB_WORKERS", "1")))
+    _setup_database_on_startup: bool = field(
+        default_factory=lambda: os.getenv("SETUP_DATABASE_ON_STARTUP", "true").lower() == "true"
+    )
+    _metrics_flush_seconds: int = field(default_factory=lambda: int(os.getenv("METRICS_FLUSH_SECONDS", "5")))
+    _profiling_token: str = field(default_factory=lambda: os.getenv("PROFILING_TOKEN", ""))
+    _profiling_sample_rate: float = field(default_factory=lambda: float(os.getenv("PROFILING_SAMPLE_RATE", "0")))
+    _profiling_interval_ms: float = field(default_factory=lambda: float(os.getenv("PROFILING_INTERVAL_MS", "5")))
+    _profiling_dir: str = field(default_factory=lambda: os.getenv("PROFILING_DIR", "logs/profiles"))
+    _slow_request_ms: int = field(default_factory=lambda: int(os.getenv("SLOW_REQUEST_MS", "1000")))
+    _slow_query_ms: int = field(default_factory=lambda: int(os.getenv("SLOW_QUERY_MS", "200")))
+    _slow_log_size: int = field(default_factory=lambda: int(os.getenv("SLOW_LOG_SIZE", "100")))
+    # Пределы выборки логов по типам сообщений: {"начало текста": предел}; остальным - LOG_SAMPLE_LIMIT
+    _log_sample_limits: str = field(default_factory=lambda: os.getenv("LOG_SAMPLE_LIMITS", "{}"))
+    _stats_cache_ttl: float = field(default_factory=lambda: float(os.getenv("STATS_CACHE_TTL", "5")))
+    _stats_cache_stale_ttl: float = field(default_factory=lambda: float(os.getenv("STATS_CACHE_STALE_TTL", "30")))
+    # Лимит частоты выключен по умолчанию: у загрузок worker_id в теле, и корзина общая для всех обработчиков хоста
+    _rate_limit_per_second: float = field(default_factory=lambda: float(os.getenv("RATE_LIMIT_PER_SECOND", "0")))
+    _rate_limit_burst: int = field(default_factory=lambda: int(os.getenv("RATE_LIMIT_BURST", "40")))
+    _admission_limits: str = field(
+        default_factory=lambda: os.getenv("ADMISSION_LIMITS", "claim=4,upload=8,stats=2,export=1")
+    )
+    _admission_queue_size: int = field(default_factory=lambda: int(os.getenv("ADMISSION_QUEUE_SIZE", "32")))
+    _admission_queue_timeout: float = field(default_factory=lambda: float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")))
+    _db_pool_size: int = field(default_factory=lambda: int(os.getenv("DB_POOL_SIZE", "10")))
+    _db_max_overflow: int = field(default_factory=lambda: int(os.getenv("DB_MAX_OVERFLOW", "10")))
+    _db_pool_timeout: float = field(default_factory=lambda: float(os.getenv("DB_POOL_TIMEOUT", "10")))
+    _partitioning_mode: str = field(default_factory=lambda: os.getenv("PARTITIONING_MODE", "none"))
+    _partition_release_action: str = field(default_factory=lambda: os.getenv("PARTITION_RELEASE_ACTION", "drop"))
+    _partition_premake_months: int = field(default_factory=lambda: int(os.getenv("PARTITION_PREMAKE_MONTHS", "2")))
+    _partition_maintenance_seconds: float = field(
+        default_factory=lambda: float(os.getenv("PARTITION_MAINTENANCE_SECONDS", "3600"))
+    )
+    _partition_straggler_days: int = field(default_factory=lambda: int(os.getenv("PARTITION_STRAGGLER_DAYS", "14")))
+    _binary_spool_enabled: bool = field(
+        default_factory=lambda: os.getenv("BINARY_SPOOL_ENABLED", "false").lower() == "true"
+    )
+    _spool_dir: str = field(default_factory=lambda: os.getenv("SPOOL_DIR", "spool"))
+    _spool_flush_interval: float = field(default_factory=lambda: float(os.getenv("SPOOL_FLUSH_INTERVAL", "1")))
+    _spool_flush_batch: int = field(default_factory=lambda: int(os.getenv("SPOOL_FLUSH_BATCH", "100")))
+    _spool_segment_bytes: int = field(
+        default_factory=lambda: int(os.getenv("SPOOL_SEGMENT_BYTES", str(256 * 1024 * 1024)))
+    )
+    _payload_executor: str = field(default_factory=lambda: os.getenv("PAYLOAD_EXECUTOR", "thread"))
+    _payload_pool_size: int = field(default_factory=lambda: int(os.getenv("PAYLOAD_POOL_SIZE", "2")))
+    _payload_offload_bytes: int = field(
+        default_factory=lambda: int(os.getenv("PAYLOAD_OFFLOAD_BYTES", str(1024 * 1024)))
+    )
+    _text_layer_enabled: bool = field(
+        default_factory=lambda: os.getenv("TEXT_LAYER_ENABLED", "false").lower() == "true"
+    )
+    _text_layer_pool_size: int = field(default_factory=lambda: int(os.getenv("TEXT_LAYER_POOL_SIZE", "2")))
+    _text_layer_min_chars_per_page: int = field(
+        default_factory=lambda: int(os.getenv("TEXT_LAYER_MIN_CHARS_PER_PAGE", "200"))
+    )
+    _text_layer_sweep_seconds: float = field(
+        default_factory=lambda: float(os.getenv("TEXT_LAYER_SWEEP_SECONDS", "30"))
+    )
+    _text_layer_timeout: float = field(default_factory=lambda: float(os.getenv("TEXT_LAYER_TIMEOUT", "60")))
+    _export_dir: str = field(default_factory=lambda: os.getenv("EXPORT_DIR", "exports"))
+    _export_row_group_rows: int = field(default_factory=lambda: int(os.getenv("EXPORT_ROW_GROUP_ROWS", "10000")))
+    _export_row_group_bytes: int = field(
+        default_factory=lambda: int(os.getenv("EXPORT_ROW_GROUP_BYTES", str(128 * 1024 * 1024)))
+    )
+    _export_compression: str = field(default_factory=lambda: os.getenv("EXPORT_COMPRESSION", "zstd"))
+    _export_watermark_lag_seconds: float = field(
+        default_factory=lambda: float(os.getenv("EXPORT_WATERMARK_LAG_SECONDS", "60"))
+    )
+    # Стадии конвейера в JSON: {"law_number": {"input": "text", "output": "law_number", "concurrency": 8}}
+    _pipeline_stages: str = field(default_factory=lambda: os.getenv("PIPELINE_STAGES", "{}"))
+    _backfill_chunk_size: int = field(default_factory=lambda: int(os.getenv("BACKFILL_CHUNK_SIZE", "500")))
+    _backfill_pool_size: int = field(default_factory=lambda: int(os.getenv("BACKFILL_POOL_SIZE", "2")))
+    _backfill_rows_per_second: float = field(
+        default_factory=lambda: float(os.getenv("BACKFILL_ROWS_PER_SECOND", "0"))
+    )
+    _backfill_duty_cycle: float = field(default_factory=lambda: float(os.getenv("BACKFILL_DUTY_CYCLE", "0.5")))
+    _backfill_max_active_queries: int = field(
+        default_factory=lambda: int(os.getenv("BACKFILL_MAX_ACTIVE_QUERIES", "8"))
+    )
+    _backfill_progress_seconds: float = field(
+        default_factory=lambda: float(os.getenv("BACKFILL_PROGRESS_SECONDS", "10"))
+    )
     logger: logging.Logger = field(init=False)
 
     def __post_init__(self):
+        try:
+            sample_limits = self.LOG_SAMPLE_LIMITS
+        except ValueError:
+            # Ошибка сообщается в validate(), когда логгер уже создан
+            sample_limits = {}
+
         self.logger = setup_logger(
             level=os.getenv("LOG_LEVEL", "INFO"),
             log_dir=os.getenv("LOG_DIR", "logs"),
-            log_file=os.getenv("LOG_FILE", "web_log")
+            log_file=os.getenv("LOG_FILE", "web_log"),
+            json_format=os.getenv("LOG_FORMAT", "text").lower() == "json",
+            sample_limit=int(os.getenv("LOG_SAMPLE_LIMIT", "0")),
+            sample_window=float(os.getenv("LOG_SAMPLE_WINDOW", "60")),
+            sample_limits=sample_limits
         )
 
         self.validate()
@@ -32,6 +191,141 @@ class Config:
             self.logger.critical("DATABASE_URL is required in environment variables")
             raise ValueError("DATABASE_URL is required")
 
+        try:
+            self.LOG_SAMPLE_LIMITS
+        except ValueError:
+            self.logger.critical(
+                f"LOG_SAMPLE_LIMITS must be a JSON object of message prefixes to non-negative limits, "
+                f"got '{self._log_sample_limits}'"
+            )
+            raise ValueError("LOG_SAMPLE_LIMITS is invalid")
+
+        if self._scheduling_policy not in SCHEDULING_POLICIES:
+            self.logger.critical(
+                f"SCHEDULING_POLICY must be one of {', '.join(SCHEDULING_POLICIES)}, got '{self._scheduling_policy}'"
+            )
+            raise ValueError("SCHEDULING_POLICY is invalid")
+
+        if self._batch_size_mode not in BATCH_SIZE_MODES:
+            self.logger.critical(
+                f"BATCH_SIZE_MODE must be one of {', '.join(BATCH_SIZE_MODES)}, got '{self._batch_size_mode}'"
+            )
+            raise ValueError("BATCH_SIZE_MODE is invalid")
+
+        if not 1 <= self._batch_min_size <= self._batch_max_size:
+            self.logger.critical("BATCH_MIN_SIZE must be positive and not greater than BATCH_MAX_SIZE")
+            raise ValueError("BATCH_MIN_SIZE/BATCH_MAX_SIZE are invalid")
+
+        if not 0 < self._batch_ewma_alpha <= 1:
+            self.logger.critical("BATCH_EWMA_ALPHA must be in (0, 1]")
+            raise ValueError("BATCH_EWMA_ALPHA is invalid")
+
+        if not 0 < self._hedge_percentile < 1:
+            self.logger.critical("HEDGE_PERCENTILE must be in (0, 1)")
+            raise ValueError("HEDGE_PERCENTILE is invalid")
+
+        if self._web_workers < 1:
+            self.logger.critical("WEB_WORKERS must be positive")
+            raise ValueError("WEB_WORKERS is invalid")
+
+        try:
+            self.ADMISSION_LIMITS
+        except ValueError:
+            self.logger.critical(f"ADMISSION_LIMITS must look like 'claim=4,upload=8', got '{self._admission_limits}'")
+            raise ValueError("ADMISSION_LIMITS is invalid")
+
+        if self._partitioning_mode not in PARTITIONING_MODES:
+            self.logger.critical(
+                f"PARTITIONING_MODE must be one of {', '.join(PARTITIONING_MODES)}, got '{self._partitioning_mode}'"
+            )
+            raise ValueError("PARTITIONING_MODE is invalid")
+
+        if self._partition_release_action not in PARTITION_RELEASE_ACTIONS:
+            self.logger.critical(
+                f"PARTITION_RELEASE_ACTION must be one of {', '.join(PARTITION_RELEASE_ACTIONS)}, "
+                f"got '{self._partition_release_action}'"
+            )
+            raise ValueError("PARTITION_RELEASE_ACTION is invalid")
+
+        if self._partition_straggler_days < 0:
+            self.logger.critical("PARTITION_STRAGGLER_DAYS must not be negative")
+            raise ValueError("PARTITION_STRAGGLER_DAYS is invalid")
+
+        if self._spool_flush_interval <= 0 or self._spool_flush_batch < 1:
+            self.logger.critical("SPOOL_FLUSH_INTERVAL and SPOOL_FLUSH_BATCH must be positive")
+            raise ValueError("SPOOL_FLUSH_INTERVAL/SPOOL_FLUSH_BATCH are invalid")
+
+        if self._payload_executor not in PAYLOAD_EXECUTORS:
+            self.logger.critical(
+                f"PAYLOAD_EXECUTOR must be one of {', '.join(PAYLOAD_EXECUTORS)}, got '{self._payload_executor}'"
+            )
+            raise ValueError("PAYLOAD_EXECUTOR is invalid")
+
+        if self._payload_pool_size < 1:
+            self.logger.critical("PAYLOAD_POOL_SIZE must be positive")
+            raise ValueError("PAYLOAD_POOL_SIZE is invalid")
+
+        if self._text_layer_pool_size < 1 or self._text_layer_sweep_seconds <= 0 or self._text_layer_timeout <= 0:
+            self.logger.critical(
+                "TEXT_LAYER_POOL_SIZE, TEXT_LAYER_SWEEP_SECONDS and TEXT_LAYER_TIMEOUT must be positive"
+            )
+            raise ValueError("TEXT_LAYER_POOL_SIZE/TEXT_LAYER_SWEEP_SECONDS/TEXT_LAYER_TIMEOUT are invalid")
+
+        if self._export_row_group_rows < 1 or self._export_row_group_bytes < 1:
+            self.logger.critical("EXPORT_ROW_GROUP_ROWS and EXPORT_ROW_GROUP_BYTES must be positive")
+            raise ValueError("EXPORT_ROW_GROUP_ROWS/EXPORT_ROW_GROUP_BYTES are invalid")
+
+        try:
+            stages = self.PIPELINE_STAGES
+        except (ValueError, TypeError, AttributeError):
+            self.logger.critical(f"PIPELINE_STAGES must be a JSON object of stages, got '{self._pipeline_stages}'")
+            raise ValueError("PIPELINE_STAGES is invalid")
+
+        for name, stage in stages.items():
+            if stage.get("input") not in PIPELINE_INPUTS or stage["output"] not in (None, *PIPELINE_OUTPUTS):
+                self.logger.critical(
+                    f"Pipeline stage '{name}': input must be one of {', '.join(PIPELINE_INPUTS)}, "
+                    f"output one of {', '.join(PIPELINE_OUTPUTS)} or null"
+                )
+                raise ValueError("PIPELINE_STAGES is invalid")
+
+            requires = stage["requires"]
+            if not isinstance(requires, list) or not all(isinstance(required, str) for required in requires):
+                self.logger.critical(f"Pipeline stage '{name}': requires must be a list of stage names, got {requires}")
+                raise ValueError("PIPELINE_STAGES is invalid")
+
+            if set(requires) - set(stages) or name in requires:
+                self.logger.critical(f"Pipeline stage '{name}' requires unknown stages: {requires}")
+                raise ValueError("PIPELINE_STAGES is invalid")
+
+            # bool - подкласс int, но true в качестве лимита - ошибка конфигурации
+            if not all(type(stage[key]) is int for key in PIPELINE_STAGE_LIMITS):
+                self.logger.critical(
+                    f"Pipeline stage '{name}': {', '.join(PIPELINE_STAGE_LIMITS)} must be integers, "
+                    f"got {[stage[key] for key in PIPELINE_STAGE_LIMITS]}"
+                )
+                raise ValueError("PIPELINE_STAGES is invalid")
+
+            limits = (stage["lease_seconds"], stage["max_attempts"], stage["concurrency"])
+            if min(limits) < 1 or stage["retry_delay_seconds"] < 0:
+                self.logger.critical(f"Pipeline stage '{name}': lease, attempts and concurrency must be positive")
+                raise ValueError("PIPELINE_STAGES is invalid")
+
+        cycle = _find_requires_cycle(stages)
+        if cycle:
+            self.logger.critical(f"Pipeline stages require each other in a cycle: {' -> '.join(cycle)}")
+            raise ValueError("PIPELINE_STAGES is invalid")
+
+        if self._backfill_chunk_size < 1 or self._backfill_pool_size < 1 or self._backfill_rows_per_second < 0:
+            self.logger.critical(
+                "BACKFILL_CHUNK_SIZE and BACKFILL_POOL_SIZE must be positive, BACKFILL_ROWS_PER_SECOND not negative"
+            )
+            raise ValueError("BACKFILL_CHUNK_SIZE/BACKFILL_POOL_SIZE/BACKFILL_ROWS_PER_SECOND are invalid")
+
+        if not 0 < self._backfill_duty_cycle <= 1:
+            self.logger.critical("BACKFILL_DUTY_CYCLE must be in (0, 1]")
+            raise ValueError("BACKFILL_DUTY_CYCLE is invalid")
+
         self.logger.debug("Configuration validation passed")
 
     @property
@@ -42,8 +336,267 @@ class Config:
     def REDIS_URL(self) -> str:
         return self._redis_url
 
+    @property
+    def SCHEDULING_POLICY(self) -> str:
+        return self._scheduling_policy
+
+    @property
+    def BATCH_SIZE_MODE(self) -> str:
+        return self._batch_size_mode
+
+    @property
+    def BATCH_LEASE_SECONDS(self) -> int:
+        return self._batch_lease_seconds
+
+    @property
+    def BATCH_MIN_SIZE(self) -> int:
+        return self._batch_min_size
+
+    @property
+    def BATCH_MAX_SIZE(self) -> int:
+        return self._batch_max_size
+
+    @property
+    def BATCH_EWMA_ALPHA(self) -> float:
+        return self._batch_ewma_alpha
+
+    @property
+    def HEDGE_ENABLED(self) -> bool:
+        return self._hedge_enabled
+
+    @property
+    def HEDGE_PERCENTILE(self) -> float:
+        return self._hedge_percentile
+
+    @property
+    def HEDGE_MIN_SAMPLES(self) -> int:
+        return self._hedge_min_samples
+
+    @property
+    def HEDGE_SAMPLE_SIZE(self) -> int:
+        return self._hedge_sample_size
+
+    @property
+    def HEDGE_MIN_AGE_SECONDS(self) -> int:
+        return self._hedge_min_age_seconds
+
+    @property
+    def WEB_WORKERS(self) -> int:
+        return self._web_workers
+
+    @property
+    def SETUP_DATABASE_ON_STARTUP(self) -> bool:
+        return self._setup_database_on_startup
+
+    @property
+    def METRICS_FLUSH_SECONDS(self) -> int:
+        return self._metrics_flush_seconds
+
+    @property
+    def PROFILING_TOKEN(self) -> str:
+        return self._profiling_token
+
+    @property
+    def PROFILING_SAMPLE_RATE(self) -> float:
+        return self._profiling_sample_rate
+
+    @property
+    def PROFILING_INTERVAL_MS(self) -> float:
+        return self._profiling_interval_ms
+
+    @property
+    def PROFILING_DIR(self) -> str:
+        return self._profiling_dir
+
+    @property
+    def SLOW_REQUEST_MS(self) -> int:
+        return self._slow_request_ms
+
+    @property
+    def SLOW_QUERY_MS(self) -> int:
+        return self._slow_query_ms
+
+    @property
+    def SLOW_LOG_SIZE(self) -> int:
+        return self._slow_log_size
+
+    @property
+    def LOG_SAMPLE_LIMITS(self) -> Dict[str, int]:
+        limits = json.loads(self._log_sample_limits)
+        if not isinstance(limits, dict) or not all(
+            isinstance(limit, int) and not isinstance(limit, bool) and limit >= 0 for limit in limits.values()
+        ):
+            raise ValueError("LOG_SAMPLE_LIMITS is invalid")
+        return limits
+
+    @property
+    def STATS_CACHE_TTL(self) -> float:
+        return self._stats_cache_ttl
+
+    @property
+    def STATS_CACHE_STALE_TTL(self) -> float:
+        return self._stats_cache_stale_ttl
+
+    @property
+    def RATE_LIMIT_PER_SECOND(self) -> float:
+        return self._rate_limit_per_second
+
+    @property
+    def RATE_LIMIT_BURST(self) -> int:
+        return self._rate_limit_burst
+
+    @property
+    def ADMISSION_LIMITS(self) -> Dict[str, int]:
+        limits = {}
+        for item in filter(None, self._admission_limits.split(",")):
+            route_class, limit = item.split("=")
+            limits[route_class.strip()] = int(limit)
+        return limits
+
+    @property
+    def ADMISSION_QUEUE_SIZE(self) -> int:
+        return self._admission_queue_size
+
+    @property
+    def ADMISSION_QUEUE_TIMEOUT(self) -> float:
+        return self._admission_queue_timeout
+
+    @property
+    def DB_POOL_SIZE(self) -> int:
+        return self._db_pool_size
+
+    @property
+    def DB_MAX_OVERFLOW(self) -> int:
+        return self._db_max_overflow
+
+    @property
+    def DB_POOL_TIMEOUT(self) -> float:
+        return self._db_pool_timeout
+
+    @property
+    def PARTITIONING_MODE(self) -> str:
+        return self._partitioning_mode
+
+    @property
+    def PARTITION_RELEASE_ACTION(self) -> str:
+        return self._partition_release_action
+
+    @property
+    def PARTITION_PREMAKE_MONTHS(self) -> int:
+        return self._partition_premake_months
+
+    @property
+    def PARTITION_MAINTENANCE_SECONDS(self) -> float:
+        return self._partition_maintenance_seconds
+
+    @property
+    def PARTITION_STRAGGLER_DAYS(self) -> int:
+        return self._partition_straggler_days
+
+    @property
+    def BINARY_SPOOL_ENABLED(self) -> bool:
+        return self._binary_spool_enabled
+
+    @property
+    def SPOOL_DIR(self) -> str:
+        return self._spool_dir
+
+    @property
+    def SPOOL_FLUSH_INTERVAL(self) -> float:
+        return self._spool_flush_interval
+
+    @property
+    def SPOOL_FLUSH_BATCH(self) -> int:
+        return self._spool_flush_batch
+
+    @property
+    def SPOOL_SEGMENT_BYTES(self) -> int:
+        return self._spool_segment_bytes
+
+    @property
+    def PAYLOAD_EXECUTOR(self) -> str:
+        return self._payload_executor
+
+    @property
+    def PAYLOAD_POOL_SIZE(self) -> int:
+        return self._payload_pool_size
+
+    @property
+    def PAYLOAD_OFFLOAD_BYTES(self) -> int:
+        return self._payload_offload_bytes
+
+    @property
+    def TEXT_LAYER_ENABLED(self) -> bool:
+        return self._text_layer_enabled
+
+    @property
+    def TEXT_LAYER_POOL_SIZE(self) -> int:
+        return self._text_layer_pool_size
+
+    @property
+    def TEXT_LAYER_MIN_CHARS_PER_PAGE(self) -> int:
+        return self._text_layer_min_chars_per_page
+
+    @property
+    def TEXT_LAYER_SWEEP_SECONDS(self) -> float:
+        return self._text_layer_sweep_seconds
+
+    @property
+    def TEXT_LAYER_TIMEOUT(self) -> float:
+        return self._text_layer_timeout
+
+    @property
+    def EXPORT_DIR(self) -> str:
+        return self._export_dir
+
+    @property
+    def EXPORT_ROW_GROUP_ROWS(self) -> int:
+        return self._export_row_group_rows
+
+    @property
+    def EXPORT_ROW_GROUP_BYTES(self) -> int:
+        return self._export_row_group_bytes
+
+    @property
+    def EXPORT_COMPRESSION(self) -> str:
+        return self._export_compression
+
+    @property
+    def EXPORT_WATERMARK_LAG_SECONDS(self) -> float:
+        return self._export_watermark_lag_seconds
+
+    @property
+    def PIPELINE_STAGES(self) -> Dict[str, Dict[str, Any]]:
+        stages = json.loads(self._pipeline_stages)
+        return {name: {**PIPELINE_STAGE_DEFAULTS, **stage} for name, stage in stages.items()}
+
+    @property
+    def BACKFILL_CHUNK_SIZE(self) -> int:
+        return self._backfill_chunk_size
+
+    @property
+    def BACKFILL_POOL_SIZE(self) -> int:
+        return self._backfill_pool_size
+
+    @property
+    def BACKFILL_ROWS_PER_SECOND(self) -> float:
+        return self._backfill_rows_per_second
+
+    @property
+    def BACKFILL_DUTY_CYCLE(self) -> float:
+        return self._backfill_duty_cycle
+
+    @property
+    def BACKFILL_MAX_ACTIVE_QUERIES(self) -> int:
+        return self._backfill_max_active_queries
+
+    @property
+    def BACKFILL_PROGRESS_SECONDS(self) -> float:
+        return self._backfill_progress_seconds
+
     def __str__(self) -> str:
-        return f"Config(database={self._database_url}, redis={self._redis_url}, log_level={self.logger.level})"
+        return (f"Config(database={self._database_url}, redis={self._redis_url}, "
+                f"scheduling_policy={self._scheduling_policy}, log_level={self.logger.level})")
 
 
 _instance = None
@@ -54,4 +607,4 @@ def get_config() -> Config:
     if _instance is None:
         _instance = Config()
 
-    return _instance
\ No newline at end of file
+    return _instance
@@ -1,21 +1,58 @@
 # Внешние зависимости
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from typing import Optional
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 # Внутренние модули
 from web_app.src.core.config import get_config
-from web_app.src.models import Base
+from web_app.src.core.profiling import install_query_hooks
+from web_app.src.migrations import run_migrations
 
 
 # Получаем конфиг
 config = get_config()
-engine = create_async_engine(config.DATABASE_URL)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
-# Инициализируем таблицы
-async def setup_database():
-    config.logger.info("Инициализируем таблицы")
+# Движок и фабрика сессий создаются в lifespan каждого процесса (после fork)
+engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+
+# Создаем движок и пул соединений текущего процесса
+async def init_database():
+    global engine, AsyncSessionLocal
+
+    if engine is None:
+        config.logger.info("Инициализируем пул соединений с базой данных")
+        engine = create_async_engine(
+            config.DATABASE_URL,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT
+        )
+        install_query_hooks(engine)
+        AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+# Закрываем пул соединений текущего процесса
+async def close_database():
+    global engine, AsyncSessionLocal
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if engine is not None:
+        config.logger.info("Закрываем пул соединений с базой данных")
+        await engine.dispose()
+        engine = None
+        AsyncSessionLocal = None
+
+
+def get_engine() -> AsyncEngine:
+    if engine is None:
+        raise RuntimeError("Database engine is not initialized")
+
+    return engine
+
+
+# Приводим схему базы данных к последней версии миграций
+async def setup_database():
+    config.logger.info("Проверяем версию схемы базы данных")
+    await run_migrations(get_engine())
 
 
 # Декоратор подключения к базе данных
@@ -35,4 +72,4 @@ def connection(method):
             finally:
                 await session.close()
 
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -1,7 +1,137 @@
 # Внешние зависимости
+from typing import Dict, Optional, Tuple
+from contextvars import ContextVar
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
+import re
 import sys
+import threading
+import time
+
+
+# Контекст запроса, который добавляется в каждую запись лога
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+worker_id_var: ContextVar[Optional[int]] = ContextVar("worker_id", default=None)
+route_var: ContextVar[Optional[str]] = ContextVar("route", default=None)
+
+CONTEXT_FIELDS = ("request_id", "worker_id", "route")
+
+_listener: Optional[QueueListener] = None
+
+
+def bind_log_context(
+    request_id: Optional[str] = None,
+    worker_id: Optional[int] = None,
+    route: Optional[str] = None
+):
+    """Привязываем контекст к текущему запросу (задаче asyncio)"""
+    if request_id is not None:
+        request_id_var.set(request_id)
+    if worker_id is not None:
+        worker_id_var.set(worker_id)
+    if route is not None:
+        route_var.set(route)
+
+
+class ContextFilter(logging.Filter):
+    """Копирует контекст запроса в запись до передачи ее в фоновый поток"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.worker_id = worker_id_var.get()
+        record.route = route_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Не больше limit однотипных сообщений за окно; остальные считаются и отбрасываются.
+
+    limits задает свой предел для сообщений, текст которых (с # вместо чисел) начинается
+    с ключа; при нескольких подходящих ключах действует самый длинный. Предел 0 - без выборки
+    """
+    def __init__(self, limit: int, window: float, limits: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.limits = sorted((limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._lock = threading.Lock()
+        # Тип сообщения -> (начало окна, выведено в окне, подавлено в окне)
+        self._counters: Dict[Tuple[str, str], Tuple[float, int, int]] = {}
+
+    @staticmethod
+    def message_type(record: logging.LogRecord) -> Tuple[str, str]:
+        # Сообщения собираются f-строками: типом считаем текст без чисел
+        return record.levelname, re.sub(r"\d+", "#", str(record.msg))[:120]
+
+    def limit_for(self, text: str) -> int:
+        for prefix, limit in self.limits:
+            if text.startswith(prefix):
+                return limit
+        return self.limit
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = self.message_type(record)
+        limit = self.limit_for(key[1])
+        if limit <= 0:
+            return True
+
+        now = time.monotonic()
+
+        with self._lock:
+            window_start, emitted, suppressed = self._counters.get(key, (now, 0, 0))
+
+            if now - window_start >= self.window:
+                if suppressed:
+                    record.msg = f"{record.msg} [suppressed {suppressed} similar messages]"
+                self._counters[key] = (now, 1, 0)
+                return True
+
+            if emitted < limit:
+                self._counters[key] = (window_start, emitted + 1, suppressed)
+                return True
+
+            self._counters[key] = (window_start, emitted, suppressed + 1)
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Структурированный вывод: одна запись - один JSON-объект"""
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+
+        return json.dumps(data, ensure_ascii=False)
+
+
+class ContextFormatter(logging.Formatter):
+    """Текстовый вывод с контекстом запроса, если он есть"""
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        context = " ".join(
+            f"{name}={getattr(record, name)}"
+            for name in CONTEXT_FIELDS
+            if getattr(record, name, None) is not None
+        )
+        return f"{message} [{context}]" if context else message
+
+
+def stop_logger():
+    """Дописываем очередь и останавливаем фоновый поток логирования"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logger(
@@ -9,8 +139,13 @@ def setup_logger(
         level: str = "INFO",
         format_str: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         log_dir: str = 'logs',
-        log_file: str = 'web_log'
+        log_file: str = 'web_log',
+        json_format: bool = False,
+        sample_limit: int = 0,
+        sample_window: float = 60,
+        sample_limits: Optional[Dict[str, int]] = None
 ) -> logging.Logger:
+    global _listener
     logger = logging.getLogger(name)
 
     if logger.handlers:
@@ -21,12 +156,11 @@ def setup_logger(
     logger.setLevel(numeric_level)
 
     # Форматтер
-    formatter = logging.Formatter(format_str)
+    formatter = JsonFormatter() if json_format else ContextFormatter(format_str)
 
     # Обработчик для stdout
     stdout_handler = logging.StreamHandler(sys.stdout)
     stdout_handler.setFormatter(formatter)
-    logger.addHandler(stdout_handler)
 
     file_handler = RotatingFileHandler(
         filename=f'{log_dir}/{log_file}.log',
@@ -36,6 +170,19 @@ def setup_logger(
     )
 
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
-    return logger
\ No newline at end of file
+    # Запись в файл и ротация выполняются в фоновом потоке, а не в event loop
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    if sample_limit > 0 or any(limit > 0 for limit in (sample_limits or {}).values()):
+        queue_handler.addFilter(SamplingFilter(limit=sample_limit, window=sample_window, limits=sample_limits))
+
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, stdout_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logger)
+
+    return logger
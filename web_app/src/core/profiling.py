@@ -0,0 +1,145 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Optional
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import os
+import sys
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+# Внутренние модули
+from web_app.src.core.config import get_config
+
+
+config = get_config()
+
+# Разбивка времени текущего запроса по компонентам (БД, ожидание блокировки, кодирование)
+request_timings_var: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+# Последние медленные запросы и SQL-запросы текущего процесса
+slow_requests: deque = deque(maxlen=config.SLOW_LOG_SIZE)
+slow_queries: deque = deque(maxlen=config.SLOW_LOG_SIZE)
+
+# Профилировщик сэмплирует весь event loop, поэтому одновременно работает только один
+_profiler_lock = threading.Lock()
+
+
+def add_timing(component: str, seconds: float):
+    timings = request_timings_var.get()
+    if timings is not None:
+        timings[component] = timings.get(component, 0.0) + seconds
+
+
+@contextmanager
+def timed(component: str):
+    """Учитываем время блока в разбивке текущего запроса"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(component, time.perf_counter() - start_time)
+
+
+def _summarize_value(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes len={len(value)}>"
+    if isinstance(value, str) and len(value) > 64:
+        return f"<str len={len(value)}>"
+    if isinstance(value, (list, tuple)) and len(value) > 8:
+        return f"<{type(value).__name__} len={len(value)}>"
+    return repr(value)[:64]
+
+
+def summarize_parameters(parameters: Any) -> Any:
+    """Краткое описание параметров запроса без содержимого документов"""
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<executemany rows={len(parameters)}>"
+        return [_summarize_value(value) for value in parameters]
+
+    if isinstance(parameters, dict):
+        return {key: _summarize_value(value) for key, value in parameters.items()}
+
+    return _summarize_value(parameters)
+
+
+# Журнал медленных SQL-запросов на событиях курсора
+def install_query_hooks(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        add_timing("db", duration)
+
+        if duration * 1000 >= config.SLOW_QUERY_MS:
+            slow_queries.append({
+                "time": datetime.now().isoformat(),
+                "duration_ms": round(duration * 1000, 2),
+                "statement": statement[:2000],
+                "parameters": summarize_parameters(parameters)
+            })
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик потока event loop в формате collapsed stacks"""
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._target_thread = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        return ";".join(reversed(names))
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    def start(self) -> bool:
+        if not _profiler_lock.acquire(blocking=False):
+            return False
+
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self._thread.join()
+        _profiler_lock.release()
+        return self.stacks
+
+
+def write_folded(stacks: Counter, path: str):
+    """Запись в формате flamegraph.pl / speedscope: 'frame;frame;frame count'"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as file:
+        for stack, count in stacks.most_common():
+            file.write(f"{stack} {count}\n")
+
+
+def get_slow_log(limit: int) -> Dict[str, List[dict]]:
+    return {
+        "process_id": os.getpid(),
+        "requests": list(slow_requests)[-limit:][::-1],
+        "queries": list(slow_queries)[-limit:][::-1]
+    }
@@ -1,3 +1,13 @@
 from web_app.src.crud.legislation import (sql_get_info, sql_get_free_legislation, sql_update_text, sql_update_binary,
                                           sql_valid_legislation_ids_from_worker, sql_get_legislation_by_not_binary_pdf,
-                                          sql_get_ready_legislation, sql_delete_ready_legislation)
\ No newline at end of file
+                                          sql_get_ready_legislation, sql_delete_ready_legislation, sql_update_priority,
+                                          sql_update_authority_weight, sql_get_queued_legislation,
+                                          sql_update_texts, sql_update_binaries, sql_claim_text_layer_batch)
+from web_app.src.crud.partitions import (sql_ensure_partitions, sql_release_exported_partitions,
+                                         sql_get_partition_stats, sql_get_pinned_partitions)
+from web_app.src.crud.export import sql_get_export_watermark, sql_to_database_time, sql_stream_export_rows
+from web_app.src.crud.pipeline import (sql_claim_pipeline_batch, sql_complete_pipeline_items, sql_fail_pipeline_items,
+                                       sql_release_pipeline_leases, sql_get_pipeline_stats)
+from web_app.src.crud.backfill import (sql_get_backfill_checkpoint, sql_reset_backfill_checkpoint, sql_get_backfill_chunk,
+                                       sql_apply_backfill_chunk, sql_finish_backfill, sql_get_max_legislation_id,
+                                       sql_count_active_queries)
\ No newline at end of file
@@ -0,0 +1,151 @@
+# Внешние зависимости
+from typing import Dict, List, Tuple
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+# Внутренние модули
+from web_app.src.core import config, connection
+from web_app.src.models import DataLegislation, BackfillCheckpoint
+
+
+# Ожидание блокировки строки, занятой рабочим путем: пачка откладывается, а не держит очередь
+BACKFILL_LOCK_TIMEOUT = "2s"
+
+
+# Контрольная точка заполнения (создается при первом запуске)
+@connection
+async def sql_get_backfill_checkpoint(name: str, session: AsyncSession) -> BackfillCheckpoint:
+    try:
+        await session.execute(insert(BackfillCheckpoint).values(name=name).on_conflict_do_nothing())
+        await session.commit()
+
+        return await session.scalar(sa.select(BackfillCheckpoint).where(BackfillCheckpoint.name == name))
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error get backfill checkpoint {name}: {e}")
+        raise
+
+
+# Начинаем заполнение заново с первого id
+@connection
+async def sql_reset_backfill_checkpoint(name: str, session: AsyncSession):
+    try:
+        await session.execute(sa.delete(BackfillCheckpoint).where(BackfillCheckpoint.name == name))
+        await session.commit()
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error reset backfill checkpoint {name}: {e}")
+        raise
+
+
+# Следующая пачка по ключу id: документы с исходной колонкой и пустой целевой
+@connection
+async def sql_get_backfill_chunk(
+    source: sa.Column,
+    target: sa.Column,
+    after_id: int,
+    limit: int,
+    session: AsyncSession
+) -> List[Tuple[int, str]]:
+    try:
+        result = await session.execute(
+            sa.select(DataLegislation.id, source)
+            .where(DataLegislation.id > after_id, source.isnot(None), target.is_(None))
+            .order_by(DataLegislation.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error get backfill chunk after {after_id}: {e}")
+        raise
+
+
+# Записываем результаты пачки одним UPDATE ... FROM (VALUES ...) и сдвигаем контрольную точку
+# в той же транзакции: после сбоя пачка либо записана вместе с отметкой, либо повторится
+@connection
+async def sql_apply_backfill_chunk(
+    name: str,
+    target: sa.Column,
+    values: Dict[int, str],
+    last_id: int,
+    scanned: int,
+    session: AsyncSession
+) -> int:
+    try:
+        await session.execute(sa.text(f"SET LOCAL lock_timeout = '{BACKFILL_LOCK_TIMEOUT}'"))
+
+        updated = 0
+        if values:
+            new_values = (
+                sa.values(sa.column("id", sa.Integer), sa.column("value", sa.Text), name="backfill")
+                .data(list(values.items()))
+            )
+            # Значение, записанное рабочим путем во время заполнения, не перезаписывается
+            result = await session.execute(
+                sa.update(DataLegislation)
+                .where(DataLegislation.id == new_values.c.id, target.is_(None))
+                .values({target: new_values.c.value})
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.rowcount
+
+        await session.execute(
+            sa.update(BackfillCheckpoint)
+            .where(BackfillCheckpoint.name == name)
+            .values(
+                last_id=last_id,
+                scanned=BackfillCheckpoint.scanned + scanned,
+                updated=BackfillCheckpoint.updated + updated,
+                updated_at=sa.func.now()
+            )
+        )
+        await session.commit()
+
+        return updated
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error apply backfill chunk up to {last_id}: {e}")
+        raise
+
+
+@connection
+async def sql_finish_backfill(name: str, session: AsyncSession):
+    try:
+        await session.execute(
+            sa.update(BackfillCheckpoint)
+            .where(BackfillCheckpoint.name == name)
+            .values(finished_at=sa.func.now(), updated_at=sa.func.now())
+        )
+        await session.commit()
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error finish backfill {name}: {e}")
+        raise
+
+
+# Граница прохода для оценки прогресса
+@connection
+async def sql_get_max_legislation_id(session: AsyncSession) -> int:
+    try:
+        return await session.scalar(sa.select(sa.func.coalesce(sa.func.max(DataLegislation.id), 0)))
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error get max legislation id: {e}")
+        raise
+
+
+# Число выполняющихся запросов других сеансов этой базы: признак нагрузки рабочего пути
+@connection
+async def sql_count_active_queries(session: AsyncSession) -> int:
+    try:
+        return await session.scalar(sa.text(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND state = 'active' AND pid <> pg_backend_pid() "
+            "AND backend_type = 'client backend'"
+        ))
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error count active queries: {e}")
+        raise
\ No newline at end of file
@@ -0,0 +1,82 @@
+# Внешние зависимости
+from typing import AsyncIterator, List, Optional
+from datetime import datetime
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+# Внутренние модули
+from web_app.src.core import config, get_engine
+from web_app.src.models import DataLegislation, Authority
+
+
+# Колонки выгрузки по порядку; PDF по умолчанию не выгружается, остается ссылка link_pdf
+EXPORT_COLUMNS = (
+    DataLegislation.id,
+    DataLegislation.name,
+    DataLegislation.publication_number,
+    DataLegislation.publication_date,
+    DataLegislation.law_number,
+    DataLegislation.authority_id,
+    Authority.name.label("authority_name"),
+    DataLegislation.priority,
+    DataLegislation.link_pdf,
+    DataLegislation.created_at,
+    DataLegislation.text_updated_at,
+    DataLegislation.text
+)
+
+
+async def sql_get_export_watermark(lag_seconds: float) -> datetime:
+    """Верхняя граница выгрузки по часам БД: транзакции, записавшие текст раньше, уже завершены"""
+    try:
+        async with get_engine().connect() as conn:
+            return await conn.scalar(
+                sa.select(sa.cast(sa.func.now(), sa.DateTime) - sa.func.make_interval(0, 0, 0, 0, 0, 0, lag_seconds))
+            )
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error reading export watermark: {e}")
+        raise
+
+
+async def sql_to_database_time(value: datetime) -> datetime:
+    """Время с часовым поясом в часах БД: timestamp без пояса, как text_updated_at и водяной знак"""
+    try:
+        async with get_engine().connect() as conn:
+            return await conn.scalar(sa.select(sa.cast(sa.literal(value, sa.DateTime(timezone=True)), sa.DateTime)))
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error converting export time: {e}")
+        raise
+
+
+async def sql_stream_export_rows(
+    since: Optional[datetime],
+    until: datetime,
+    include_pdf: bool,
+    batch_size: int
+) -> AsyncIterator[List[sa.Row]]:
+    """Записи с текстом, записанным в (since, until], пачками через серверный курсор"""
+    columns = [*EXPORT_COLUMNS, DataLegislation.binary_pdf] if include_pdf else list(EXPORT_COLUMNS)
+    query = (
+        sa.select(*columns)
+        .join(Authority, Authority.id == DataLegislation.authority_id)
+        .where(
+            DataLegislation.text.isnot(None),
+            DataLegislation.text_updated_at.isnot(None),
+            DataLegislation.text_updated_at <= until
+        )
+        .order_by(DataLegislation.text_updated_at, DataLegislation.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if since is not None:
+        query = query.where(DataLegislation.text_updated_at > since)
+
+    try:
+        async with get_engine().connect() as conn:
+            result = await conn.stream(query)
+            async for rows in result.partitions():
+                yield rows
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error streaming export rows: {e}")
+        raise
\ No newline at end of file
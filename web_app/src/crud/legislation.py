@@ -1,21 +1,15 @@
 # Внешние зависимости
-from typing import Dict, List
-import base64
+from typing import Dict, List, Tuple
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, NoResultFound
 from fastapi import HTTPException, status
 # Внутренние модули
 from web_app.src.core import config, connection
-from web_app.src.models import DataLegislation
-from web_app.src.schemas import SchemeBinaryLegislation, SchemeNumberLegislation, SchemeReadyLegislation
-
-
-def get_binary_bytes(binary: str) -> bytes:
-    try:
-        return base64.b64decode(binary)
-    except Exception:
-        raise ValueError("Invalid base64 string")
+from web_app.src.models import (Authority, DataLegislation, QUEUE_CONDITION, READY_CONDITION,
+                               TEXT_LAYER_PENDING_CONDITION)
+from web_app.src.crud.scheduling import build_free_legislation_query
+from web_app.src.schemas import SchemeFreeLegislation, SchemeNumberLegislation, SchemeReadyLegislation
 
 
 # Выводим статистику по данным
@@ -28,6 +22,7 @@ async def sql_get_info(session: AsyncSession) -> Dict[str, int]:
                 sa.func.count(DataLegislation.binary_pdf).label('has_binary_pdf'),
                 sa.func.count(DataLegislation.text).label('has_text')
             )
+            .where(DataLegislation.exported_at == None)
         )
         stats = stats_result.first()
 
@@ -52,21 +47,20 @@ async def sql_get_free_legislation(
         reservation_legislation_ids: List[int],
         limit: int,
         session: AsyncSession
-) -> List[SchemeBinaryLegislation]:
+) -> List[SchemeFreeLegislation]:
     try:
         legislation_result = await session.execute(
-            sa.select(DataLegislation.id, DataLegislation.binary_pdf)
-            .where(
-                DataLegislation.id.notin_(reservation_legislation_ids),
-                DataLegislation.binary_pdf != None,
-                DataLegislation.text == None
+            build_free_legislation_query(
+                policy=config.SCHEDULING_POLICY,
+                reservation_legislation_ids=reservation_legislation_ids,
+                limit=limit,
+                require_text_layer_check=config.TEXT_LAYER_ENABLED
             )
-            .limit(limit)
         )
         legislation = legislation_result.all()
 
         return [
-            SchemeBinaryLegislation(
+            SchemeFreeLegislation(
                 id=legislation_id,
                 binary=legislation_binary
             )
@@ -110,22 +104,37 @@ async def sql_valid_legislation_ids_from_worker(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
 
 
-# Записываем текст PDf файла
+# Записываем текст PDf файла (побеждает первый записавший)
 @connection
 async def sql_update_text(
     legislation_id: int,
     content: str,
     session: AsyncSession
-) -> None:
+) -> bool:
     try:
         legislation_results = await session.execute(
-            sa.select(DataLegislation)
-            .where(DataLegislation.id == legislation_id)
+            sa.update(DataLegislation)
+            .where(
+                DataLegislation.id == legislation_id,
+                DataLegislation.text == None
+            )
+            .values(text=content, text_updated_at=sa.func.now())
+            .returning(DataLegislation.id)
+            .execution_options(synchronize_session=False)
         )
 
-        legislation = legislation_results.scalar_one()
-        legislation.text = content
-        await session.commit()
+        if legislation_results.scalar_one_or_none() is not None:
+            await session.commit()
+            return True
+
+        # Текст уже записан (переизданный документ) или записи нет
+        exists_result = await session.execute(
+            sa.select(sa.exists().where(DataLegislation.id == legislation_id))
+        )
+        if not exists_result.scalar():
+            raise NoResultFound()
+
+        return False
 
     except NoResultFound:
         config.logger.error(f"Legislation not found by legislation id: {legislation_id}")
@@ -140,6 +149,145 @@ async def sql_update_text(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
 
 
+# Записываем пакет текстов одним запросом (побеждает первый записавший):
+# возвращаем записанные id и id, которых нет в базе
+@connection
+async def sql_update_texts(
+    texts: Dict[int, str],
+    session: AsyncSession
+) -> Tuple[List[int], List[int]]:
+    try:
+        values = (
+            sa.values(sa.column("id", sa.Integer), sa.column("text", sa.Text), name="new_text")
+            .data(list(texts.items()))
+        )
+
+        applied_result = await session.execute(
+            sa.update(DataLegislation)
+            .where(
+                DataLegislation.id == values.c.id,
+                DataLegislation.text == None
+            )
+            .values(text=values.c.text, text_updated_at=sa.func.now())
+            .returning(DataLegislation.id)
+            .execution_options(synchronize_session=False)
+        )
+        applied_ids = applied_result.scalars().all()
+        await session.commit()
+
+        rest_ids = set(texts) - set(applied_ids)
+        missing_ids = []
+
+        if rest_ids:
+            existing_result = await session.execute(
+                sa.select(DataLegislation.id).where(DataLegislation.id.in_(rest_ids))
+            )
+            missing_ids = sorted(rest_ids - set(existing_result.scalars().all()))
+
+        return list(applied_ids), missing_ids
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error update texts: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error update texts: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Выдаем забронированные законопроекты, которые все еще ждут распознавания
+@connection
+async def sql_get_queued_legislation(
+    legislation_ids: List[int],
+    session: AsyncSession
+) -> List[SchemeFreeLegislation]:
+    try:
+        legislation_result = await session.execute(
+            sa.select(DataLegislation.id, DataLegislation.binary_pdf)
+            .where(
+                DataLegislation.id.in_(legislation_ids),
+                QUEUE_CONDITION
+            )
+        )
+        legislation = legislation_result.all()
+
+        return [
+            SchemeFreeLegislation(
+                id=legislation_id,
+                binary=legislation_binary
+            )
+            for (legislation_id, legislation_binary) in legislation
+        ]
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error reading queued legislation: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error reading queued legislation: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Выставляем приоритет распознавания законопроектов
+@connection
+async def sql_update_priority(
+    legislation_ids: List[int],
+    priority: int,
+    session: AsyncSession
+) -> int:
+    try:
+        result = await session.execute(
+            sa.update(DataLegislation)
+            .where(DataLegislation.id.in_(legislation_ids))
+            .values(priority=priority)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        return result.rowcount
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error update priority: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error update priority: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Выставляем вес органа власти в очереди распознавания
+@connection
+async def sql_update_authority_weight(
+    authority_id: int,
+    priority_weight: int,
+    session: AsyncSession
+) -> None:
+    try:
+        result = await session.execute(
+            sa.update(Authority)
+            .where(Authority.id == authority_id)
+            .values(priority_weight=priority_weight)
+            .execution_options(synchronize_session=False)
+        )
+
+        if result.rowcount == 0:
+            raise NoResultFound()
+
+        await session.commit()
+
+    except NoResultFound:
+        config.logger.error(f"Authority not found by authority_id: {authority_id}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Authority not found")
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error update authority weight: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error update authority weight: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
 # Выводим все законы, у которых нет байт-кода PDF файла
 @connection
 async def sql_get_legislation_by_not_binary_pdf(
@@ -173,17 +321,19 @@ async def sql_get_legislation_by_not_binary_pdf(
 @connection
 async def sql_update_binary(
         legislation_id: int,
-        content: str,
+        content: bytes,
         session: AsyncSession
 ) -> None:
     try:
         legislation_results = await session.execute(
-            sa.select(DataLegislation)
+            sa.update(DataLegislation)
             .where(DataLegislation.id == legislation_id)
+            .values(binary_pdf=content)
+            .returning(DataLegislation.id)
+            .execution_options(synchronize_session=False)
         )
 
-        legislation = legislation_results.scalar_one()
-        legislation.binary_pdf = get_binary_bytes(content)
+        legislation_results.scalar_one()
         await session.commit()
 
     except NoResultFound:
@@ -199,16 +349,72 @@ async def sql_update_binary(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
 
 
+# Записываем пакет бинарных данных из спула одним запросом: возвращаем обновленные id
+@connection
+async def sql_update_binaries(
+    binaries: Dict[int, bytes],
+    session: AsyncSession
+) -> List[int]:
+    try:
+        values = (
+            sa.values(sa.column("id", sa.Integer), sa.column("binary_pdf", sa.LargeBinary), name="new_binary")
+            .data(list(binaries.items()))
+        )
+
+        updated_result = await session.execute(
+            sa.update(DataLegislation)
+            .where(DataLegislation.id == values.c.id)
+            .values(binary_pdf=values.c.binary_pdf)
+            .returning(DataLegislation.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated_ids = updated_result.scalars().all()
+        await session.commit()
+
+        return list(updated_ids)
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error update binaries: {e}")
+        raise
+
+
+# Забираем пачку документов на проверку текстового слоя. Отметка ставится сразу:
+# если процесс упадет посреди извлечения, документ уйдет в OCR, а не зависнет
+@connection
+async def sql_claim_text_layer_batch(limit: int, session: AsyncSession) -> List[Tuple[int, bytes]]:
+    try:
+        pending_ids = (
+            sa.select(DataLegislation.id)
+            .where(TEXT_LAYER_PENDING_CONDITION)
+            .order_by(DataLegislation.id.desc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        claimed_result = await session.execute(
+            sa.update(DataLegislation)
+            .where(DataLegislation.id.in_(pending_ids.scalar_subquery()))
+            .values(text_layer_checked_at=sa.func.now())
+            .returning(DataLegislation.id, DataLegislation.binary_pdf)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = claimed_result.all()
+        await session.commit()
+
+        return [(legislation_id, binary_pdf) for (legislation_id, binary_pdf) in claimed]
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error claiming text layer batch: {e}")
+        raise
+
+
 # Выдаем готовые к выгрузке данные законопроектов для обработки
 @connection
 async def sql_get_ready_legislation(limit: int, session: AsyncSession) -> List[SchemeReadyLegislation]:
     try:
         legislation_result = await session.execute(
             sa.select(DataLegislation.id, DataLegislation.binary_pdf, DataLegislation.text)
-            .where(
-                DataLegislation.binary_pdf != None,
-                DataLegislation.text != None
-            )
+            .where(READY_CONDITION)
             .limit(limit)
         )
         legislation = legislation_result.all()
@@ -238,14 +444,22 @@ async def sql_delete_ready_legislation(
     session: AsyncSession
 ) -> int:
     try:
-        result = await session.execute(
-            sa.delete(DataLegislation)
-            .where(
-                DataLegislation.id.in_(legislation_ids),
-                DataLegislation.binary_pdf != None,
-                DataLegislation.text != None
+        if config.PARTITIONING_MODE == "monthly":
+            # Только отметка: место освобождается целыми партициями (crud/partitions.py),
+            # а TOAST с документами при таком UPDATE не переписывается
+            statement = (
+                sa.update(DataLegislation)
+                .where(DataLegislation.id.in_(legislation_ids), READY_CONDITION)
+                .values(exported_at=sa.func.now())
             )
-        )
+
+        else:
+            statement = (
+                sa.delete(DataLegislation)
+                .where(DataLegislation.id.in_(legislation_ids), READY_CONDITION)
+            )
+
+        result = await session.execute(statement.execution_options(synchronize_session=False))
         await session.commit()
 
         return result.rowcount
@@ -0,0 +1,237 @@
+# Внешние зависимости
+from typing import Dict, List
+from datetime import date, timedelta
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException, status
+# Внутренние модули
+from web_app.src.core import config, connection
+from web_app.src.migrations.partitioning import (LEGISLATION_TABLE, ARCHIVE_TABLE, DEFAULT_PARTITION, KEYS_TABLE,
+                                                 is_partitioned, get_partitions, partition_month, month_start,
+                                                 create_month_partition, create_default_partition)
+
+
+# Ключ advisory-блокировки обслуживания партиций: одновременно работает один процесс
+PARTITION_LOCK_ID = 0x70617274
+
+
+async def _acquire_maintenance_lock(session: AsyncSession) -> bool:
+    # Долгое ожидание блокировки родительской таблицы не должно останавливать запросы обработчиков
+    await session.execute(sa.text("SET LOCAL lock_timeout = '5s'"))
+    acquired = await session.scalar(sa.select(sa.func.pg_try_advisory_xact_lock(PARTITION_LOCK_ID)))
+    return bool(acquired)
+
+
+def _straggler_deadline(month: date) -> date:
+    """С этого дня невыгруженные записи месяца переносятся в партицию по умолчанию"""
+    return month_start(month, 1) + timedelta(days=config.PARTITION_STRAGGLER_DAYS)
+
+
+# Создаем партиции текущего и следующих месяцев
+@connection
+async def sql_ensure_partitions(premake_months: int, session: AsyncSession) -> List[str]:
+    try:
+        conn = await session.connection()
+
+        if not await is_partitioned(conn):
+            config.logger.error(
+                f"PARTITIONING_MODE is monthly, but {LEGISLATION_TABLE} is not partitioned: "
+                f"run 'python -m web_app.partitions convert'"
+            )
+            return []
+
+        if not await _acquire_maintenance_lock(session):
+            return []
+
+        existing = set(await get_partitions(conn))
+        current_month = month_start(date.today())
+        created = []
+
+        for shift in range(premake_months + 1):
+            name = await create_month_partition(conn=conn, month=month_start(current_month, shift))
+            if name not in existing:
+                created.append(name)
+
+        await create_default_partition(conn)
+        await session.commit()
+
+        if created:
+            config.logger.info(f"Created partitions: {', '.join(created)}")
+
+        return created
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error creating partitions: {e}")
+        raise
+
+
+# Освобождаем прошедшие месяцы, все записи которых выгружены. Отдельные невыгруженные записи
+# (PDF не скачан, текст не распознан) не держат месяц вечно: после PARTITION_STRAGGLER_DAYS
+# они переносятся в партицию по умолчанию и обрабатываются там как обычно
+@connection
+async def sql_release_exported_partitions(action: str, session: AsyncSession) -> List[str]:
+    try:
+        conn = await session.connection()
+
+        if not await is_partitioned(conn) or not await _acquire_maintenance_lock(session):
+            return []
+
+        today = date.today()
+        current_month = month_start(today)
+        released = []
+        moved = 0
+
+        for name in await get_partitions(conn):
+            month = partition_month(name)
+            if month is None or month_start(month, 1) > current_month:
+                continue
+
+            has_pending = await session.scalar(sa.text(
+                f"SELECT EXISTS (SELECT 1 FROM {name} WHERE exported_at IS NULL)"
+            ))
+            if has_pending and _straggler_deadline(month) > today:
+                continue
+
+            # DROP/DETACH не вызывают триггеры: освобождаем ключи, как при удалении записей
+            await session.execute(sa.text(
+                f"DELETE FROM {KEYS_TABLE} k USING {name} p WHERE k.name_hash = p.name_hash"
+            ))
+
+            if has_pending or action != "drop":
+                await session.execute(sa.text(f"ALTER TABLE {LEGISLATION_TABLE} DETACH PARTITION {name}"))
+
+            if has_pending:
+                # Месяца в таблице больше нет: записи попадают в партицию по умолчанию и снова
+                # регистрируют ключи, а у отсоединенной партиции триггеров родителя уже нет
+                result = await session.execute(sa.text(
+                    f"INSERT INTO {LEGISLATION_TABLE} SELECT * FROM {name} WHERE exported_at IS NULL"
+                ))
+                await session.execute(sa.text(f"DELETE FROM {name} WHERE exported_at IS NULL"))
+                moved += result.rowcount
+
+            if action == "drop":
+                await session.execute(sa.text(f"DROP TABLE {name}"))
+
+            elif action == "archive":
+                # Партиция переносится в архив целиком, без копирования строк
+                await session.execute(sa.text(
+                    f"CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (LIKE {LEGISLATION_TABLE}) "
+                    f"PARTITION BY RANGE (created_at)"
+                ))
+                await session.execute(sa.text(
+                    f"ALTER TABLE {ARCHIVE_TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+                ))
+
+            released.append(name)
+
+        if action == "drop":
+            # Перенесенные записи после выгрузки удаляются по одной: партицию по умолчанию не освободить целиком
+            await session.execute(sa.text(f"DELETE FROM {DEFAULT_PARTITION} WHERE exported_at IS NOT NULL"))
+
+        await session.commit()
+
+        if moved:
+            config.logger.warning(f"Moved {moved} unexported rows of released partitions to {DEFAULT_PARTITION}")
+
+        if released:
+            config.logger.info(f"Released exported partitions ({action}): {', '.join(released)}")
+
+        return released
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error releasing exported partitions: {e}")
+        raise
+
+
+# Прошедшие месяцы, которые не освобождаются из-за невыгруженных записей
+@connection
+async def sql_get_pinned_partitions(session: AsyncSession) -> List[Dict]:
+    try:
+        conn = await session.connection()
+
+        if not await is_partitioned(conn):
+            return []
+
+        current_month = month_start(date.today())
+        pinned = []
+
+        for name in await get_partitions(conn):
+            month = partition_month(name)
+            if month is None or month_start(month, 1) > current_month:
+                continue
+
+            unexported = await session.scalar(sa.text(f"SELECT count(*) FROM {name} WHERE exported_at IS NULL"))
+            if unexported:
+                pinned.append({
+                    "name": name,
+                    "unexported": unexported,
+                    "moved_after": _straggler_deadline(month).isoformat()
+                })
+
+        return pinned
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error reading pinned partitions: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+
+# Выводим статистику по партициям data_legislation
+@connection
+async def sql_get_partition_stats(session: AsyncSession) -> dict:
+    try:
+        conn = await session.connection()
+        partitioned = await is_partitioned(conn)
+
+        # Флаги NULL читаются из заголовка строки, TOAST с документами не затрагивается
+        counts_result = await session.execute(sa.text(
+            f"SELECT tableoid::regclass::text AS name, count(*) AS total, "
+            f"count(*) FILTER (WHERE binary_pdf IS NOT NULL AND text IS NULL) AS queued, "
+            f"count(*) FILTER (WHERE text IS NOT NULL AND exported_at IS NULL) AS ready, "
+            f"count(exported_at) AS exported "
+            f"FROM {LEGISLATION_TABLE} GROUP BY tableoid"
+        ))
+        counts = {row.name: row for row in counts_result.all()}
+
+        relations_result = await session.execute(
+            sa.text(
+                "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bounds, "
+                "pg_total_relation_size(c.oid) AS total_bytes "
+                "FROM pg_class c WHERE c.oid = to_regclass(:table) AND NOT :partitioned "
+                "UNION ALL "
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), pg_total_relation_size(c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:table) "
+                "ORDER BY 1"
+            ),
+            {"table": LEGISLATION_TABLE, "partitioned": partitioned}
+        )
+
+        partitions = []
+        for relation in relations_result.all():
+            row = counts.get(relation.name)
+            partitions.append({
+                "name": relation.name,
+                "bounds": relation.bounds,
+                "total_bytes": relation.total_bytes,
+                "total": row.total if row else 0,
+                "queued": row.queued if row else 0,
+                "ready": row.ready if row else 0,
+                "exported": row.exported if row else 0
+            })
+
+        return {
+            "partitioning_mode": config.PARTITIONING_MODE,
+            "partitioned": partitioned,
+            "partitions": partitions,
+            "archive": await get_partitions(conn, table=ARCHIVE_TABLE)
+        }
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error reading partition statistics: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error reading partition statistics: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
@@ -0,0 +1,331 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Tuple
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException, status
+# Внутренние модули
+from web_app.src.core import config, connection
+from web_app.src.models import (DataLegislation, PipelineLease, PipelineStage, LEASE_LEASED, LEASE_RETRY, LEASE_DONE,
+                                LEASE_FAILED)
+
+
+# Первый ключ advisory-блокировки выдачи стадии, второй - hashtext(имя стадии)
+PIPELINE_LOCK_ID = 0x70697065
+# Предельная задержка повтора после ошибки
+MAX_RETRY_DELAY_SECONDS = 24 * 3600
+
+OPEN_STATUSES = (LEASE_LEASED, LEASE_RETRY)
+
+
+def _seconds(value: Any) -> sa.ColumnElement:
+    return sa.func.make_interval(0, 0, 0, 0, 0, 0, value)
+
+
+def _blocking_lease(stage: PipelineStage) -> sa.ColumnElement:
+    # Документ занят: стадия выполнена, попытки исчерпаны или аренда/пауза повтора еще не истекла
+    return sa.exists().where(
+        PipelineLease.stage == stage.name,
+        PipelineLease.legislation_id == DataLegislation.id,
+        sa.or_(
+            PipelineLease.status.in_((LEASE_DONE, LEASE_FAILED)),
+            PipelineLease.available_at > sa.func.now()
+        )
+    )
+
+
+# Выдаем обработчику пачку документов стадии: аренда на lease_seconds, не больше concurrency аренд на стадию;
+# возвращаем (id, вход стадии) и число документов, исчерпавших попытки
+@connection
+async def sql_claim_pipeline_batch(
+    stage: PipelineStage,
+    worker: str,
+    limit: int,
+    session: AsyncSession
+) -> Tuple[List[sa.Row], int]:
+    try:
+        # Выдача стадии последовательна между процессами, поэтому лимит параллельности не превышается
+        await session.execute(sa.select(sa.func.pg_advisory_xact_lock(PIPELINE_LOCK_ID, sa.func.hashtext(stage.name))))
+
+        # Аренды, истекшие на последней попытке, больше не выдаются
+        exhausted_result = await session.execute(
+            sa.update(PipelineLease)
+            .where(
+                PipelineLease.stage == stage.name,
+                PipelineLease.status.in_(OPEN_STATUSES),
+                PipelineLease.available_at <= sa.func.now(),
+                PipelineLease.attempts >= stage.max_attempts
+            )
+            .values(status=LEASE_FAILED, worker=None, error="Lease expired", updated_at=sa.func.now())
+            .returning(PipelineLease.legislation_id)
+            .execution_options(synchronize_session=False)
+        )
+        exhausted_count = len(exhausted_result.all())
+
+        active_count = await session.scalar(
+            sa.select(sa.func.count())
+            .select_from(PipelineLease)
+            .where(
+                PipelineLease.stage == stage.name,
+                PipelineLease.status == LEASE_LEASED,
+                PipelineLease.available_at > sa.func.now()
+            )
+        )
+        limit = min(limit, stage.concurrency - active_count)
+        if limit <= 0:
+            await session.commit()
+            return [], exhausted_count
+
+        candidates = (
+            sa.select(
+                sa.literal(stage.name).label("stage"),
+                DataLegislation.id.label("legislation_id"),
+                sa.literal(LEASE_LEASED).label("status"),
+                sa.literal(worker).label("worker"),
+                sa.literal(1).label("attempts"),
+                (sa.func.now() + _seconds(stage.lease_seconds)).label("available_at")
+            )
+            .where(stage.condition, ~_blocking_lease(stage))
+            .order_by(DataLegislation.priority.desc(), DataLegislation.id)
+            .limit(limit)
+        )
+
+        statement = insert(PipelineLease).from_select(
+            ["stage", "legislation_id", "status", "worker", "attempts", "available_at"],
+            candidates
+        )
+        # Повторная выдача после истекшей аренды или паузы повтора засчитывается как следующая попытка
+        statement = statement.on_conflict_do_update(
+            index_elements=[PipelineLease.stage, PipelineLease.legislation_id],
+            set_={
+                "status": LEASE_LEASED,
+                "worker": statement.excluded.worker,
+                "attempts": PipelineLease.attempts + 1,
+                "available_at": statement.excluded.available_at,
+                "updated_at": sa.func.now()
+            },
+            where=sa.and_(
+                PipelineLease.status.in_(OPEN_STATUSES),
+                PipelineLease.available_at <= sa.func.now()
+            )
+        ).returning(PipelineLease.legislation_id)
+
+        claimed_result = await session.execute(statement)
+        claimed_ids = claimed_result.scalars().all()
+
+        items = []
+        if claimed_ids:
+            items_result = await session.execute(
+                sa.select(DataLegislation.id, stage.input_column.label("input"))
+                .where(DataLegislation.id.in_(claimed_ids))
+                .order_by(DataLegislation.id)
+            )
+            items = items_result.all()
+
+        await session.commit()
+
+        return items, exhausted_count
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error claim pipeline stage {stage.name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error claim pipeline stage {stage.name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Завершаем аренды обработчика с результатами; у стадии с output результат записывается в колонку документа
+# (побеждает первый записавший). Возвращаем принятые id и id, аренда которых обработчику уже не принадлежит
+@connection
+async def sql_complete_pipeline_items(
+    stage: PipelineStage,
+    worker: str,
+    results: Dict[int, Any],
+    session: AsyncSession
+) -> Tuple[List[int], List[int]]:
+    try:
+        values = (
+            sa.values(
+                sa.column("id", sa.Integer),
+                sa.column("result", JSONB),
+                sa.column("value", sa.Text),
+                name="results"
+            )
+            .data([
+                (legislation_id, result, result if isinstance(result, str) else None)
+                for legislation_id, result in results.items()
+            ])
+        )
+
+        applied_result = await session.execute(
+            sa.update(PipelineLease)
+            .where(
+                PipelineLease.stage == stage.name,
+                PipelineLease.legislation_id == values.c.id,
+                PipelineLease.worker == worker,
+                PipelineLease.status == LEASE_LEASED
+            )
+            .values(status=LEASE_DONE, result=values.c.result, error=None, updated_at=sa.func.now())
+            .returning(PipelineLease.legislation_id)
+            .execution_options(synchronize_session=False)
+        )
+        applied_ids = applied_result.scalars().all()
+
+        if applied_ids and stage.output_column is not None:
+            await session.execute(
+                sa.update(DataLegislation)
+                .where(
+                    DataLegislation.id == values.c.id,
+                    DataLegislation.id.in_(applied_ids),
+                    stage.output_column.is_(None)
+                )
+                .values({stage.output_column: values.c.value})
+                .execution_options(synchronize_session=False)
+            )
+
+        await session.commit()
+
+        return list(applied_ids), sorted(set(results) - set(applied_ids))
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error complete pipeline stage {stage.name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error complete pipeline stage {stage.name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Ошибка обработчика: документ вернется в выдачу после паузы retry_delay * 2^(попытка - 1)
+# или, если попытки исчерпаны, останется в состоянии failed. Возвращаем id на повтор и id, ушедшие в failed
+@connection
+async def sql_fail_pipeline_items(
+    stage: PipelineStage,
+    worker: str,
+    legislation_ids: List[int],
+    error: str,
+    session: AsyncSession
+) -> Tuple[List[int], List[int]]:
+    try:
+        delay = sa.func.least(
+            stage.retry_delay_seconds * sa.func.power(2, PipelineLease.attempts - 1),
+            MAX_RETRY_DELAY_SECONDS
+        )
+
+        result = await session.execute(
+            sa.update(PipelineLease)
+            .where(
+                PipelineLease.stage == stage.name,
+                PipelineLease.legislation_id.in_(legislation_ids),
+                PipelineLease.worker == worker,
+                PipelineLease.status == LEASE_LEASED
+            )
+            .values(
+                status=sa.case(
+                    (PipelineLease.attempts >= stage.max_attempts, LEASE_FAILED),
+                    else_=LEASE_RETRY
+                ),
+                worker=None,
+                error=error[:1024],
+                available_at=sa.func.now() + _seconds(delay),
+                updated_at=sa.func.now()
+            )
+            .returning(PipelineLease.legislation_id, PipelineLease.status)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await session.commit()
+
+        retry_ids = [legislation_id for legislation_id, lease_status in rows if lease_status == LEASE_RETRY]
+        failed_ids = [legislation_id for legislation_id, lease_status in rows if lease_status == LEASE_FAILED]
+        return retry_ids, failed_ids
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error fail pipeline stage {stage.name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error fail pipeline stage {stage.name}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Снятый обработчик возвращает аренды всех стадий сразу, попытка не засчитывается
+@connection
+async def sql_release_pipeline_leases(
+    worker: str,
+    session: AsyncSession
+) -> int:
+    try:
+        result = await session.execute(
+            sa.update(PipelineLease)
+            .where(PipelineLease.worker == worker, PipelineLease.status == LEASE_LEASED)
+            .values(
+                status=LEASE_RETRY,
+                worker=None,
+                attempts=PipelineLease.attempts - 1,
+                available_at=sa.func.now(),
+                updated_at=sa.func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        return result.rowcount
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error release pipeline leases: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error release pipeline leases: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+
+
+# Состояние стадий: ожидающие документы и аренды по состояниям
+@connection
+async def sql_get_pipeline_stats(
+    stages: Dict[str, PipelineStage],
+    session: AsyncSession
+) -> Dict[str, Dict[str, int]]:
+    try:
+        stats = {
+            name: {"pending": 0, "active": 0, "expired": 0, **{s: 0 for s in (LEASE_RETRY, LEASE_DONE, LEASE_FAILED)}}
+            for name in stages
+        }
+
+        unexpired = (PipelineLease.available_at > sa.func.now()).label("unexpired")
+        lease_result = await session.execute(
+            sa.select(PipelineLease.stage, PipelineLease.status, unexpired, sa.func.count())
+            .where(PipelineLease.stage.in_(list(stages)))
+            .group_by(PipelineLease.stage, PipelineLease.status, unexpired)
+        )
+        for name, lease_status, is_unexpired, count in lease_result.all():
+            if lease_status == LEASE_LEASED:
+                stats[name]["active" if is_unexpired else "expired"] += count
+            else:
+                stats[name][lease_status] += count
+
+        for name, stage in stages.items():
+            stats[name]["pending"] = await session.scalar(
+                sa.select(sa.func.count())
+                .select_from(DataLegislation)
+                .where(
+                    stage.condition,
+                    ~sa.exists().where(
+                        PipelineLease.stage == stage.name,
+                        PipelineLease.legislation_id == DataLegislation.id
+                    )
+                )
+            )
+
+        return stats
+
+    except SQLAlchemyError as e:
+        config.logger.error(f"Database error get pipeline stats: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    except Exception as e:
+        config.logger.error(f"Unexpected error get pipeline stats: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
\ No newline at end of file
@@ -0,0 +1,92 @@
+# Внешние зависимости
+from typing import List
+import sqlalchemy as sa
+# Внутренние модули
+from web_app.src.models import Authority, DataLegislation, QUEUE_CONDITION
+
+
+# Самые свежие публикации первыми (ix_data_legislation_queue_newest)
+def _newest_query(filters: list, limit: int) -> sa.Select:
+    return (
+        sa.select(DataLegislation.id, DataLegislation.binary_pdf)
+        .where(*filters)
+        .order_by(DataLegislation.publication_date.desc(), DataLegislation.id)
+        .limit(limit)
+    )
+
+
+# Явный приоритет, выставленный оператором (ix_data_legislation_queue_priority)
+def _priority_query(filters: list, limit: int) -> sa.Select:
+    return (
+        sa.select(DataLegislation.id, DataLegislation.binary_pdf)
+        .where(*filters)
+        .order_by(
+            DataLegislation.priority.desc(),
+            DataLegislation.publication_date.desc(),
+            DataLegislation.id
+        )
+        .limit(limit)
+    )
+
+
+# Очередь по органам власти (ix_data_legislation_queue_authority):
+# для каждого органа берем не больше limit свежих записей через LATERAL,
+# затем перемешиваем их по порядковому номеру внутри органа.
+def _authority_query(filters: list, limit: int, weighted: bool) -> sa.Select:
+    queue = (
+        sa.select(
+            DataLegislation.id,
+            DataLegislation.binary_pdf,
+            DataLegislation.publication_date,
+            sa.func.row_number().over(
+                order_by=(DataLegislation.publication_date.desc(), DataLegislation.id)
+            ).label("position")
+        )
+        .where(DataLegislation.authority_id == Authority.id, *filters)
+        .order_by(DataLegislation.publication_date.desc(), DataLegislation.id)
+        .limit(limit)
+        .lateral("queue")
+    )
+
+    if weighted:
+        # Орган с весом N получает в N раз больше мест в выдаче
+        turn = sa.cast(queue.c.position, sa.Float) / sa.cast(Authority.priority_weight, sa.Float)
+        order_by = (turn, Authority.priority_weight.desc(), queue.c.publication_date.desc())
+
+    else:
+        # Честный round-robin по органам
+        order_by = (queue.c.position, Authority.id)
+
+    return (
+        sa.select(queue.c.id, queue.c.binary_pdf)
+        .select_from(Authority)
+        .join(queue, sa.true())
+        .order_by(*order_by)
+        .limit(limit)
+    )
+
+
+# Запрос свободных законопроектов в порядке выбранной политики
+def build_free_legislation_query(
+    policy: str,
+    reservation_legislation_ids: List[int],
+    limit: int,
+    require_text_layer_check: bool = False
+) -> sa.Select:
+    filters = [QUEUE_CONDITION]
+    # PDF с текстовым слоем не должны уходить в OCR раньше, чем их проверит сервер
+    if require_text_layer_check:
+        filters.append(DataLegislation.text_layer_checked_at.isnot(None))
+    if reservation_legislation_ids:
+        filters.append(DataLegislation.id.notin_(reservation_legislation_ids))
+
+    if policy == "priority":
+        return _priority_query(filters=filters, limit=limit)
+
+    if policy == "authority_weight":
+        return _authority_query(filters=filters, limit=limit, weighted=True)
+
+    if policy == "fair_share":
+        return _authority_query(filters=filters, limit=limit, weighted=False)
+
+    return _newest_query(filters=filters, limit=limit)
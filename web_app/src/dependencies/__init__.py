@@ -1 +1,4 @@
-from web_app.src.dependencies.depends_ip import get_client_ip
\ No newline at end of file
+from web_app.src.dependencies.depends_ip import get_client_ip
+from web_app.src.dependencies.depends_admission import admission
+from web_app.src.dependencies.depends_payload import payload_body
+from web_app.src.dependencies.depends_profiling import profiling_token
\ No newline at end of file
@@ -0,0 +1,39 @@
+# Внешние зависимости
+from fastapi import Depends, HTTPException, Request, status
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.dependencies.depends_ip import get_client_ip
+from web_app.src.utils import redis_service, process_metrics
+from web_app.src.utils.admission import get_limiter
+
+
+# Dependency допуска запроса: лимит частоты клиента и лимит одновременных запросов класса маршрутов
+def admission(route_class: str):
+    async def dependency(request: Request, client_ip: str = Depends(get_client_ip)):
+        if config.RATE_LIMIT_PER_SECOND > 0:
+            # Без заголовков прокси get_client_ip отдает общее "no_ip": берем адрес соединения.
+            # worker_id есть только в query; у загрузок он в теле, которое здесь не разбирается
+            if client_ip == "no_ip" and request.client is not None:
+                client_ip = request.client.host
+
+            worker_id = request.query_params.get("worker_id")
+            identity = f"{client_ip}:{worker_id}" if worker_id else client_ip
+
+            allowed, retry_after = await redis_service.rate_limit(
+                identity=identity,
+                rate=config.RATE_LIMIT_PER_SECOND,
+                burst=config.RATE_LIMIT_BURST
+            )
+
+            if not allowed:
+                process_metrics.incr(f"rate_limited:{route_class}")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(max(retry_after, 1))}
+                )
+
+        async with get_limiter(route_class).slot():
+            yield
+
+    return dependency
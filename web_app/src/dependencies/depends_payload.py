@@ -0,0 +1,15 @@
+# Внешние зависимости
+from typing import Type
+from fastapi import Request
+from pydantic import BaseModel
+# Внутренние модули
+from web_app.src.utils import payload_executor
+
+
+# Dependency тела запроса: большие JSON разбираются через model_validate_json в пуле, а не в event loop
+def payload_body(model: Type[BaseModel]):
+    async def dependency(request: Request) -> BaseModel:
+        body = await request.body()
+        return await payload_executor.parse_json(model=model, body=body)
+
+    return dependency
\ No newline at end of file
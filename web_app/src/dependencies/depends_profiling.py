@@ -0,0 +1,14 @@
+# Внешние зависимости
+import secrets
+from fastapi import HTTPException, Request, status
+# Внутренние модули
+from web_app.src.core import config
+
+
+# Dependency отладочных маршрутов: тот же токен, что у X-Profile. Без PROFILING_TOKEN маршрута как будто нет
+def profiling_token(request: Request):
+    token = request.headers.get("X-Profile-Token", "")
+
+    # compare_digest не принимает str с не-ASCII символами: сравниваем байты, иначе такой токен дает 500
+    if not config.PROFILING_TOKEN or not secrets.compare_digest(token.encode(), config.PROFILING_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
\ No newline at end of file
@@ -0,0 +1,3 @@
+from web_app.src.middlewares.metrics import MetricsMiddleware
+from web_app.src.middlewares.log_context import LogContextMiddleware
+from web_app.src.middlewares.profiling import ProfilingMiddleware
\ No newline at end of file
@@ -0,0 +1,38 @@
+# Внешние зависимости
+from typing import Optional
+import uuid
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
+# Внутренние модули
+from web_app.src.core.logger import bind_log_context
+
+
+def route_template(request: Request) -> Optional[str]:
+    """Шаблон маршрута (/api/v1/pipeline/{stage}/claim), а не сырой путь: одно значение на маршрут.
+
+    Маршрутизация выполняется уже после middleware, поэтому шаблон находим сами
+    """
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+
+    return None
+
+
+# Идентификатор запроса, маршрут и обработчик для всех логов внутри запроса
+class LogContextMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        worker_id = request.query_params.get("worker_id")
+
+        bind_log_context(
+            request_id=request_id,
+            worker_id=int(worker_id) if worker_id and worker_id.isdigit() else None,
+            route=route_template(request) or "unmatched"
+        )
+
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
@@ -0,0 +1,29 @@
+# Внешние зависимости
+import time
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+# Внутренние модули
+from web_app.src.utils import process_metrics
+
+
+# Счетчики запросов и времени обработки по маршрутам текущего процесса
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.perf_counter()
+        status_code = 500
+
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+
+        finally:
+            route = request.scope.get("route")
+            path = route.path if route is not None else "unmatched"
+
+            process_metrics.incr("requests_total")
+            process_metrics.incr(f"requests:{path}")
+            process_metrics.incr(f"request_seconds:{path}", time.perf_counter() - start_time)
+
+            if status_code >= 500:
+                process_metrics.incr("errors_total")
@@ -0,0 +1,68 @@
+# Внешние зависимости
+from datetime import datetime
+import asyncio
+import os
+import random
+import secrets
+import time
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.core.logger import request_id_var
+from web_app.src.core.profiling import (SamplingProfiler, request_timings_var, slow_requests, write_folded)
+
+
+# Профилирование по заголовку X-Profile (с токеном) или доле трафика и журнал медленных запросов
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    @staticmethod
+    def _should_profile(request: Request) -> bool:
+        if request.headers.get("X-Profile") == "1" and config.PROFILING_TOKEN:
+            token = request.headers.get("X-Profile-Token", "")
+            return secrets.compare_digest(token.encode(), config.PROFILING_TOKEN.encode())
+
+        return config.PROFILING_SAMPLE_RATE > 0 and random.random() < config.PROFILING_SAMPLE_RATE
+
+    async def dispatch(self, request: Request, call_next):
+        timings = {}
+        request_timings_var.set(timings)
+
+        profiler = None
+        if self._should_profile(request):
+            profiler = SamplingProfiler(interval=config.PROFILING_INTERVAL_MS / 1000)
+            if not profiler.start():
+                profiler = None
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+
+        finally:
+            duration = time.perf_counter() - start_time
+            request_id = request_id_var.get() or f"{os.getpid()}-{time.time_ns()}"
+
+            profile_file = None
+            if profiler is not None:
+                stacks = profiler.stop()
+                profile_file = os.path.join(config.PROFILING_DIR, f"{request_id}.folded")
+                await asyncio.to_thread(write_folded, stacks, profile_file)
+
+            if duration * 1000 >= config.SLOW_REQUEST_MS:
+                slow_requests.append({
+                    "time": datetime.now().isoformat(),
+                    "request_id": request_id,
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status_code": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "breakdown_ms": {name: round(value * 1000, 2) for name, value in timings.items()},
+                    "profile_file": profile_file
+                })
+
+        if profile_file is not None:
+            response.headers["X-Profile-File"] = profile_file
+
+        return response
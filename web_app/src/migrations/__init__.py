@@ -0,0 +1 @@
+from web_app.src.migrations.runner import run_migrations, get_migrations, get_schema_version
\ No newline at end of file
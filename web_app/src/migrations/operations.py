@@ -0,0 +1,119 @@
+# Внешние зависимости
+from typing import Optional
+import asyncio
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.core.config import get_config
+
+
+config = get_config()
+
+
+async def _relkind(conn: AsyncConnection, name: str) -> Optional[str]:
+    return await conn.scalar(
+        sa.text("SELECT CAST(relkind AS text) FROM pg_class WHERE relname = :name"),
+        {"name": name}
+    )
+
+
+# Онлайн-построение индекса без блокировки записи (только вне транзакции)
+async def create_index_concurrently(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    columns: str,
+    where: Optional[str] = None,
+    unique: bool = False
+):
+    # Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс: удаляем его
+    invalid = await conn.scalar(
+        sa.text(
+            "SELECT NOT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ),
+        {"name": name}
+    )
+    if invalid:
+        config.logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+        await drop_index_concurrently(conn=conn, name=name)
+
+    index_sql = (
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {{concurrently}}IF NOT EXISTS {{name}} "
+        f"ON {{only}}{{table}} ({columns})"
+        f"{f' WHERE {where}' if where else ''}"
+    )
+
+    if await _relkind(conn, table) != "p":
+        config.logger.info(f"Building index {name} concurrently")
+        await conn.execute(sa.text(index_sql.format(concurrently="CONCURRENTLY ", name=name, only="", table=table)))
+        return
+
+    # Партиционированная таблица не поддерживает CONCURRENTLY: создаем пустой индекс
+    # только на родителе, строим индексы партиций онлайн и присоединяем их
+    config.logger.info(f"Building partitioned index {name} partition by partition")
+    await conn.execute(sa.text(index_sql.format(concurrently="", name=name, only="ONLY ", table=table)))
+
+    partitions = await conn.scalars(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass) ORDER BY c.relname"
+    ), {"table": table})
+
+    for partition in partitions.all():
+        partition_index = f"{name}_{partition.removeprefix(f'{table}_')}"[:63]
+        await create_index_concurrently(
+            conn=conn,
+            name=partition_index,
+            table=partition,
+            columns=columns,
+            where=where,
+            unique=unique
+        )
+        attached = await conn.scalar(
+            sa.text(
+                "SELECT EXISTS (SELECT 1 FROM pg_inherits "
+                "WHERE inhparent = CAST(:name AS regclass) AND inhrelid = CAST(:partition_index AS regclass))"
+            ),
+            {"name": name, "partition_index": partition_index}
+        )
+        if not attached:
+            await conn.execute(sa.text(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}"))
+
+
+# Онлайн-удаление индекса (только вне транзакции)
+async def drop_index_concurrently(conn: AsyncConnection, name: str):
+    # Индекс партиционированной таблицы удаляется только обычным DROP INDEX
+    if await _relkind(conn, name) == "I":
+        await conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
+        return
+
+    await conn.execute(sa.text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+# Заполнение колонки пачками: каждая пачка в своей короткой транзакции (только вне транзакции)
+async def batched_update(
+    conn: AsyncConnection,
+    table: str,
+    assignments: str,
+    where: str,
+    batch_size: int = 5000,
+    pause_seconds: float = 0.05
+) -> int:
+    total = 0
+
+    while True:
+        result = await conn.execute(sa.text(
+            f"UPDATE {table} SET {assignments} WHERE id IN ("
+            f"SELECT id FROM {table} WHERE {where} LIMIT {int(batch_size)})"
+        ))
+
+        if result.rowcount == 0:
+            break
+
+        total += result.rowcount
+        config.logger.info(f"Backfilled {total} rows of {table}")
+
+        # Даем место рабочей нагрузке между пачками
+        await asyncio.sleep(pause_seconds)
+
+    return total
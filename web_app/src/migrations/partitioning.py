@@ -0,0 +1,173 @@
+# Внешние зависимости
+from typing import List, Optional
+from datetime import date
+import re
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.core.config import get_config
+
+
+config = get_config()
+
+LEGISLATION_TABLE = "data_legislation"
+ARCHIVE_TABLE = "data_legislation_archive"
+DEFAULT_PARTITION = f"{LEGISLATION_TABLE}_default"
+KEYS_TABLE = "data_legislation_keys"
+
+# data_legislation_p2026_01 - партиция записей, загруженных в январе 2026
+PARTITION_NAME_PATTERN = re.compile(rf"^{LEGISLATION_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(value: date, shift: int = 0) -> date:
+    """Первое число месяца, сдвинутого на shift месяцев"""
+    month_index = value.year * 12 + value.month - 1 + shift
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{LEGISLATION_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = PARTITION_NAME_PATTERN.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def is_partitioned(conn: AsyncConnection, table: str = LEGISLATION_TABLE) -> bool:
+    return bool(await conn.scalar(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ))
+
+
+async def get_partitions(conn: AsyncConnection, table: str = LEGISLATION_TABLE) -> List[str]:
+    result = await conn.scalars(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": table})
+    return list(result.all())
+
+
+async def create_month_partition(conn: AsyncConnection, month: date) -> str:
+    name = partition_name(month)
+    await conn.execute(sa.text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {LEGISLATION_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+    ))
+    return name
+
+
+async def create_default_partition(conn: AsyncConnection):
+    # Страховка на случай остановки обслуживания: записи вне созданных месяцев не теряются
+    await conn.execute(sa.text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {LEGISLATION_TABLE} DEFAULT"))
+
+
+# Уникальный индекс партиционированной таблицы обязан включать created_at и потому
+# не защищает от дублей. Глобальную уникальность держит реестр хэшей фиксированной ширины.
+KEY_REGISTRY_FUNCTION_SQL = f"""
+    CREATE OR REPLACE FUNCTION data_legislation_register_keys() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO {KEYS_TABLE} (name_hash, publication_number_hash)
+            VALUES (NEW.name_hash, NEW.publication_number_hash);
+        ELSIF TG_OP = 'UPDATE' THEN
+            UPDATE {KEYS_TABLE}
+            SET name_hash = NEW.name_hash, publication_number_hash = NEW.publication_number_hash
+            WHERE name_hash = OLD.name_hash;
+        ELSE
+            DELETE FROM {KEYS_TABLE} WHERE name_hash = OLD.name_hash;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+async def create_key_registry(conn: AsyncConnection):
+    await conn.execute(sa.text(
+        f"CREATE TABLE IF NOT EXISTS {KEYS_TABLE} ("
+        f"name_hash BYTEA PRIMARY KEY, "
+        f"publication_number_hash BYTEA NOT NULL UNIQUE)"
+    ))
+    await conn.execute(sa.text(KEY_REGISTRY_FUNCTION_SQL))
+    await conn.execute(sa.text(f"DROP TRIGGER IF EXISTS data_legislation_register_keys ON {LEGISLATION_TABLE}"))
+    await conn.execute(sa.text(
+        f"CREATE TRIGGER data_legislation_register_keys "
+        f"AFTER INSERT OR UPDATE OF name, publication_number OR DELETE ON {LEGISLATION_TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION data_legislation_register_keys()"
+    ))
+    await conn.execute(sa.text(
+        f"INSERT INTO {KEYS_TABLE} (name_hash, publication_number_hash) "
+        f"SELECT name_hash, publication_number_hash FROM {LEGISLATION_TABLE} "
+        f"ON CONFLICT DO NOTHING"
+    ))
+
+
+# Однократный перевод data_legislation на помесячные партиции.
+# Таблица копируется целиком под эксклюзивной блокировкой: запускать в окно обслуживания.
+async def convert_to_partitioned(conn: AsyncConnection, premake_months: int):
+    if await is_partitioned(conn):
+        config.logger.info(f"{LEGISLATION_TABLE} is already partitioned")
+        return
+
+    await conn.execute(sa.text(f"LOCK TABLE {LEGISLATION_TABLE} IN ACCESS EXCLUSIVE MODE"))
+
+    # Уникальные индексы заменяются реестром ключей (create_key_registry)
+    indexes = (await conn.scalars(sa.text(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = CAST(:table AS regclass) AND NOT i.indisprimary AND NOT i.indisunique"
+    ), {"table": LEGISLATION_TABLE})).all()
+
+    triggers = (await conn.scalars(sa.text(
+        "SELECT pg_get_triggerdef(t.oid) FROM pg_trigger t "
+        "WHERE t.tgrelid = CAST(:table AS regclass) AND NOT t.tgisinternal"
+    ), {"table": LEGISLATION_TABLE})).all()
+
+    first_created_at = await conn.scalar(sa.text(f"SELECT min(created_at) FROM {LEGISLATION_TABLE}"))
+
+    config.logger.info(f"Converting {LEGISLATION_TABLE} to monthly partitions")
+    await conn.execute(sa.text(f"ALTER TABLE {LEGISLATION_TABLE} RENAME TO {LEGISLATION_TABLE}_unpartitioned"))
+    await conn.execute(sa.text(
+        f"CREATE TABLE {LEGISLATION_TABLE} "
+        f"(LIKE {LEGISLATION_TABLE}_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (created_at)"
+    ))
+    # Последовательность id переходит к новой таблице и не удаляется вместе со старой
+    await conn.execute(sa.text(
+        f"ALTER SEQUENCE {LEGISLATION_TABLE}_id_seq OWNED BY {LEGISLATION_TABLE}.id"
+    ))
+
+    today = date.today()
+    month = month_start(first_created_at.date() if first_created_at else today)
+    while month <= month_start(today, premake_months):
+        await create_month_partition(conn=conn, month=month)
+        month = month_start(month, 1)
+    await create_default_partition(conn)
+
+    result = await conn.execute(sa.text(
+        f"INSERT INTO {LEGISLATION_TABLE} SELECT * FROM {LEGISLATION_TABLE}_unpartitioned"
+    ))
+    config.logger.info(f"Copied {result.rowcount} rows into partitions")
+
+    await conn.execute(sa.text(f"DROP TABLE {LEGISLATION_TABLE}_unpartitioned"))
+
+    # Ограничения и индексы строятся после загрузки данных, с прежними именами
+    # (определения индексов сняты до переименования таблицы)
+    await conn.execute(sa.text(
+        f"ALTER TABLE {LEGISLATION_TABLE} ADD PRIMARY KEY (id, created_at)"
+    ))
+    await conn.execute(sa.text(
+        f"ALTER TABLE {LEGISLATION_TABLE} ADD FOREIGN KEY (authority_id) REFERENCES authorities (id)"
+    ))
+    for index in indexes:
+        await conn.execute(sa.text(index))
+
+    for trigger in triggers:
+        await conn.execute(sa.text(trigger))
+
+    await create_key_registry(conn)
+
+    config.logger.info(f"{LEGISLATION_TABLE} converted, {len(indexes)} indexes rebuilt")
@@ -0,0 +1,112 @@
+# Внешние зависимости
+from dataclasses import dataclass
+from types import ModuleType
+from typing import List, Optional
+import importlib
+import pkgutil
+import sqlalchemy as sa
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+# Внутренние модули
+from web_app.src.core.config import get_config
+from web_app.src.migrations import versions
+
+
+# Ключ advisory-блокировки применения миграций (общий для всех процессов и реплик)
+MIGRATION_LOCK_ID = 0x6C656769
+
+config = get_config()
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    transactional: bool
+    module: ModuleType
+
+
+# Миграции из пакета versions, упорядоченные по номеру версии
+def get_migrations() -> List[Migration]:
+    migrations = []
+
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(Migration(
+            version=module.VERSION,
+            description=module.DESCRIPTION,
+            transactional=getattr(module, "TRANSACTIONAL", True),
+            module=module
+        ))
+
+    migrations.sort(key=lambda m: m.version)
+
+    expected = list(range(1, len(migrations) + 1))
+    if [m.version for m in migrations] != expected:
+        raise RuntimeError(f"Migration versions must be contiguous from 1, got {[m.version for m in migrations]}")
+
+    return migrations
+
+
+# Текущая версия схемы; None, если миграции еще не применялись
+async def get_schema_version(engine: AsyncEngine) -> Optional[int]:
+    try:
+        async with engine.connect() as conn:
+            return await conn.scalar(sa.text("SELECT max(version) FROM schema_migrations"))
+
+    except ProgrammingError:
+        return None
+
+
+async def _apply(engine: AsyncEngine, migration: Migration):
+    config.logger.info(f"Applying migration {migration.version}: {migration.description}")
+    record = sa.text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)")
+    params = {"version": migration.version, "description": migration.description}
+
+    if migration.transactional:
+        async with engine.begin() as conn:
+            await migration.module.upgrade(conn)
+            await conn.execute(record, params)
+
+    else:
+        # CREATE INDEX CONCURRENTLY и пакетные обновления выполняются вне транзакции,
+        # поэтому такие миграции обязаны быть идемпотентными
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await migration.module.upgrade(conn)
+            await conn.execute(record, params)
+
+
+# Приводим схему к последней версии
+async def run_migrations(engine: AsyncEngine):
+    migrations = get_migrations()
+    latest = migrations[-1].version if migrations else 0
+
+    # Обычный старт: один запрос, без обхода метаданных
+    if await get_schema_version(engine) == latest:
+        config.logger.info(f"Database schema is up to date (version {latest})")
+        return
+
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(sa.select(sa.func.pg_advisory_lock(MIGRATION_LOCK_ID)))
+
+        try:
+            await lock_conn.execute(sa.text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version integer PRIMARY KEY, "
+                "description text NOT NULL, "
+                "applied_at timestamptz NOT NULL DEFAULT now())"
+            ))
+
+            # Перечитываем под блокировкой: другой процесс мог успеть применить миграции
+            current = await get_schema_version(engine) or 0
+
+            for migration in migrations:
+                if migration.version > current:
+                    await _apply(engine=engine, migration=migration)
+
+            config.logger.info(f"Database schema migrated from version {current} to {latest}")
+
+        finally:
+            await lock_conn.execute(sa.select(sa.func.pg_advisory_unlock(MIGRATION_LOCK_ID)))
@@ -0,0 +1 @@
+# Миграции схемы: модуль vNNNN_<name>.py с VERSION, DESCRIPTION, TRANSACTIONAL и async upgrade(conn)
@@ -0,0 +1,53 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+VERSION = 1
+DESCRIPTION = "Initial schema: authorities and data_legislation"
+TRANSACTIONAL = True
+
+
+# Повторяет схему, которую раньше создавал create_all, поэтому безопасна для существующих баз
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS authorities (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(256) NOT NULL,
+            uuid_authority UUID NOT NULL
+        )
+    """))
+    await conn.execute(sa.text("CREATE UNIQUE INDEX IF NOT EXISTS ix_authorities_name ON authorities (name)"))
+    await conn.execute(sa.text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_authorities_uuid_authority ON authorities (uuid_authority)"
+    ))
+
+    await conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS data_legislation (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(4096) NOT NULL,
+            publication_number VARCHAR(512) NOT NULL,
+            publication_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            link_pdf VARCHAR(512) NOT NULL,
+            binary_pdf BYTEA,
+            text TEXT,
+            law_number VARCHAR(16),
+            authority_id INTEGER NOT NULL REFERENCES authorities (id)
+        )
+    """))
+    await conn.execute(sa.text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_data_legislation_name ON data_legislation (name)"
+    ))
+    await conn.execute(sa.text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_data_legislation_publication_number "
+        "ON data_legislation (publication_number)"
+    ))
+    await conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_data_legislation_publication_date ON data_legislation (publication_date)"
+    ))
+    await conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_data_legislation_law_number ON data_legislation (law_number)"
+    ))
+    await conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_data_legislation_authority_id ON data_legislation (authority_id)"
+    ))
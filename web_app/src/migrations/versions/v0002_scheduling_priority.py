@@ -0,0 +1,18 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+VERSION = 2
+DESCRIPTION = "Priority columns for queue scheduling policies"
+TRANSACTIONAL = True
+
+
+# Константный DEFAULT добавляется без перезаписи таблицы
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text(
+        "ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 0"
+    ))
+    await conn.execute(sa.text(
+        "ALTER TABLE authorities ADD COLUMN IF NOT EXISTS priority_weight INTEGER NOT NULL DEFAULT 1"
+    ))
@@ -0,0 +1,35 @@
+# Внешние зависимости
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.migrations.operations import create_index_concurrently
+
+
+VERSION = 3
+DESCRIPTION = "Partial indexes for queue scheduling policies"
+TRANSACTIONAL = False
+
+QUEUE_CONDITION = "binary_pdf IS NOT NULL AND text IS NULL"
+
+
+async def upgrade(conn: AsyncConnection):
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_queue_newest",
+        table="data_legislation",
+        columns="publication_date DESC, id",
+        where=QUEUE_CONDITION
+    )
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_queue_priority",
+        table="data_legislation",
+        columns="priority DESC, publication_date DESC, id",
+        where=QUEUE_CONDITION
+    )
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_queue_authority",
+        table="data_legislation",
+        columns="authority_id, publication_date DESC, id",
+        where=QUEUE_CONDITION
+    )
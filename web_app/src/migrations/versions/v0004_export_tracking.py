@@ -0,0 +1,28 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.migrations.operations import create_index_concurrently
+
+
+VERSION = 4
+DESCRIPTION = "Ingestion time and export mark for partition-based cleanup"
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection):
+    # now() стабильна в пределах оператора, поэтому DEFAULT добавляется без перезаписи таблицы
+    await conn.execute(sa.text(
+        "ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL DEFAULT now()"
+    ))
+    await conn.execute(sa.text(
+        "ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS exported_at TIMESTAMP"
+    ))
+
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_ready",
+        table="data_legislation",
+        columns="id",
+        where="binary_pdf IS NOT NULL AND text IS NOT NULL AND exported_at IS NULL"
+    )
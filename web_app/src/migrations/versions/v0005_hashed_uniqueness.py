@@ -0,0 +1,101 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.migrations.operations import batched_update, create_index_concurrently, drop_index_concurrently
+from web_app.src.migrations.partitioning import is_partitioned, create_key_registry
+
+
+VERSION = 5
+DESCRIPTION = "Fixed-width hash columns for uniqueness of name and publication_number"
+TRANSACTIONAL = False
+
+# Хэши заполняются в БД, поэтому уникальность не зависит от того, кто вставляет записи
+HASH_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION data_legislation_fill_hashes() RETURNS trigger AS $$
+    BEGIN
+        NEW.name_hash := sha256(convert_to(NEW.name, 'UTF8'));
+        NEW.publication_number_hash := sha256(convert_to(NEW.publication_number, 'UTF8'));
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+HASH_TRIGGER_SQL = """
+    CREATE TRIGGER data_legislation_fill_hashes
+    BEFORE INSERT OR UPDATE OF name, publication_number ON data_legislation
+    FOR EACH ROW EXECUTE FUNCTION data_legislation_fill_hashes()
+"""
+
+HASH_ASSIGNMENTS = (
+    "name_hash = sha256(convert_to(name, 'UTF8')), "
+    "publication_number_hash = sha256(convert_to(publication_number, 'UTF8'))"
+)
+
+# Индексы, которые не используются ни одним запросом приложения
+UNUSED_INDEXES = (
+    "ix_data_legislation_name",
+    "ix_data_legislation_publication_number",
+    "ix_data_legislation_publication_date",
+    "ix_data_legislation_law_number"
+)
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text("ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS name_hash BYTEA"))
+    await conn.execute(sa.text("ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS publication_number_hash BYTEA"))
+
+    # Сначала триггер, затем заполнение: новые записи не проскочат между пачками
+    await conn.execute(sa.text(HASH_FUNCTION_SQL))
+    await conn.execute(sa.text("DROP TRIGGER IF EXISTS data_legislation_fill_hashes ON data_legislation"))
+    await conn.execute(sa.text(HASH_TRIGGER_SQL))
+
+    await batched_update(
+        conn=conn,
+        table="data_legislation",
+        assignments=HASH_ASSIGNMENTS,
+        where="name_hash IS NULL OR publication_number_hash IS NULL"
+    )
+
+    if await is_partitioned(conn):
+        await create_key_registry(conn)
+
+    else:
+        await create_index_concurrently(
+            conn=conn,
+            name="ix_data_legislation_name_hash",
+            table="data_legislation",
+            columns="name_hash",
+            unique=True
+        )
+        await create_index_concurrently(
+            conn=conn,
+            name="ix_data_legislation_publication_number_hash",
+            table="data_legislation",
+            columns="publication_number_hash",
+            unique=True
+        )
+
+    # Выдача документов без PDF: WHERE binary_pdf IS NULL LIMIT n
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_missing_binary",
+        table="data_legislation",
+        columns="id",
+        where="binary_pdf IS NULL"
+    )
+
+    # NOT NULL через проверенный CHECK: SET NOT NULL не сканирует таблицу под эксклюзивной блокировкой
+    for column in ("name_hash", "publication_number_hash"):
+        constraint = f"ck_data_legislation_{column}_not_null"
+        await conn.execute(sa.text(
+            f"ALTER TABLE data_legislation DROP CONSTRAINT IF EXISTS {constraint}"
+        ))
+        await conn.execute(sa.text(
+            f"ALTER TABLE data_legislation ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID"
+        ))
+        await conn.execute(sa.text(f"ALTER TABLE data_legislation VALIDATE CONSTRAINT {constraint}"))
+        await conn.execute(sa.text(f"ALTER TABLE data_legislation ALTER COLUMN {column} SET NOT NULL"))
+        await conn.execute(sa.text(f"ALTER TABLE data_legislation DROP CONSTRAINT {constraint}"))
+
+    for name in UNUSED_INDEXES:
+        await drop_index_concurrently(conn=conn, name=name)
@@ -0,0 +1,25 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.migrations.operations import create_index_concurrently
+
+
+VERSION = 6
+DESCRIPTION = "Text layer check mark for extraction before OCR"
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text(
+        "ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS text_layer_checked_at TIMESTAMP"
+    ))
+
+    # Документы, ждущие проверки текстового слоя: свежие загрузки первыми (обратный обход по id)
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_text_layer_pending",
+        table="data_legislation",
+        columns="id",
+        where="binary_pdf IS NOT NULL AND text IS NULL AND text_layer_checked_at IS NULL"
+    )
\ No newline at end of file
@@ -0,0 +1,33 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.migrations.operations import batched_update, create_index_concurrently
+
+
+VERSION = 7
+DESCRIPTION = "Text update time as the watermark of incremental exports"
+TRANSACTIONAL = False
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text(
+        "ALTER TABLE data_legislation ADD COLUMN IF NOT EXISTS text_updated_at TIMESTAMP"
+    ))
+
+    # Точное время записи старых текстов неизвестно: берем время загрузки записи
+    await batched_update(
+        conn=conn,
+        table="data_legislation",
+        assignments="text_updated_at = created_at",
+        where="text IS NOT NULL AND text_updated_at IS NULL"
+    )
+
+    # Инкрементальная выгрузка: text_updated_at > водяной знак, по порядку
+    await create_index_concurrently(
+        conn=conn,
+        name="ix_data_legislation_text_updated",
+        table="data_legislation",
+        columns="text_updated_at, id",
+        where="text_updated_at IS NOT NULL"
+    )
\ No newline at end of file
@@ -0,0 +1,31 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+VERSION = 8
+DESCRIPTION = "Lease table of the multi-stage processing pipeline"
+TRANSACTIONAL = True
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS pipeline_leases (
+            stage VARCHAR(64) NOT NULL,
+            legislation_id INTEGER NOT NULL,
+            status VARCHAR(16) NOT NULL,
+            worker VARCHAR(128),
+            attempts INTEGER NOT NULL,
+            available_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            result JSONB,
+            error VARCHAR(1024),
+            PRIMARY KEY (stage, legislation_id)
+        )
+    """))
+
+    # Таблица новая и пустая, поэтому индекс строится в транзакции
+    await conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_pipeline_leases_open ON pipeline_leases (stage, available_at) "
+        "WHERE status IN ('leased', 'retry')"
+    ))
\ No newline at end of file
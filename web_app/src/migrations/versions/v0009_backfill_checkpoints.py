@@ -0,0 +1,22 @@
+# Внешние зависимости
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+VERSION = 9
+DESCRIPTION = "Resumable checkpoints of derived column backfills"
+TRANSACTIONAL = True
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(sa.text("""
+        CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+            name VARCHAR(64) PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            scanned BIGINT NOT NULL DEFAULT 0,
+            updated BIGINT NOT NULL DEFAULT 0,
+            started_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            finished_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """))
\ No newline at end of file
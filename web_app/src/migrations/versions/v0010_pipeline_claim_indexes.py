@@ -0,0 +1,32 @@
+# Внешние зависимости
+from sqlalchemy.ext.asyncio import AsyncConnection
+# Внутренние модули
+from web_app.src.migrations.operations import create_index_concurrently
+
+
+VERSION = 10
+DESCRIPTION = "Partial indexes for pipeline stage claims"
+TRANSACTIONAL = False
+
+# Сочетания входа и выхода стадий конвейера: предикат совпадает с условием выдачи стадии
+PIPELINE_INDEXES = {
+    "ix_data_legislation_pipeline_text_any": "text IS NOT NULL AND exported_at IS NULL",
+    "ix_data_legislation_pipeline_text_law_number": (
+        "text IS NOT NULL AND exported_at IS NULL AND law_number IS NULL"
+    ),
+    "ix_data_legislation_pipeline_binary_pdf_any": "binary_pdf IS NOT NULL AND exported_at IS NULL",
+    "ix_data_legislation_pipeline_binary_pdf_law_number": (
+        "binary_pdf IS NOT NULL AND exported_at IS NULL AND law_number IS NULL"
+    )
+}
+
+
+async def upgrade(conn: AsyncConnection):
+    for name, where in PIPELINE_INDEXES.items():
+        await create_index_concurrently(
+            conn=conn,
+            name=name,
+            table="data_legislation",
+            columns="priority DESC, id",
+            where=where
+        )
\ No newline at end of file
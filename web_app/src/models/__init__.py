@@ -1 +1,5 @@
-from web_app.src.models.legislation import Base, Authority, DataLegislation
\ No newline at end of file
+from web_app.src.models.legislation import (Base, Authority, DataLegislation, QUEUE_CONDITION, READY_CONDITION,
+                                            TEXT_LAYER_PENDING_CONDITION)
+from web_app.src.models.pipeline import (PipelineLease, PipelineStage, LEASE_LEASED, LEASE_RETRY, LEASE_DONE,
+                                          LEASE_FAILED, LEASE_STATUSES)
+from web_app.src.models.backfill import BackfillCheckpoint
\ No newline at end of file
@@ -0,0 +1,23 @@
+# Внешние зависимости
+from typing import Optional
+from datetime import datetime
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+# Внутренние модули
+from web_app.src.models.legislation import Base
+
+
+class BackfillCheckpoint(Base):
+    __tablename__ = 'backfill_checkpoints'
+
+    name: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    # Последний обработанный id: проход продолжается с id > last_id
+    last_id: so.Mapped[int] = so.mapped_column(sa.Integer, server_default="0", nullable=False)
+    scanned: so.Mapped[int] = so.mapped_column(sa.BigInteger, server_default="0", nullable=False)
+    updated: so.Mapped[int] = so.mapped_column(sa.BigInteger, server_default="0", nullable=False)
+    started_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, server_default=sa.func.now(), nullable=False)
+    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, server_default=sa.func.now(), nullable=False)
+    finished_at: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<BackfillCheckpoint(name='{self.name}', last_id={self.last_id})>"
\ No newline at end of file
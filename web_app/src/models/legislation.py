@@ -15,7 +15,8 @@ class Base(AsyncAttrs, so.DeclarativeBase):
                 setattr(self, key, value)
 
     def to_dict(self):
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        unloaded = sa.inspect(self).unloaded
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.key not in unloaded}
 
 
 # Модель органов власти
@@ -35,6 +36,12 @@ class Authority(Base):
         index=True,
         nullable=False
     )
+    priority_weight: so.Mapped[int] = so.mapped_column(
+        sa.Integer,
+        default=1,
+        server_default="1",
+        nullable=False
+    )
 
     legislations: so.Mapped[List["DataLegislation"]] = so.relationship(
         "DataLegislation",
@@ -53,36 +60,75 @@ class DataLegislation(Base):
     id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
     name: so.Mapped[str] = so.mapped_column(
         sa.String(4096),
-        unique=True,
-        index=True,
         nullable=False
     )
     publication_number: so.Mapped[str] = so.mapped_column(
         sa.String(512),
-        unique=True,
-        index=True,
+        nullable=False
+    )
+    # Уникальность длинных строк держится на sha256 фиксированной ширины,
+    # который заполняет триггер data_legislation_fill_hashes
+    name_hash: so.Mapped[bytes] = so.mapped_column(
+        sa.LargeBinary(32),
+        server_default=sa.FetchedValue(),
+        nullable=False
+    )
+    publication_number_hash: so.Mapped[bytes] = so.mapped_column(
+        sa.LargeBinary(32),
+        server_default=sa.FetchedValue(),
         nullable=False
     )
     publication_date: so.Mapped[datetime] = so.mapped_column(
         sa.DateTime,
-        index=True,
         nullable=False
     )
     link_pdf: so.Mapped[str] = so.mapped_column(
         sa.String(512),
         nullable=False
     )
+    # Крупные колонки не загружаются вместе с сущностью: обращение к ним
+    # без явного select/undefer падает, а не тянет документ из БД
     binary_pdf: so.Mapped[Optional[bytes]] = so.mapped_column(
         sa.LargeBinary,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True
     )
     text: so.Mapped[Optional[str]] = so.mapped_column(
         sa.Text,
-        nullable=True
+        nullable=True,
+        deferred=True,
+        deferred_raiseload=True
     )
     law_number: so.Mapped[Optional[str]] = so.mapped_column(
         sa.String(16),
-        index=True,
+        nullable=True
+    )
+    priority: so.Mapped[int] = so.mapped_column(
+        sa.Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    # Ключ помесячных партиций (PARTITIONING_MODE=monthly)
+    created_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime,
+        server_default=sa.func.now(),
+        nullable=False
+    )
+    # Отметка выгрузки: в партиционированном режиме записи не удаляются по одной
+    exported_at: so.Mapped[Optional[datetime]] = so.mapped_column(
+        sa.DateTime,
+        nullable=True
+    )
+    # Время записи текста: водяной знак инкрементальной выгрузки в Parquet
+    text_updated_at: so.Mapped[Optional[datetime]] = so.mapped_column(
+        sa.DateTime,
+        nullable=True
+    )
+    # Отметка проверки текстового слоя PDF до OCR (TEXT_LAYER_ENABLED)
+    text_layer_checked_at: so.Mapped[Optional[datetime]] = so.mapped_column(
+        sa.DateTime,
         nullable=True
     )
 
@@ -99,4 +145,71 @@ class DataLegislation(Base):
     )
 
     def __repr__(self):
-        return f"<DataLegislation(id={self.id}, name='{self.name}')>"
\ No newline at end of file
+        return f"<DataLegislation(id={self.id}, name='{self.name}')>"
+
+
+# Условие очереди на распознавание: PDF загружен, текста еще нет
+QUEUE_CONDITION = sa.and_(DataLegislation.binary_pdf.isnot(None), DataLegislation.text.is_(None))
+
+# Готовые к выгрузке записи, которые еще не выгружены
+READY_CONDITION = sa.and_(
+    DataLegislation.binary_pdf.isnot(None),
+    DataLegislation.text.isnot(None),
+    DataLegislation.exported_at.is_(None)
+)
+
+# Документы с PDF, текстовый слой которых еще не проверялся
+TEXT_LAYER_PENDING_CONDITION = sa.and_(
+    DataLegislation.binary_pdf.isnot(None),
+    DataLegislation.text.is_(None),
+    DataLegislation.text_layer_checked_at.is_(None)
+)
+
+# Уникальность по хэшам (в партиционированном режиме - реестр data_legislation_keys)
+sa.Index("ix_data_legislation_name_hash", DataLegislation.name_hash, unique=True)
+sa.Index("ix_data_legislation_publication_number_hash", DataLegislation.publication_number_hash, unique=True)
+
+# Выдача документов без PDF (sql_get_legislation_by_not_binary_pdf)
+sa.Index(
+    "ix_data_legislation_missing_binary",
+    DataLegislation.id,
+    postgresql_where=DataLegislation.binary_pdf.is_(None)
+)
+
+# Частичные индексы под политики выдачи очереди (см. crud/scheduling.py)
+sa.Index(
+    "ix_data_legislation_queue_newest",
+    DataLegislation.publication_date.desc(),
+    DataLegislation.id,
+    postgresql_where=QUEUE_CONDITION
+)
+sa.Index(
+    "ix_data_legislation_queue_priority",
+    DataLegislation.priority.desc(),
+    DataLegislation.publication_date.desc(),
+    DataLegislation.id,
+    postgresql_where=QUEUE_CONDITION
+)
+sa.Index(
+    "ix_data_legislation_queue_authority",
+    DataLegislation.authority_id,
+    DataLegislation.publication_date.desc(),
+    DataLegislation.id,
+    postgresql_where=QUEUE_CONDITION
+)
+sa.Index(
+    "ix_data_legislation_ready",
+    DataLegislation.id,
+    postgresql_where=READY_CONDITION
+)
+sa.Index(
+    "ix_data_legislation_text_updated",
+    DataLegislation.text_updated_at,
+    DataLegislation.id,
+    postgresql_where=DataLegislation.text_updated_at.isnot(None)
+)
+sa.Index(
+    "ix_data_legislation_text_layer_pending",
+    DataLegislation.id,
+    postgresql_where=TEXT_LAYER_PENDING_CONDITION
+)
\ No newline at end of file
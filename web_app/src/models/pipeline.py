@@ -0,0 +1,127 @@
+# Внешние зависимости
+from typing import Any, Dict, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+from sqlalchemy.dialects.postgresql import JSONB
+# Внутренние модули
+from web_app.src.models.legislation import Base, DataLegislation
+
+
+# Состояния аренды: leased - у обработчика, retry - ждет повтора после ошибки,
+# done - стадия выполнена, failed - попытки исчерпаны
+LEASE_LEASED = "leased"
+LEASE_RETRY = "retry"
+LEASE_DONE = "done"
+LEASE_FAILED = "failed"
+LEASE_STATUSES = (LEASE_LEASED, LEASE_RETRY, LEASE_DONE, LEASE_FAILED)
+
+
+class PipelineLease(Base):
+    __tablename__ = 'pipeline_leases'
+
+    stage: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    # Без внешнего ключа: в режиме monthly первичный ключ data_legislation включает created_at
+    legislation_id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
+    status: so.Mapped[str] = so.mapped_column(sa.String(16), nullable=False)
+    # Обработчик в виде "ip:worker_id", как в бронях Redis
+    worker: so.Mapped[Optional[str]] = so.mapped_column(sa.String(128), nullable=True)
+    attempts: so.Mapped[int] = so.mapped_column(sa.Integer, nullable=False)
+    # Окончание аренды или время повтора: после него документ снова можно забрать
+    available_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, nullable=False)
+    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, server_default=sa.func.now(), nullable=False)
+    result: so.Mapped[Optional[Any]] = so.mapped_column(JSONB, nullable=True)
+    error: so.Mapped[Optional[str]] = so.mapped_column(sa.String(1024), nullable=True)
+
+    def __repr__(self):
+        return f"<PipelineLease(stage='{self.stage}', legislation_id={self.legislation_id}, status='{self.status}')>"
+
+
+# Незавершенные аренды стадии по времени освобождения: подсчет активных и поиск просроченных
+sa.Index(
+    "ix_pipeline_leases_open",
+    PipelineLease.stage,
+    PipelineLease.available_at,
+    postgresql_where=PipelineLease.status.in_((LEASE_LEASED, LEASE_RETRY))
+)
+
+
+PIPELINE_INPUT_COLUMNS = {
+    "text": DataLegislation.text,
+    "binary_pdf": DataLegislation.binary_pdf
+}
+PIPELINE_OUTPUT_COLUMNS = {
+    "law_number": DataLegislation.law_number
+}
+
+
+def pipeline_waiting_condition(input_column: sa.Column, output_column: Optional[sa.Column]) -> sa.ColumnElement:
+    """Вход есть, результата нет, документ не выгружен"""
+    conditions = [input_column.isnot(None), DataLegislation.exported_at.is_(None)]
+    if output_column is not None:
+        conditions.append(output_column.is_(None))
+    return sa.and_(*conditions)
+
+
+# Выдача стадий (sql_claim_pipeline_batch) в порядке priority DESC, id: частичный индекс на каждое
+# сочетание входа и выхода, иначе каждая выдача - полный просмотр и сортировка data_legislation
+for input_name, input_column in PIPELINE_INPUT_COLUMNS.items():
+    for output_name, output_column in [(None, None), *PIPELINE_OUTPUT_COLUMNS.items()]:
+        sa.Index(
+            f"ix_data_legislation_pipeline_{input_name}_{output_name or 'any'}",
+            DataLegislation.priority.desc(),
+            DataLegislation.id,
+            postgresql_where=pipeline_waiting_condition(input_column=input_column, output_column=output_column)
+        )
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """Стадия конвейера: входное условие, политика аренды и повторов, лимит параллельности"""
+    name: str
+    input: str
+    output: Optional[str]
+    requires: Tuple[str, ...]
+    lease_seconds: int
+    max_attempts: int
+    retry_delay_seconds: int
+    concurrency: int
+
+    @classmethod
+    def from_config(cls, name: str, stage: Dict[str, Any]) -> "PipelineStage":
+        return cls(
+            name=name,
+            input=stage["input"],
+            output=stage["output"],
+            requires=tuple(stage["requires"]),
+            lease_seconds=int(stage["lease_seconds"]),
+            max_attempts=int(stage["max_attempts"]),
+            retry_delay_seconds=int(stage["retry_delay_seconds"]),
+            concurrency=int(stage["concurrency"])
+        )
+
+    @property
+    def input_column(self) -> sa.Column:
+        return PIPELINE_INPUT_COLUMNS[self.input]
+
+    @property
+    def output_column(self) -> Optional[sa.Column]:
+        return PIPELINE_OUTPUT_COLUMNS[self.output] if self.output else None
+
+    @property
+    def condition(self) -> sa.ColumnElement:
+        """Документы, которые ждут стадию: вход есть, результата нет, предыдущие стадии выполнены"""
+        conditions = [pipeline_waiting_condition(input_column=self.input_column, output_column=self.output_column)]
+
+        for required in self.requires:
+            required_lease = so.aliased(PipelineLease)
+            conditions.append(
+                sa.exists().where(
+                    required_lease.stage == required,
+                    required_lease.legislation_id == DataLegislation.id,
+                    required_lease.status == LEASE_DONE
+                )
+            )
+
+        return sa.and_(*conditions)
\ No newline at end of file
@@ -1,17 +1,35 @@
 # Внешние зависимости
-from typing import Annotated, List
+from typing import Annotated, List, Optional
+from datetime import datetime
 from pydantic import Field
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+import asyncio
+import os
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, FileResponse
+from starlette.background import BackgroundTask
 # Внутренние модули
+from web_app.src.core import config
+from web_app.src.core.logger import bind_log_context
+from web_app.src.core.profiling import get_slow_log
 from web_app.src.crud import (sql_get_info, sql_get_free_legislation, sql_update_text, sql_update_binary,
                               sql_get_legislation_by_not_binary_pdf, sql_get_ready_legislation,
-                              sql_delete_ready_legislation)
+                              sql_delete_ready_legislation, sql_update_priority, sql_update_authority_weight,
+                              sql_get_queued_legislation, sql_get_partition_stats, sql_get_pinned_partitions,
+                              sql_update_texts, sql_get_export_watermark, sql_to_database_time)
 from web_app.src.schemas import (InfoWorkerResponse, SchemeReadyLegislation, SchemeTextLegislation,
                                  SchemeBinaryLegislation, RemoveWorkerRequest, SchemeNumberLegislation,
-                                 SchemeDeleteLegislation)
-from web_app.src.utils import redis_service
-from web_app.src.dependencies import get_client_ip
+                                 SchemeDeleteLegislation, SchemePriorityLegislation, SchemeAuthorityPriority,
+                                 SchemeTextBatchLegislation, SchemeFreeLegislation, SchemePipelineTextItem,
+                                 SchemePipelineBinaryItem, SchemePipelineComplete, SchemePipelineFail)
+from web_app.src.models import PipelineStage
+from web_app.src.utils import (redis_service, process_metrics, binary_spool, payload_executor, text_layer_extractor,
+                               pipeline)
+from web_app.src.utils.cache import CachedValue, cached_response
+from web_app.src.utils.payload import request_body_openapi, dump_json
+from web_app.src.utils.export import pa, export_parquet
+from web_app.src.utils.throughput import DEFAULT_BATCH_SIZE
+from web_app.src.dependencies import get_client_ip, admission, payload_body, profiling_token
 
 
 router = APIRouter(
@@ -20,18 +38,13 @@ router = APIRouter(
 )
 
 
-@router.get(
-    path="/db/stats",
-    response_class=JSONResponse,
-    summary="Информация по заполнению базы данных"
-)
-async def get_info_from_db():
+async def compute_db_stats() -> dict:
     stats = await sql_get_info()
     total_unloaded_count = await redis_service.get_total_unloaded_data()
 
     stats["total"] += total_unloaded_count
 
-    return {
+    result = {
         "Всего записей": stats["total"],
         "Записей с бинарными данными документов": stats["has_binary_pdf"],
         "Записей с текстом документов": stats["has_text"],
@@ -44,37 +57,240 @@ async def get_info_from_db():
             if stats["total"] > 0 else 0}%"
     }
 
+    if config.PARTITIONING_MODE == "monthly":
+        # Прошедшие месяцы, которые невыгруженные записи не дают освободить
+        result["Партиции, удерживаемые невыгруженными записями"] = await sql_get_pinned_partitions()
+
+    return result
+
+
+# Кэш статистики: дашборды, опрашивающие одновременно, вызывают один пересчет
+db_stats_cache = CachedValue(
+    name="db_stats",
+    compute=compute_db_stats,
+    ttl=config.STATS_CACHE_TTL,
+    stale_ttl=config.STATS_CACHE_STALE_TTL
+)
+redis_stats_cache = CachedValue(
+    name="redis_stats",
+    compute=redis_service.get_stats,
+    ttl=config.STATS_CACHE_TTL,
+    stale_ttl=config.STATS_CACHE_STALE_TTL
+)
+partition_stats_cache = CachedValue(
+    name="partition_stats",
+    compute=sql_get_partition_stats,
+    ttl=config.STATS_CACHE_TTL,
+    stale_ttl=config.STATS_CACHE_STALE_TTL
+)
+pipeline_stats_cache = CachedValue(
+    name="pipeline_stats",
+    compute=pipeline.get_stats,
+    ttl=config.STATS_CACHE_TTL,
+    stale_ttl=config.STATS_CACHE_STALE_TTL
+)
+worker_stats_cache = CachedValue(
+    name="worker_stats",
+    compute=redis_service.get_workers,
+    ttl=config.STATS_CACHE_TTL,
+    stale_ttl=config.STATS_CACHE_STALE_TTL
+)
+
+
+@router.get(
+    path="/db/stats",
+    response_class=JSONResponse,
+    summary="Информация по заполнению базы данных",
+    dependencies=[Depends(admission("stats"))]
+)
+async def get_info_from_db(request: Request):
+    return await cached_response(request=request, cache=db_stats_cache)
+
+
+@router.get(
+    path="/db/partitions",
+    response_class=JSONResponse,
+    summary="Информация по партициям таблицы законопроектов",
+    dependencies=[Depends(admission("stats"))]
+)
+async def get_info_from_partitions(request: Request):
+    return await cached_response(request=request, cache=partition_stats_cache)
+
 
 @router.get(
     path="/redis/stats",
     response_class=JSONResponse,
-    summary="Информация по Redis"
+    summary="Информация по Redis",
+    dependencies=[Depends(admission("stats"))]
 )
-async def get_info_from_redis():
-    stats = await redis_service.get_stats()
-    return stats
+async def get_info_from_redis(request: Request):
+    return await cached_response(request=request, cache=redis_stats_cache)
 
 
 @router.get(
     path="/worker/stats",
     response_model=List[InfoWorkerResponse],
-    summary="Информация по активным обработчикам"
+    summary="Информация по активным обработчикам",
+    dependencies=[Depends(admission("stats"))]
 )
-async def get_info_from_workers():
-    result = await redis_service.get_workers()
-    return result
+async def get_info_from_workers(request: Request):
+    return await cached_response(request=request, cache=worker_stats_cache)
 
 
+@router.get(
+    path="/metrics/processes",
+    response_class=JSONResponse,
+    summary="Сводные метрики процессов приложения"
+)
+async def get_info_from_processes():
+    stats = await process_metrics.aggregate()
+    return stats
+
+
+@router.get(
+    path="/debug/slow",
+    response_class=JSONResponse,
+    summary="Последние медленные запросы и SQL-запросы процесса",
+    dependencies=[Depends(profiling_token)]
+)
+async def get_slow_requests(
+    limit: Annotated[int, Field(ge=1)] = 20
+):
+    return get_slow_log(limit=limit)
+
+
+@router.get(
+    path="/hedge/stats",
+    response_class=JSONResponse,
+    summary="Информация по переизданию зависших документов"
+)
+async def get_info_from_hedge():
+    stats = await redis_service.get_hedge_stats()
+    return stats
+
+
+
+def get_pipeline_stage(stage: str) -> PipelineStage:
+    pipeline_stage = pipeline.get_stage(stage)
+    if pipeline_stage is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Pipeline stage '{stage}' not found")
+    return pipeline_stage
+
+
+@router.get(
+    path="/pipeline/stats",
+    response_class=JSONResponse,
+    summary="Информация по стадиям конвейера обработки",
+    dependencies=[Depends(admission("stats"))]
+)
+async def get_info_from_pipeline(request: Request):
+    return await cached_response(request=request, cache=pipeline_stats_cache)
+
+
+@router.get(
+    path="/pipeline/{stage}/claim",
+    response_model=List[SchemePipelineTextItem | SchemePipelineBinaryItem],
+    summary="Выдаем обработчику документы стадии конвейера",
+    dependencies=[Depends(admission("claim"))]
+)
+async def claim_pipeline_stage(
+    worker_id: int,
+    limit: Annotated[int, Field(ge=1)] = 10,
+    pipeline_stage: PipelineStage = Depends(get_pipeline_stage),
+    client_ip: str = Depends(get_client_ip)
+):
+    bind_log_context(worker_id=worker_id)
+
+    items = await pipeline.claim(stage=pipeline_stage, ip=client_ip, worker_id=worker_id, limit=limit)
+
+    if pipeline_stage.input == "binary_pdf":
+        return payload_executor.json_response(
+            items=[SchemePipelineBinaryItem(id=item.id, input=item.input) for item in items],
+            binary_field="input"
+        )
+
+    content = [{"id": item.id, "input": item.input} for item in items]
+    body = await payload_executor.run("json_render", sum(len(item.input) for item in items), dump_json, content)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post(
+    path="/pipeline/{stage}/complete",
+    response_class=JSONResponse,
+    summary="Принимаем результаты стадии конвейера",
+    dependencies=[Depends(admission("upload"))]
+)
+async def complete_pipeline_stage(
+    data: SchemePipelineComplete,
+    pipeline_stage: PipelineStage = Depends(get_pipeline_stage),
+    client_ip: str = Depends(get_client_ip)
+):
+    bind_log_context(worker_id=data.worker_id)
+
+    # Результат стадии с колонкой output записывается в документ и должен в нее помещаться
+    output_column = pipeline_stage.output_column
+    if output_column is not None:
+        invalid_ids = [
+            item.id for item in data.items
+            if not isinstance(item.result, str) or len(item.result) > output_column.type.length
+        ]
+        if invalid_ids:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Result must be a string of at most {output_column.type.length} characters: {invalid_ids}"
+            )
+
+    return await pipeline.complete(
+        stage=pipeline_stage,
+        ip=client_ip,
+        worker_id=data.worker_id,
+        results={item.id: item.result for item in data.items}
+    )
+
+
+@router.post(
+    path="/pipeline/{stage}/fail",
+    response_class=JSONResponse,
+    summary="Возвращаем документы стадии конвейера после ошибки обработки",
+    dependencies=[Depends(admission("upload"))]
+)
+async def fail_pipeline_stage(
+    data: SchemePipelineFail,
+    pipeline_stage: PipelineStage = Depends(get_pipeline_stage),
+    client_ip: str = Depends(get_client_ip)
+):
+    bind_log_context(worker_id=data.worker_id)
+
+    return await pipeline.fail(
+        stage=pipeline_stage,
+        ip=client_ip,
+        worker_id=data.worker_id,
+        legislation_ids=data.ids,
+        error=data.error
+    )
+
 @router.get(
     path="/legislation/free",
-    response_model=List[SchemeBinaryLegislation],
-    summary="Возвращаем данные законопроектов, которые можно обработать"
+    response_model=List[SchemeFreeLegislation],
+    summary="Возвращаем данные законопроектов, которые можно обработать",
+    dependencies=[Depends(admission("claim"))]
 )
 async def get_free_legislation(
     worker_id: int,
-    limit: Annotated[int, Field(ge=1)] = 10,
+    response: Response,
+    limit: Annotated[int, Field(ge=1)] = DEFAULT_BATCH_SIZE,
     client_ip: str = Depends(get_client_ip)
 ):
+    suggested_batch_size = await redis_service.get_suggested_batch_size(
+        ip=client_ip,
+        worker_id=worker_id,
+        default=limit
+    )
+    response.headers["X-Suggested-Batch-Size"] = str(suggested_batch_size)
+
+    if config.BATCH_SIZE_MODE == "enforce":
+        limit = suggested_batch_size
+
     async with redis_service.lock():
         reservation_legislation_ids = await redis_service.get_legislation_ids()
 
@@ -83,6 +299,23 @@ async def get_free_legislation(
             limit=limit
         )
 
+        # Очередь исчерпана: переиздаем документы, зависшие у медленных обработчиков
+        if len(legislation) < limit:
+            straggling_ids = await redis_service.get_straggling_legislation_ids(
+                ip=client_ip,
+                worker_id=worker_id,
+                limit=limit - len(legislation)
+            )
+
+            if straggling_ids:
+                hedged_legislation = await sql_get_queued_legislation(legislation_ids=straggling_ids)
+                await redis_service.mark_hedged(
+                    ip=client_ip,
+                    worker_id=worker_id,
+                    legislation_ids=[l.id for l in hedged_legislation]
+                )
+                legislation += hedged_legislation
+
         await redis_service.ping_worker(
             ip=client_ip,
             worker_id=worker_id,
@@ -90,13 +323,15 @@ async def get_free_legislation(
             legislation_ids=[l.id for l in legislation]
         )
 
-        return legislation
+    # base64 кодируется по кускам при отправке ответа, уже после снятия блокировки
+    return payload_executor.json_response(items=legislation, binary_field="binary")
 
 
 @router.get(
     path="/legislation/not_binary",
     response_model=List[SchemeNumberLegislation],
-    summary="Возвращаем публикационные номера законопроектов, которые не имеют бинарных данных"
+    summary="Возвращаем публикационные номера законопроектов, которые не имеют бинарных данных",
+    dependencies=[Depends(admission("claim"))]
 )
 async def get_not_binary_legislation(
     limit: Annotated[int, Field(ge=1)] = 10_000
@@ -108,47 +343,157 @@ async def get_not_binary_legislation(
 @router.get(
     path="/legislation/ready",
     response_model=List[SchemeReadyLegislation],
-    summary="Передаем данные о выгрузке"
+    summary="Передаем данные о выгрузке",
+    dependencies=[Depends(admission("claim"))]
 )
 async def get_ready_legislation(limit: int = 10):
     legislation = await sql_get_ready_legislation(limit=limit)
-    return legislation
+    return payload_executor.json_response(items=legislation, binary_field="binary_pdf")
 
 
 @router.patch(
     path="/legislation/update/binary",
     response_class=JSONResponse,
-    summary="Обновляем бинарные данные pdf файла законопроекта"
+    summary="Обновляем бинарные данные pdf файла законопроекта",
+    dependencies=[Depends(admission("upload"))],
+    openapi_extra=request_body_openapi(SchemeBinaryLegislation)
 )
 async def update_binary_legislation(
-        data: SchemeBinaryLegislation
+        data: SchemeBinaryLegislation = Depends(payload_body(SchemeBinaryLegislation))
 ):
+    try:
+        content = await payload_executor.decode_base64(data.binary)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid base64 string")
+
+    # Режим спула: подтверждаем после fsync в локальный журнал, в БД пишет фоновый сброс
+    if config.BINARY_SPOOL_ENABLED:
+        await binary_spool.append(legislation_id=data.id, data=content)
+        return {"status": "success"}
+
     await sql_update_binary(
         legislation_id=data.id,
-        content=data.binary
+        content=content
     )
 
+    # PDF с текстовым слоем получит текст на сервере, минуя OCR
+    if config.TEXT_LAYER_ENABLED:
+        text_layer_extractor.wake()
+
     return {"status": "success"}
 
 
 @router.patch(
     path="/legislation/update/text",
     response_class=JSONResponse,
-    summary="Обновляем текст законопроекта"
+    summary="Обновляем текст законопроекта",
+    dependencies=[Depends(admission("upload"))],
+    openapi_extra=request_body_openapi(SchemeTextLegislation)
 )
 async def update_text_legislation(
-        data: SchemeTextLegislation,
+        data: SchemeTextLegislation = Depends(payload_body(SchemeTextLegislation)),
         client_ip: str = Depends(get_client_ip)
 ):
-    await sql_update_text(
+    bind_log_context(worker_id=data.worker_id)
+
+    applied = await sql_update_text(
         legislation_id=data.id,
         content=data.text
     )
 
+    await redis_service.complete_legislation(
+        ip=client_ip,
+        worker_id=data.worker_id,
+        legislation_id=data.id,
+        applied=applied
+    )
+    await redis_service.drop_worker_legislation(
+        ip=client_ip,
+        worker_id=data.worker_id,
+        legislation_ids=[data.id]
+    )
+
+    await redis_service.ping_worker(
+        ip=client_ip,
+        worker_id=data.worker_id,
+        processed_data=1 if applied else 0
+    )
+
+    return {"status": "success" if applied else "duplicate"}
+
+
+@router.patch(
+    path="/legislation/update/text/batch",
+    response_class=JSONResponse,
+    summary="Обновляем тексты пакета законопроектов",
+    dependencies=[Depends(admission("upload"))],
+    openapi_extra=request_body_openapi(SchemeTextBatchLegislation)
+)
+async def update_text_legislation_batch(
+        data: SchemeTextBatchLegislation = Depends(payload_body(SchemeTextBatchLegislation)),
+        client_ip: str = Depends(get_client_ip)
+):
+    bind_log_context(worker_id=data.worker_id)
+
+    applied_ids, missing_ids = await sql_update_texts(
+        texts={item.id: item.text for item in data.items}
+    )
+    applied = set(applied_ids)
+    missing = set(missing_ids)
+
+    await asyncio.gather(*(
+        redis_service.complete_legislation(
+            ip=client_ip,
+            worker_id=data.worker_id,
+            legislation_id=item.id,
+            applied=item.id in applied
+        )
+        for item in data.items
+        if item.id not in missing
+    ))
+    await redis_service.drop_worker_legislation(
+        ip=client_ip,
+        worker_id=data.worker_id,
+        legislation_ids=[item.id for item in data.items]
+    )
+
     await redis_service.ping_worker(
         ip=client_ip,
         worker_id=data.worker_id,
-        processed_data=1
+        processed_data=len(applied)
+    )
+
+    return {
+        "status": "success",
+        "applied": applied_ids,
+        "duplicate": [item.id for item in data.items if item.id not in applied and item.id not in missing],
+        "not_found": missing_ids
+    }
+
+
+@router.patch(
+    path="/legislation/update/priority",
+    response_class=JSONResponse,
+    summary="Обновляем приоритет распознавания законопроектов"
+)
+async def update_priority_legislation(data: SchemePriorityLegislation):
+    update_count = await sql_update_priority(
+        legislation_ids=data.ids,
+        priority=data.priority
+    )
+
+    return {"status": "success", "update_count": update_count}
+
+
+@router.patch(
+    path="/authority/update/priority",
+    response_class=JSONResponse,
+    summary="Обновляем вес органа власти в очереди распознавания"
+)
+async def update_priority_authority(data: SchemeAuthorityPriority):
+    await sql_update_authority_weight(
+        authority_id=data.id,
+        priority_weight=data.priority_weight
     )
 
     return {"status": "success"}
@@ -163,17 +508,27 @@ async def delete_worker(
     data: RemoveWorkerRequest,
     client_ip: str = Depends(get_client_ip)
 ):
+    bind_log_context(worker_id=data.worker_id)
+
     message = await redis_service.delete_worker(
         ip=client_ip,
         worker_id=data.worker_id
     )
+
+    # Аренды стадий конвейера хранятся в БД и возвращаются отдельно от броней Redis
+    await pipeline.release_worker(
+        ip=client_ip,
+        worker_id=data.worker_id
+    )
+
     return {"message": message}
 
 
 @router.post(
     path="/legislation/ready/delete",
     response_class=JSONResponse,
-    summary="Удаляем выгруженные законопроекты"
+    summary="Удаляем выгруженные законопроекты",
+    dependencies=[Depends(admission("claim"))]
 )
 async def update_text_legislation(data: SchemeDeleteLegislation):
     delete_count = await sql_delete_ready_legislation(legislation_ids=data.ids)
@@ -181,3 +536,49 @@ async def update_text_legislation(data: SchemeDeleteLegislation):
     await redis_service.add_unloaded_data(unloaded_count=delete_count)
 
     return {"status": "success", "delete_count": delete_count}
+
+
+
+@router.get(
+    path="/export/parquet",
+    response_class=FileResponse,
+    summary="Выгружаем тексты законопроектов в Parquet",
+    dependencies=[Depends(admission("export"))]
+)
+async def export_legislation_parquet(since: Optional[datetime] = None, include_pdf: bool = False):
+    if pa is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="pyarrow is not installed")
+
+    # Водяной знак из заголовка передается в since следующего запроса. Он без часового пояса,
+    # а since с поясом (2026-01-01T00:00:00Z) переводится в часы БД, иначе сравнение падает
+    until = await sql_get_export_watermark(lag_seconds=config.EXPORT_WATERMARK_LAG_SECONDS)
+    if since is not None and since.tzinfo is not None:
+        since = await sql_to_database_time(since)
+    headers = {"X-Export-Watermark": until.isoformat()}
+    if since is not None and until <= since:
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers={**headers, "X-Export-Rows": "0"})
+
+    # Временные файлы отдельно от набора данных: каталоги с точкой читатели Parquet пропускают
+    scratch_dir = os.path.join(config.EXPORT_DIR, ".http")
+    await asyncio.to_thread(os.makedirs, scratch_dir, exist_ok=True)
+    file_descriptor, path = tempfile.mkstemp(dir=scratch_dir, prefix="export-", suffix=".parquet")
+    os.close(file_descriptor)
+
+    try:
+        rows = await export_parquet(path=path, since=since, until=until, include_pdf=include_pdf)
+    except BaseException:
+        await asyncio.to_thread(os.unlink, path)
+        raise
+
+    headers["X-Export-Rows"] = str(rows)
+    if not rows:
+        await asyncio.to_thread(os.unlink, path)
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
+
+    return FileResponse(
+        path=path,
+        media_type="application/vnd.apache.parquet",
+        filename=f"legislation-{until.strftime('%Y%m%dT%H%M%S')}.parquet",
+        headers=headers,
+        background=BackgroundTask(os.unlink, path)
+    )
\ No newline at end of file
@@ -1,3 +1,7 @@
 from web_app.src.schemas.worker import (InfoWorkerResponse, RemoveWorkerRequest)
 from web_app.src.schemas.legislation import (SchemeReadyLegislation, SchemeBinaryLegislation, SchemeTextLegislation,
-                                             SchemeNumberLegislation, SchemeDeleteLegislation)
\ No newline at end of file
+                                             SchemeNumberLegislation, SchemeDeleteLegislation, SchemePriorityLegislation,
+                                             SchemeAuthorityPriority, SchemeTextItemLegislation,
+                                             SchemeTextBatchLegislation, SchemeFreeLegislation)
+from web_app.src.schemas.pipeline import (SchemePipelineTextItem, SchemePipelineBinaryItem, SchemePipelineResult,
+                                          SchemePipelineComplete, SchemePipelineFail)
\ No newline at end of file
@@ -17,6 +17,16 @@ class SchemeReadyLegislation(BaseModel):
         raise ValueError("Not binary data")
 
 
+# Схема законопроекта, выдаваемого на распознавание (base64 кодируется при сериализации ответа)
+class SchemeFreeLegislation(BaseModel):
+    id: Annotated[int, Field(ge=1)]
+    binary: bytes
+
+    @field_serializer('binary')
+    def serialize_binary(self, binary: bytes, _info) -> str:
+        return base64.b64encode(binary).decode('utf-8')
+
+
 # Схема текста законодательства
 class SchemeTextLegislation(BaseModel):
     worker_id: Annotated[int, Field(ge=0)]
@@ -24,6 +34,18 @@ class SchemeTextLegislation(BaseModel):
     text: Annotated[str, Field(strict=True, strip_whitespace=True)]
 
 
+# Схема текста законодательства в пакете
+class SchemeTextItemLegislation(BaseModel):
+    id: Annotated[int, Field(ge=1)]
+    text: Annotated[str, Field(strict=True, strip_whitespace=True)]
+
+
+# Схема пакета текстов законодательства от одного обработчика
+class SchemeTextBatchLegislation(BaseModel):
+    worker_id: Annotated[int, Field(ge=0)]
+    items: Annotated[List[SchemeTextItemLegislation], Field(min_length=1)]
+
+
 # Схема бинарных данных pdf файла законодательства
 class SchemeBinaryLegislation(BaseModel):
     id: Annotated[int, Field(ge=1)]
@@ -47,4 +69,16 @@ class SchemeNumberLegislation(BaseModel):
 
 # Схема для удаления законопроектов
 class SchemeDeleteLegislation(BaseModel):
-    ids: List[Annotated[int, Field(ge=1)]]
\ No newline at end of file
+    ids: List[Annotated[int, Field(ge=1)]]
+
+
+# Схема изменения приоритета распознавания законопроектов
+class SchemePriorityLegislation(BaseModel):
+    ids: List[Annotated[int, Field(ge=1)]]
+    priority: int
+
+
+# Схема изменения веса органа власти в очереди распознавания
+class SchemeAuthorityPriority(BaseModel):
+    id: Annotated[int, Field(ge=1)]
+    priority_weight: Annotated[int, Field(ge=1)]
\ No newline at end of file
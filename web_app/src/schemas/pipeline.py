@@ -0,0 +1,39 @@
+# Внешние зависимости
+from typing import Annotated, List
+import base64
+from pydantic import BaseModel, Field, JsonValue, field_serializer
+
+
+# Документ стадии с текстовым входом
+class SchemePipelineTextItem(BaseModel):
+    id: Annotated[int, Field(ge=1)]
+    input: str
+
+
+# Документ стадии с входом PDF (base64 кодируется при сериализации ответа)
+class SchemePipelineBinaryItem(BaseModel):
+    id: Annotated[int, Field(ge=1)]
+    input: bytes
+
+    @field_serializer('input')
+    def serialize_input(self, data: bytes, _info) -> str:
+        return base64.b64encode(data).decode('utf-8')
+
+
+# Результат стадии по документу: строка для стадий с колонкой output, иначе любой JSON
+class SchemePipelineResult(BaseModel):
+    id: Annotated[int, Field(ge=1)]
+    result: JsonValue
+
+
+# Схема завершения пачки документов стадии
+class SchemePipelineComplete(BaseModel):
+    worker_id: Annotated[int, Field(ge=0)]
+    items: Annotated[List[SchemePipelineResult], Field(min_length=1)]
+
+
+# Схема ошибки обработки документов стадии
+class SchemePipelineFail(BaseModel):
+    worker_id: Annotated[int, Field(ge=0)]
+    ids: Annotated[List[Annotated[int, Field(ge=1)]], Field(min_length=1)]
+    error: Annotated[str, Field(max_length=1024)] = ""
\ No newline at end of file
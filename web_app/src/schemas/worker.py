@@ -1,5 +1,5 @@
 # Внешние зависимости
-from typing import Annotated
+from typing import Annotated, Optional
 from pydantic import BaseModel, Field
 
 
@@ -11,6 +11,8 @@ class InfoWorkerResponse(BaseModel):
     last_connection_time: Annotated[str, Field(strict=True, strip_whitespace=True)]
     active_time: Annotated[str, Field(strict=True, strip_whitespace=True)]
     total_processed_data: Annotated[int, Field(ge=0)]
+    throughput: Optional[Annotated[float, Field(ge=0)]] = None
+    suggested_batch_size: Annotated[int, Field(ge=1)]
 
 
 # Схема запроса удаления обработчика
@@ -1,4 +1,16 @@
 from web_app.src.utils.redis_service import get_redis_service
+from web_app.src.utils.metrics import get_process_metrics
+from web_app.src.utils.partitions import get_partition_maintenance
+from web_app.src.utils.spool import get_binary_spool
+from web_app.src.utils.payload import get_payload_executor
+from web_app.src.utils.text_layer import get_text_layer_extractor
+from web_app.src.utils.pipeline import get_pipeline
 
 
-redis_service = get_redis_service()
\ No newline at end of file
+redis_service = get_redis_service()
+process_metrics = get_process_metrics()
+partition_maintenance = get_partition_maintenance()
+binary_spool = get_binary_spool()
+payload_executor = get_payload_executor()
+text_layer_extractor = get_text_layer_extractor()
+pipeline = get_pipeline()
\ No newline at end of file
@@ -0,0 +1,85 @@
+# Внешние зависимости
+from typing import Dict
+from contextlib import asynccontextmanager
+import asyncio
+import math
+import time
+from fastapi import HTTPException, status
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.utils.metrics import get_process_metrics
+
+
+process_metrics = get_process_metrics()
+
+
+class ConcurrencyLimiter:
+    """Ограничение одновременных запросов класса маршрутов с короткой очередью"""
+    def __init__(self, route_class: str, limit: int, queue_size: int, queue_timeout: float):
+        self.route_class = route_class
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        # Скользящее среднее времени обработки для оценки Retry-After
+        self.service_time = 0.1
+        self._semaphore = asyncio.Semaphore(limit)
+
+        process_metrics.register_gauge(f"admission_in_flight:{route_class}", lambda: self.in_flight)
+        process_metrics.register_gauge(f"admission_waiting:{route_class}", lambda: self.waiting)
+
+    def retry_after(self) -> int:
+        """Через сколько секунд очередь перед новым запросом успеет разойтись"""
+        return max(1, math.ceil((self.waiting + 1) * self.service_time / self.limit))
+
+    def _reject(self, reason: str):
+        process_metrics.incr(f"admission_rejected:{self.route_class}")
+        config.logger.warning(f"Admission rejected for {self.route_class}: {reason}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is overloaded, retry later",
+            headers={"Retry-After": str(self.retry_after())}
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                self._reject("queue is full")
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject("queue wait timeout")
+            finally:
+                self.waiting -= 1
+
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.service_time = 0.8 * self.service_time + 0.2 * (time.perf_counter() - start_time)
+            self._semaphore.release()
+
+
+_limiters: Dict[str, ConcurrencyLimiter] = {}
+
+
+def get_limiter(route_class: str) -> ConcurrencyLimiter:
+    if route_class not in _limiters:
+        _limiters[route_class] = ConcurrencyLimiter(
+            route_class=route_class,
+            limit=config.ADMISSION_LIMITS.get(route_class, config.DB_POOL_SIZE),
+            queue_size=config.ADMISSION_QUEUE_SIZE,
+            queue_timeout=config.ADMISSION_QUEUE_TIMEOUT
+        )
+
+    return _limiters[route_class]
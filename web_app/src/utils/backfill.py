@@ -0,0 +1,248 @@
+# Внешние зависимости
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import re
+import time
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.crud import (sql_get_backfill_checkpoint, sql_reset_backfill_checkpoint, sql_get_backfill_chunk,
+                              sql_apply_backfill_chunk, sql_finish_backfill, sql_get_max_legislation_id,
+                              sql_count_active_queries)
+from web_app.src.models import DataLegislation
+
+
+# Номер акта в реквизитах: «№ 123-ФЗ», «N 45-ФКЗ», «№ 1234-р». Вокруг дефиса только пробелы
+# в строке: дефис после переноса начинает пункт списка, а не продолжает номер
+LAW_NUMBER_PATTERN = re.compile(r"(?<!\w)(?:№|N)\s*(\d+(?:[ \t\xa0]*[-‑–][ \t\xa0]*[0-9A-Za-zА-Яа-яЁё]+)*)")
+# Реквизиты стоят в начале документа, дальше номер может относиться к другому акту
+LAW_NUMBER_HEADER_CHARS = 3000
+LAW_NUMBER_MAX_LENGTH = DataLegislation.law_number.type.length
+
+# Повторы пачки, не дождавшейся блокировки строк рабочего пути
+APPLY_ATTEMPTS = 5
+# Пауза при нагрузке на БД и предельное ожидание ее спада перед очередной пачкой
+LOAD_PAUSE_SECONDS = 1.0
+MAX_LOAD_WAIT_SECONDS = 60.0
+
+
+# Извлекатели объявлены на уровне модуля: они передаются в пул процессов через pickle
+
+def extract_law_number(text: str) -> Optional[str]:
+    match = LAW_NUMBER_PATTERN.search(text[:LAW_NUMBER_HEADER_CHARS])
+    if match is None:
+        return None
+
+    number = re.sub(r"\s+", "", match.group(1)).replace("‑", "-").replace("–", "-")
+    return number if len(number) <= LAW_NUMBER_MAX_LENGTH else None
+
+
+def run_extractor(extractor: Callable[[str], Optional[str]], rows: List[Tuple[int, str]]) -> Dict[int, str]:
+    """Значения для части пачки; документы без результата остаются пустыми"""
+    values = {}
+    for legislation_id, source in rows:
+        try:
+            value = extractor(source)
+        except Exception:
+            value = None
+
+        if value is not None:
+            values[legislation_id] = value
+
+    return values
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """Производная колонка: значение target вычисляется extractor из source"""
+    name: str
+    source: sa.Column
+    target: sa.Column
+    extractor: Callable[[str], Optional[str]]
+
+
+BACKFILLS = {
+    "law_number": Backfill(
+        name="law_number",
+        source=DataLegislation.text,
+        target=DataLegislation.law_number,
+        extractor=extract_law_number
+    )
+}
+
+
+class BackfillRunner:
+    """Заполнение производной колонки по всему корпусу.
+
+    Документы читаются пачками по ключу id, значения вычисляются в пуле процессов,
+    результаты записываются одним UPDATE на пачку вместе с контрольной точкой, поэтому
+    прерванный проход продолжается с места остановки. Темп ограничивается числом строк
+    в секунду, долей времени работы с БД и числом активных запросов рабочего пути.
+    """
+    def __init__(
+        self,
+        backfill: Backfill,
+        chunk_size: int,
+        pool_size: int,
+        rows_per_second: float,
+        duty_cycle: float,
+        max_active_queries: int,
+        progress_interval: float
+    ):
+        self.backfill = backfill
+        self.chunk_size = chunk_size
+        self.pool_size = pool_size
+        self.rows_per_second = rows_per_second
+        self.duty_cycle = duty_cycle
+        self.max_active_queries = max_active_queries
+        self.progress_interval = progress_interval
+
+        self.scanned = 0
+        self.updated = 0
+        self._started_at = 0.0
+        self._reported_at = 0.0
+
+    async def _fetch(self, after_id: int) -> List[Tuple[int, str]]:
+        return await sql_get_backfill_chunk(
+            source=self.backfill.source,
+            target=self.backfill.target,
+            after_id=after_id,
+            limit=self.chunk_size
+        )
+
+    async def _extract(self, pool: ProcessPoolExecutor, rows: List[Tuple[int, str]]) -> Dict[int, str]:
+        loop = asyncio.get_running_loop()
+        part_size = -(-len(rows) // self.pool_size)
+
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(pool, run_extractor, self.backfill.extractor, rows[offset:offset + part_size])
+            for offset in range(0, len(rows), part_size)
+        ))
+        return {legislation_id: value for part in parts for legislation_id, value in part.items()}
+
+    async def _apply(self, values: Dict[int, str], last_id: int, scanned: int) -> int:
+        for attempt in range(APPLY_ATTEMPTS):
+            try:
+                return await sql_apply_backfill_chunk(
+                    name=self.backfill.name,
+                    target=self.backfill.target,
+                    values=values,
+                    last_id=last_id,
+                    scanned=scanned
+                )
+
+            except SQLAlchemyError:
+                # Строки пачки заняты рабочим путем (lock_timeout): уступаем и повторяем
+                if attempt == APPLY_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(LOAD_PAUSE_SECONDS * 2 ** attempt)
+
+    async def _wait_for_load(self):
+        if self.max_active_queries <= 0:
+            return
+
+        waited = 0.0
+        while waited < MAX_LOAD_WAIT_SECONDS and await sql_count_active_queries() > self.max_active_queries:
+            await asyncio.sleep(LOAD_PAUSE_SECONDS)
+            waited += LOAD_PAUSE_SECONDS
+
+        if waited:
+            config.logger.info(f"Backfill {self.backfill.name} paused {waited:.0f}s for database load")
+
+    async def _pace(self, rows: int, busy_seconds: float):
+        # Пауза по доле времени работы с БД и по лимиту строк в секунду
+        delay = busy_seconds * (1 - self.duty_cycle) / self.duty_cycle
+        if self.rows_per_second > 0:
+            delay = max(delay, rows / self.rows_per_second - busy_seconds)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _report(self, last_id: int, max_id: int, start_id: int, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._reported_at < self.progress_interval:
+            return
+        self._reported_at = now
+
+        elapsed = max(now - self._started_at, 1e-9)
+        done_share = (last_id - start_id) / (max_id - start_id) if max_id > start_id else 1.0
+        eta = elapsed * (1 - done_share) / done_share if done_share > 0 else float("nan")
+        config.logger.info(
+            f"Backfill {self.backfill.name}: id {last_id}/{max_id} ({done_share:.1%}), scanned {self.scanned}, "
+            f"updated {self.updated}, {self.scanned / elapsed:.0f} rows/s, eta {eta:.0f}s"
+        )
+
+    async def run(self, reset: bool = False) -> Dict[str, Any]:
+        if reset:
+            await sql_reset_backfill_checkpoint(name=self.backfill.name)
+
+        checkpoint = await sql_get_backfill_checkpoint(name=self.backfill.name)
+        start_id = last_id = checkpoint.last_id
+        max_id = await sql_get_max_legislation_id()
+        self._started_at = self._reported_at = time.monotonic()
+
+        config.logger.info(f"Backfill {self.backfill.name} starts after id {last_id}, max id {max_id}")
+
+        pool = ProcessPoolExecutor(max_workers=self.pool_size, mp_context=multiprocessing.get_context("spawn"))
+        next_chunk = asyncio.create_task(self._fetch(after_id=last_id))
+
+        try:
+            while True:
+                await self._wait_for_load()
+
+                fetch_started_at = time.perf_counter()
+                rows = await next_chunk
+                if not rows:
+                    break
+                fetch_seconds = time.perf_counter() - fetch_started_at
+
+                # Следующая пачка читается, пока текущая обрабатывается в пуле
+                last_id = rows[-1][0]
+                next_chunk = asyncio.create_task(self._fetch(after_id=last_id))
+
+                values = await self._extract(pool=pool, rows=rows)
+
+                apply_started_at = time.perf_counter()
+                self.updated += await self._apply(values=values, last_id=last_id, scanned=len(rows))
+                self.scanned += len(rows)
+
+                await self._pace(rows=len(rows), busy_seconds=fetch_seconds + time.perf_counter() - apply_started_at)
+                self._report(last_id=last_id, max_id=max_id, start_id=start_id)
+
+            await sql_finish_backfill(name=self.backfill.name)
+
+        finally:
+            next_chunk.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        self._report(last_id=last_id, max_id=max_id, start_id=start_id, force=True)
+        return {
+            "backfill": self.backfill.name,
+            "last_id": last_id,
+            "scanned": self.scanned,
+            "updated": self.updated,
+            "seconds": round(time.monotonic() - self._started_at, 3)
+        }
+
+
+def get_backfill_runner(name: str, **overrides) -> BackfillRunner:
+    """Исполнитель заполнения с настройками из config; overrides - параметры командной строки"""
+    settings = {
+        "chunk_size": config.BACKFILL_CHUNK_SIZE,
+        "pool_size": config.BACKFILL_POOL_SIZE,
+        "rows_per_second": config.BACKFILL_ROWS_PER_SECOND,
+        "duty_cycle": config.BACKFILL_DUTY_CYCLE,
+        "max_active_queries": config.BACKFILL_MAX_ACTIVE_QUERIES,
+        "progress_interval": config.BACKFILL_PROGRESS_SECONDS
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+
+    # Параметры командной строки минуют config.validate(): те же ограничения проверяем здесь
+    if settings["chunk_size"] < 1 or settings["pool_size"] < 1 or settings["rows_per_second"] < 0:
+        raise ValueError("chunk_size and pool_size must be positive, rows_per_second not negative")
+
+    return BackfillRunner(backfill=BACKFILLS[name], **settings)
\ No newline at end of file
@@ -0,0 +1,84 @@
+# Внешние зависимости
+from typing import Any, Awaitable, Callable, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import time
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+# Внутренние модули
+from web_app.src.core import config
+
+
+class CachedValue:
+    """Кэш одного значения: TTL, одно вычисление на всех ожидающих, stale-while-revalidate"""
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float
+    ):
+        self.name = name
+        self.compute = compute
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.value: Any = None
+        self.etag: Optional[str] = None
+        self.computed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _refresh(self):
+        try:
+            value = jsonable_encoder(await self.compute())
+            self.etag = hashlib.sha1(
+                json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            ).hexdigest()
+            self.value = value
+            self.computed_at = time.monotonic()
+
+        finally:
+            self._refresh_task = None
+
+    def _start_refresh(self) -> asyncio.Task:
+        # Все одновременные запросы ждут одну и ту же задачу пересчета
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    def _log_background_error(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            config.logger.error(f"Error refreshing {self.name} cache: {task.exception()}")
+
+    async def get(self) -> Tuple[Any, str, float]:
+        """Значение, его ETag и возраст в секундах"""
+        if self.computed_at is not None:
+            age = time.monotonic() - self.computed_at
+
+            if age < self.ttl:
+                return self.value, self.etag, age
+
+            # Отдаем устаревшее значение и пересчитываем в фоне
+            if age < self.ttl + self.stale_ttl:
+                if self._refresh_task is None:
+                    self._start_refresh().add_done_callback(self._log_background_error)
+                return self.value, self.etag, age
+
+        await asyncio.shield(self._start_refresh())
+        return self.value, self.etag, 0.0
+
+
+async def cached_response(request: Request, cache: CachedValue) -> Response:
+    """Ответ из кэша с ETag/Cache-Control и 304 для If-None-Match"""
+    value, etag, age = await cache.get()
+
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": f"max-age={max(int(cache.ttl - age), 0)}, stale-while-revalidate={int(cache.stale_ttl)}"
+    }
+
+    if request.headers.get("If-None-Match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=value, headers=headers)
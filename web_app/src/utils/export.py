@@ -0,0 +1,242 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import json
+import os
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.crud import sql_get_export_watermark, sql_stream_export_rows
+from web_app.src.utils.metrics import get_process_metrics
+
+# Необязательная зависимость: без нее выгрузка в Parquet недоступна
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+process_metrics = get_process_metrics()
+
+# Файлы с префиксом "_" и "." pyarrow не считает частью набора данных
+MANIFEST_FILE = "_manifest.json"
+# Строк за одно чтение из курсора: с PDF пачка меньше, иначе в памяти окажутся сотни документов
+FETCH_ROWS = 1000
+FETCH_ROWS_WITH_PDF = 16
+
+
+def export_schema(include_pdf: bool) -> "pa.Schema":
+    """Схема файла; порядок колонок совпадает с EXPORT_COLUMNS"""
+    fields = [
+        pa.field("id", pa.int32(), nullable=False),
+        pa.field("name", pa.string(), nullable=False),
+        pa.field("publication_number", pa.string(), nullable=False),
+        pa.field("publication_date", pa.timestamp("us"), nullable=False),
+        pa.field("law_number", pa.string()),
+        pa.field("authority_id", pa.int32(), nullable=False),
+        pa.field("authority_name", pa.string(), nullable=False),
+        pa.field("priority", pa.int32(), nullable=False),
+        pa.field("link_pdf", pa.string(), nullable=False),
+        pa.field("created_at", pa.timestamp("us"), nullable=False),
+        pa.field("text_updated_at", pa.timestamp("us"), nullable=False),
+        # large_*: 64-битные смещения, группа строк может быть больше 2 ГБ
+        pa.field("text", pa.large_string(), nullable=False)
+    ]
+    if include_pdf:
+        fields.append(pa.field("binary_pdf", pa.large_binary()))
+
+    return pa.schema(fields)
+
+
+class ParquetExport:
+    """Потоковая запись выгрузки: в памяти не больше одной группы строк.
+
+    Группа сбрасывается по числу строк или объему, файл пишется под временным
+    именем и появляется под итоговым только целиком.
+    """
+    def __init__(self, path: str, include_pdf: bool, row_group_rows: int, row_group_bytes: int, compression: str):
+        if pa is None:
+            config.logger.error("Parquet export requires the pyarrow package")
+            raise RuntimeError("pyarrow is not installed")
+
+        self.path = path
+        self.include_pdf = include_pdf
+        self.row_group_rows = row_group_rows
+        self.row_group_bytes = row_group_bytes
+        self.compression = compression
+        self.schema = export_schema(include_pdf)
+
+        self.rows = 0
+        self.row_groups = 0
+        self._writer: Optional["pq.ParquetWriter"] = None
+        self._columns: Dict[str, List[Any]] = {}
+        self._buffered_rows = 0
+        self._buffered_bytes = 0
+        self._reset()
+
+    @property
+    def temp_path(self) -> str:
+        directory, name = os.path.split(self.path)
+        return os.path.join(directory, f".{name}.tmp")
+
+    def _reset(self):
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered_rows = 0
+        self._buffered_bytes = 0
+
+    def _write_row_group(self, columns: Dict[str, List[Any]], rows: int):
+        # Преобразование в Arrow и сжатие выполняются в потоке, вне event loop
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.temp_path, self.schema, compression=self.compression)
+        table = pa.Table.from_pydict(columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=rows)
+
+    async def _flush(self):
+        if not self._buffered_rows:
+            return
+
+        columns, rows, size = self._columns, self._buffered_rows, self._buffered_bytes
+        self._reset()
+
+        await asyncio.to_thread(self._write_row_group, columns, rows)
+        self.rows += rows
+        self.row_groups += 1
+        process_metrics.incr("export_rows", rows)
+        process_metrics.incr("export_bytes", size)
+
+    async def add(self, rows: List[Any]):
+        for row in rows:
+            for name, value in zip(self.schema.names, row):
+                self._columns[name].append(value)
+            self._buffered_rows += 1
+            self._buffered_bytes += len(row.text) + (len(row.binary_pdf or b"") if self.include_pdf else 0)
+
+            if self._buffered_rows >= self.row_group_rows or self._buffered_bytes >= self.row_group_bytes:
+                await self._flush()
+
+    async def close(self) -> bool:
+        """Дописать файл; False, если строк не было и файл не создан"""
+        await self._flush()
+        if self._writer is None:
+            return False
+
+        await asyncio.to_thread(self._writer.close)
+        await asyncio.to_thread(os.replace, self.temp_path, self.path)
+        return True
+
+    def abort(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        if os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+
+async def export_parquet(
+    path: str,
+    since: Optional[datetime],
+    until: datetime,
+    include_pdf: bool = False
+) -> int:
+    """Выгрузить записи с текстом, записанным в (since, until], в файл path; возвращает число строк"""
+    export = ParquetExport(
+        path=path,
+        include_pdf=include_pdf,
+        row_group_rows=config.EXPORT_ROW_GROUP_ROWS,
+        row_group_bytes=config.EXPORT_ROW_GROUP_BYTES,
+        compression=config.EXPORT_COMPRESSION
+    )
+
+    try:
+        async for rows in sql_stream_export_rows(
+            since=since,
+            until=until,
+            include_pdf=include_pdf,
+            batch_size=FETCH_ROWS_WITH_PDF if include_pdf else FETCH_ROWS
+        ):
+            await export.add(rows)
+
+        await export.close()
+
+    except BaseException:
+        await asyncio.to_thread(export.abort)
+        raise
+
+    return export.rows
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"watermark": None, "files": []}
+
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_manifest(directory: str, manifest: Dict[str, Any]):
+    path = os.path.join(directory, MANIFEST_FILE)
+    temp_path = os.path.join(directory, f".{MANIFEST_FILE}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def remove_files(directory: str, files: List[Dict[str, Any]]):
+    for item in files:
+        path = os.path.join(directory, item["file"])
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+async def export_incremental(directory: str, include_pdf: bool = False, full: bool = False) -> Dict[str, Any]:
+    """Выгрузить в directory записи, текст которых записан после водяного знака manifest.json.
+
+    Водяной знак сдвигается только после того, как файл целиком записан,
+    поэтому прерванная выгрузка при повторном запуске начинается с того же места.
+    Полная выгрузка заменяет набор: прежние файлы удаляются после записи нового.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = read_manifest(directory)
+    since = None if full or not manifest["watermark"] else datetime.fromisoformat(manifest["watermark"])
+    until = await sql_get_export_watermark(lag_seconds=config.EXPORT_WATERMARK_LAG_SECONDS)
+
+    if since is not None and until <= since:
+        return {"file": None, "rows": 0, "since": since.isoformat(), "watermark": since.isoformat()}
+
+    file_name = f"legislation-{until.strftime('%Y%m%dT%H%M%S%f')}{'-full' if since is None else ''}.parquet"
+    rows = await export_parquet(
+        path=os.path.join(directory, file_name),
+        since=since,
+        until=until,
+        include_pdf=include_pdf
+    )
+
+    replaced = manifest["files"] if full else []
+    if full:
+        manifest["files"] = []
+    if rows:
+        manifest["files"].append({
+            "file": file_name,
+            "rows": rows,
+            "since": since.isoformat() if since is not None else None,
+            "until": until.isoformat(),
+            "include_pdf": include_pdf
+        })
+    manifest["watermark"] = until.isoformat()
+    await asyncio.to_thread(write_manifest, directory, manifest)
+    await asyncio.to_thread(remove_files, directory, replaced)
+
+    config.logger.info(f"Exported {rows} legislation rows to {file_name if rows else 'nothing'}")
+    return {
+        "file": file_name if rows else None,
+        "rows": rows,
+        "since": since.isoformat() if since is not None else None,
+        "watermark": until.isoformat()
+    }
\ No newline at end of file
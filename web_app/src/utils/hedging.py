@@ -0,0 +1,43 @@
+# Внешние зависимости
+from typing import Dict, Iterable, List, Set, Tuple
+import math
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу"""
+    ordered = sorted(values)
+    rank = max(math.ceil(q * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def encode_reservation(reserved_at: float, owner: str) -> str:
+    return f"{reserved_at}|{owner}"
+
+
+def decode_reservation(value: str) -> Tuple[float, str]:
+    reserved_at, owner = value.split("|", 1)
+    return float(reserved_at), owner
+
+
+def select_straggling(
+    reservations: Dict[str, str],
+    hedged: Iterable[str],
+    now: float,
+    threshold: float,
+    exclude_owner: str,
+    limit: int
+) -> List[int]:
+    """Самые старые брони, которые держатся дольше порога и еще не переизданы"""
+    hedged: Set[str] = set(hedged)
+    candidates = []
+
+    for legislation_id, value in reservations.items():
+        if legislation_id in hedged:
+            continue
+
+        reserved_at, owner = decode_reservation(value)
+        if owner != exclude_owner and now - reserved_at > threshold:
+            candidates.append((reserved_at, int(legislation_id)))
+
+    candidates.sort()
+    return [legislation_id for (_, legislation_id) in candidates[:limit]]
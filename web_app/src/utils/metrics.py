@@ -0,0 +1,114 @@
+# Внешние зависимости
+from typing import Callable, Dict, Optional
+from collections import defaultdict
+import asyncio
+import os
+import socket
+import redis.asyncio as redis
+# Внутренние модули
+from web_app.src.core import config
+
+
+class ProcessMetrics:
+    """Метрики текущего процесса с периодической выгрузкой в Redis"""
+    def __init__(self):
+        self.key_prefix = "metrics:process:"
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+
+    @property
+    def process_id(self) -> str:
+        # pid читается при каждой выгрузке, поэтому экземпляр переживает fork
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def key(self) -> str:
+        return f"{self.key_prefix}{self.process_id}"
+
+    def incr(self, name: str, value: float = 1):
+        self.counters[name] += value
+
+    def register_gauge(self, name: str, callback: Callable[[], float]):
+        """Показатель, значение которого вычисляется в момент выгрузки"""
+        self.gauges[name] = callback
+
+    def snapshot(self) -> Dict[str, float]:
+        data = dict(self.counters)
+
+        for name, callback in self.gauges.items():
+            try:
+                data[name] = callback()
+            except Exception as e:
+                config.logger.error(f"Error reading gauge {name}: {e}")
+
+        return data
+
+    async def flush(self):
+        """Выгрузка метрик процесса в Redis"""
+        data = self.snapshot()
+        if not data or self._redis is None:
+            return
+
+        async with self._redis.pipeline() as pipeline:
+            await pipeline.delete(self.key)
+            await pipeline.hset(self.key, mapping=data)
+            await pipeline.expire(self.key, config.METRICS_FLUSH_SECONDS * 3)
+            await pipeline.execute()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(config.METRICS_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                config.logger.error(f"Error flushing process metrics: {e}")
+
+    def start(self, redis_client: redis.Redis):
+        self._redis = redis_client
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if self._redis is not None:
+            await self._redis.delete(self.key)
+            self._redis = None
+
+    async def aggregate(self) -> dict:
+        """Сводка метрик всех живых процессов"""
+        await self.flush()
+
+        processes = {}
+        async for key in self._redis.scan_iter(match=f"{self.key_prefix}*"):
+            data = await self._redis.hgetall(key)
+            if data:
+                processes[key.removeprefix(self.key_prefix)] = {
+                    name: float(value) for name, value in data.items()
+                }
+
+        total: Dict[str, float] = defaultdict(float)
+        for data in processes.values():
+            for name, value in data.items():
+                total[name] += value
+
+        return {
+            "total_processes": len(processes),
+            "total": dict(total),
+            "processes": processes
+        }
+
+
+_instance = None
+
+
+def get_process_metrics() -> ProcessMetrics:
+    global _instance
+    if _instance is None:
+        _instance = ProcessMetrics()
+
+    return _instance
@@ -0,0 +1,52 @@
+# Внешние зависимости
+from typing import Optional
+import asyncio
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.crud import sql_ensure_partitions, sql_release_exported_partitions
+from web_app.src.utils.metrics import get_process_metrics
+
+
+process_metrics = get_process_metrics()
+
+
+class PartitionMaintenance:
+    """Периодическое создание будущих партиций и освобождение выгруженных"""
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self):
+        created = await sql_ensure_partitions(premake_months=config.PARTITION_PREMAKE_MONTHS)
+        released = await sql_release_exported_partitions(action=config.PARTITION_RELEASE_ACTION)
+
+        process_metrics.incr("partitions_created", len(created))
+        process_metrics.incr("partitions_released", len(released))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                config.logger.error(f"Error in partition maintenance: {e}")
+
+            await asyncio.sleep(config.PARTITION_MAINTENANCE_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+_instance = None
+
+
+def get_partition_maintenance() -> PartitionMaintenance:
+    global _instance
+    if _instance is None:
+        _instance = PartitionMaintenance()
+
+    return _instance
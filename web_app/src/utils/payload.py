@@ -0,0 +1,239 @@
+# Внешние зависимости
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Type
+from collections import deque
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import base64
+import binascii
+import multiprocessing
+import time
+import pydantic_core
+from pydantic import BaseModel, ValidationError
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.core.profiling import add_timing
+from web_app.src.utils.metrics import get_process_metrics
+
+
+process_metrics = get_process_metrics()
+
+# base64 обрабатывается кусками: между вызовами C-кода поток отдает GIL event loop
+BASE64_CHUNK_CHARS = 1024 * 1024
+BASE64_CHUNK_BYTES = BASE64_CHUNK_CHARS // 4 * 3
+
+
+# Функции пула объявлены на уровне модуля: в режиме process они передаются через pickle
+
+def decode_base64(binary: str) -> bytes:
+    try:
+        return b"".join(
+            binascii.a2b_base64(binary[offset:offset + BASE64_CHUNK_CHARS])
+            for offset in range(0, len(binary), BASE64_CHUNK_CHARS)
+        )
+    except (binascii.Error, ValueError):
+        pass
+
+    # Посторонние символы сдвигают границы кусков: декодируем целиком, как раньше
+    try:
+        return base64.b64decode(binary)
+    except Exception:
+        raise ValueError("Invalid base64 string")
+
+
+def encode_base64_chunk(data: bytes) -> bytes:
+    return binascii.b2a_base64(data, newline=False)
+
+
+def parse_model_json(model: Type[BaseModel], body: bytes) -> Tuple[Optional[BaseModel], Optional[List[dict]]]:
+    # ValidationError не передается между процессами, поэтому возвращаем список ошибок;
+    # input не включаем, чтобы не гонять обратно весь документ
+    try:
+        return model.model_validate_json(body), None
+    except ValidationError as e:
+        return None, [
+            {**error, "loc": ("body", *error["loc"])}
+            for error in e.errors(include_url=False, include_input=False)
+        ]
+
+
+def dump_json(content: Any) -> bytes:
+    return pydantic_core.to_json(content)
+
+
+class PayloadExecutor:
+    """Пул для разбора, кодирования и хэширования больших данных вне event loop.
+
+    Задачи меньше порога выполняются на месте: передача в пул дороже самой работы.
+    В пуле одновременно выполняется не больше pool_size задач, остальные ждут в очереди.
+    Режим thread не копирует данные между процессами; режим process разбирает JSON
+    на нескольких ядрах, но pickle больших тел сам занимает event loop.
+    """
+    def __init__(self, executor: str, pool_size: int, offload_bytes: int, lag_interval: float = 0.1):
+        self.executor = executor
+        self.pool_size = pool_size
+        self.offload_bytes = offload_bytes
+        self.lag_interval = lag_interval
+
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._running = 0
+        self._lag_task: Optional[asyncio.Task] = None
+        # Задержки event loop за последние ~5 секунд
+        self._lags: deque = deque(maxlen=50)
+
+        process_metrics.register_gauge("payload_queue_depth", lambda: self._waiting)
+        process_metrics.register_gauge("payload_running", lambda: self._running)
+        process_metrics.register_gauge("event_loop_lag_seconds", lambda: max(self._lags, default=0.0))
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.executor == "process":
+                # spawn: fork процесса с потоками и открытыми соединениями небезопасен
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="payload")
+        return self._pool
+
+    async def run(self, name: str, size: int, func: Callable, *args) -> Any:
+        """Выполнить func(*args): на месте или в пуле, если данных больше порога"""
+        start_time = time.perf_counter()
+
+        if size < self.offload_bytes:
+            try:
+                return func(*args)
+            finally:
+                process_metrics.incr(f"payload_inline:{name}")
+                add_timing(name, time.perf_counter() - start_time)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        pool = self._get_pool()
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        run_start_time = time.perf_counter()
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+        except BrokenExecutor:
+            # Процесс пула упал (например, OOM): следующий вызов создаст пул заново
+            if self._pool is pool:
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+            end_time = time.perf_counter()
+            process_metrics.incr(f"payload_offloaded:{name}")
+            process_metrics.incr(f"payload_wait_seconds:{name}", run_start_time - start_time)
+            process_metrics.incr(f"payload_seconds:{name}", end_time - run_start_time)
+            add_timing(name, end_time - start_time)
+
+    async def decode_base64(self, binary: str) -> bytes:
+        return await self.run("base64", len(binary), decode_base64, binary)
+
+    async def parse_json(self, model: Type[BaseModel], body: bytes) -> BaseModel:
+        """model_validate_json тела запроса; ошибки в формате 422 FastAPI"""
+        result, errors = await self.run("json_parse", len(body), parse_model_json, model, body)
+        if errors is not None:
+            raise RequestValidationError(errors)
+        return result
+
+    async def _iter_json(self, items: List[BaseModel], binary_field: str) -> AsyncIterator[bytes]:
+        yield b"["
+
+        for index, item in enumerate(items):
+            fields = item.model_dump(exclude={binary_field})
+            head = await self.run(
+                "json_render",
+                sum(len(value) for value in fields.values() if isinstance(value, str)),
+                dump_json,
+                fields
+            )
+            separator = b"," if fields else b""
+            yield (b"," if index else b"") + head[:-1] + separator + f'"{binary_field}":"'.encode()
+
+            # Документ кодируется и отправляется кусками, ответ целиком в памяти не собирается
+            data = getattr(item, binary_field)
+            for offset in range(0, len(data), BASE64_CHUNK_BYTES):
+                chunk = data[offset:offset + BASE64_CHUNK_BYTES]
+                yield await self.run("base64", len(chunk), encode_base64_chunk, chunk)
+
+            yield b'"}'
+
+        yield b"]"
+
+    def json_response(self, items: List[BaseModel], binary_field: str) -> StreamingResponse:
+        """JSON-массив моделей, бинарное поле которых отдается в base64 по кускам"""
+        return StreamingResponse(self._iter_json(items=items, binary_field=binary_field), media_type="application/json")
+
+    async def _watch_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_time = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self._lags.append(max(loop.time() - expected_time, 0.0))
+
+    def start(self):
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._watch_lag())
+
+    def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def request_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Описание тела запроса для OpenAPI, когда тело разбирается не FastAPI, а в пуле"""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+
+    def inline(value: Any) -> Any:
+        if isinstance(value, dict):
+            if "$ref" in value:
+                return inline(definitions[value["$ref"].rsplit("/", 1)[-1]])
+            return {key: inline(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [inline(item) for item in value]
+        return value
+
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": inline(schema)}}
+        }
+    }
+
+
+_instance = None
+
+
+def get_payload_executor() -> PayloadExecutor:
+    global _instance
+    if _instance is None:
+        _instance = PayloadExecutor(
+            executor=config.PAYLOAD_EXECUTOR,
+            pool_size=config.PAYLOAD_POOL_SIZE,
+            offload_bytes=config.PAYLOAD_OFFLOAD_BYTES
+        )
+
+    return _instance
\ No newline at end of file
@@ -0,0 +1,105 @@
+# Внешние зависимости
+from typing import Any, Dict, List, Optional
+import time
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.crud import (sql_claim_pipeline_batch, sql_complete_pipeline_items, sql_fail_pipeline_items,
+                              sql_release_pipeline_leases, sql_get_pipeline_stats)
+from web_app.src.models import PipelineStage
+from web_app.src.utils.metrics import get_process_metrics
+
+
+process_metrics = get_process_metrics()
+
+
+class Pipeline:
+    """Стадии обработки документов, объявленные в PIPELINE_STAGES.
+
+    Обработчик забирает документы стадии по ее имени; аренда, повторы и лимит
+    параллельности хранятся в таблице pipeline_leases и общие для всех процессов.
+    """
+    def __init__(self, stages: Dict[str, Dict[str, Any]]):
+        self.stages = {name: PipelineStage.from_config(name=name, stage=stage) for name, stage in stages.items()}
+
+    def get_stage(self, name: str) -> Optional[PipelineStage]:
+        return self.stages.get(name)
+
+    @staticmethod
+    def worker_key(ip: str, worker_id: int) -> str:
+        return f"{ip}:{worker_id}"
+
+    async def claim(self, stage: PipelineStage, ip: str, worker_id: int, limit: int) -> List[Any]:
+        start_time = time.perf_counter()
+        items, exhausted_count = await sql_claim_pipeline_batch(
+            stage=stage,
+            worker=self.worker_key(ip=ip, worker_id=worker_id),
+            limit=limit
+        )
+
+        process_metrics.incr(f"pipeline_claimed:{stage.name}", len(items))
+        process_metrics.incr(f"pipeline_claim_seconds:{stage.name}", time.perf_counter() - start_time)
+        if exhausted_count:
+            config.logger.warning(f"Pipeline stage {stage.name}: {exhausted_count} leases expired on the last attempt")
+            process_metrics.incr(f"pipeline_failed:{stage.name}", exhausted_count)
+        if not items and limit:
+            process_metrics.incr(f"pipeline_empty_claims:{stage.name}")
+
+        return items
+
+    async def complete(self, stage: PipelineStage, ip: str, worker_id: int, results: Dict[int, Any]) -> Dict[str, Any]:
+        applied_ids, lost_ids = await sql_complete_pipeline_items(
+            stage=stage,
+            worker=self.worker_key(ip=ip, worker_id=worker_id),
+            results=results
+        )
+
+        process_metrics.incr(f"pipeline_completed:{stage.name}", len(applied_ids))
+        if lost_ids:
+            # Аренда истекла и документ выдан другому обработчику
+            process_metrics.incr(f"pipeline_lost:{stage.name}", len(lost_ids))
+
+        return {"applied": applied_ids, "lost": lost_ids}
+
+    async def fail(
+        self,
+        stage: PipelineStage,
+        ip: str,
+        worker_id: int,
+        legislation_ids: List[int],
+        error: str
+    ) -> Dict[str, Any]:
+        retry_ids, failed_ids = await sql_fail_pipeline_items(
+            stage=stage,
+            worker=self.worker_key(ip=ip, worker_id=worker_id),
+            legislation_ids=legislation_ids,
+            error=error
+        )
+
+        process_metrics.incr(f"pipeline_retried:{stage.name}", len(retry_ids))
+        process_metrics.incr(f"pipeline_failed:{stage.name}", len(failed_ids))
+        if failed_ids:
+            config.logger.warning(f"Pipeline stage {stage.name}: attempts exhausted for {failed_ids}: {error}")
+
+        return {"retry": retry_ids, "failed": failed_ids}
+
+    async def release_worker(self, ip: str, worker_id: int) -> int:
+        """Снятый обработчик сразу возвращает аренды всех стадий"""
+        if not self.stages:
+            return 0
+        return await sql_release_pipeline_leases(worker=self.worker_key(ip=ip, worker_id=worker_id))
+
+    async def get_stats(self) -> Dict[str, Dict[str, int]]:
+        if not self.stages:
+            return {}
+        return await sql_get_pipeline_stats(stages=self.stages)
+
+
+_instance = None
+
+
+def get_pipeline() -> Pipeline:
+    global _instance
+    if _instance is None:
+        _instance = Pipeline(stages=config.PIPELINE_STAGES)
+
+    return _instance
\ No newline at end of file
@@ -1,16 +1,44 @@
 # Внешние зависимости
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 import json
 import time
 import asyncio
+import math
 from contextlib import asynccontextmanager
 import redis.asyncio as redis
 from fastapi import status, HTTPException
 # Внутренние модули
 from web_app.src.core import config
+from web_app.src.core.profiling import timed
 from web_app.src.schemas import InfoWorkerResponse
 from web_app.src.crud import sql_valid_legislation_ids_from_worker
+from web_app.src.utils.throughput import MIN_SAMPLE_SECONDS, DEFAULT_BATCH_SIZE, update_throughput, suggest_batch_size
+from web_app.src.utils.hedging import percentile, encode_reservation, decode_reservation, select_straggling
+
+
+# Token bucket: пополнение по времени сервера Redis, одно списание за запрос
+RATE_LIMIT_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
 
 
 class RedisService:
@@ -21,6 +49,14 @@ class RedisService:
         self.legislation_ids_key = "legislation_ids"
         self.total_unloaded_data_key = "total_unloaded_data"
         self.lock_key = "lock"
+        self.reservation_times_key = "reservation_times"
+        self.completion_times_key = "completion_times"
+        self.hedged_legislation_key = "hedged_legislation"
+        self.hedge_issued_key = "hedge:issued"
+        self.hedge_wins_key = "hedge:wins"
+        self.duplicates_dropped_key = "hedge:duplicates_dropped"
+        self.rate_limit_prefix = "ratelimit:"
+        self._rate_limit_script = None
 
     async def init_redis(self):
         """Инициализация подключения к Redis"""
@@ -43,14 +79,20 @@ class RedisService:
     @asynccontextmanager
     async def lock(self, ttl: int = 30, wait_timeout: int = 10):
         """Создает блокировку как контекстный менеджер"""
-        acquired = await self._acquire_lock_with_wait(
-            ttl=ttl,
-            wait_timeout=wait_timeout
-        )
+        with timed("redis_lock_wait"):
+            acquired = await self._acquire_lock_with_wait(
+                ttl=ttl,
+                wait_timeout=wait_timeout
+            )
 
         if not acquired:
+            # Перегрузка, а не ошибка: просим повторить позже вместо немедленного повтора
             config.logger.error(f"Failed to obtain lock within {wait_timeout} seconds")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to obtain lock")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Failed to obtain lock",
+                headers={"Retry-After": str(wait_timeout)}
+            )
 
         try:
             yield
@@ -86,6 +128,20 @@ class RedisService:
         """Снимаем блокировку"""
         await self.redis.delete(self.lock_key)
 
+    def worker_key(self, ip: str, worker_id: int) -> str:
+        return f"{self.worker_prefix}{ip}:{worker_id}"
+
+    async def rate_limit(self, identity: str, rate: float, burst: int) -> Tuple[bool, int]:
+        """Списание токена из корзины клиента: (разрешено, через сколько секунд повторить)"""
+        if self._rate_limit_script is None:
+            self._rate_limit_script = self.redis.register_script(RATE_LIMIT_SCRIPT)
+
+        allowed, retry_after = await self._rate_limit_script(
+            keys=[f"{self.rate_limit_prefix}{identity}"],
+            args=[rate, burst]
+        )
+        return bool(allowed), math.ceil(float(retry_after))
+
     async def add_unloaded_data(self, unloaded_count: int):
         """Увеличиваем счетчик выгруженных данных"""
         await self.redis.incrby(self.total_unloaded_data_key, unloaded_count)
@@ -104,6 +160,20 @@ class RedisService:
         legislation_ids: Optional[List[int]] = None
     ):
         """Сохранение/обновление обработчика в Redis"""
+        key = self.worker_key(ip=ip, worker_id=worker_id)
+        current_time = datetime.now().isoformat()
+        now = time.time()
+
+        if legislation_ids:
+            # Время брони нужно для переиздания зависших документов;
+            # у уже забронированных (переизданных) документов оно не сбрасывается
+            reservation = encode_reservation(reserved_at=now, owner=key)
+
+            async with self.redis.pipeline() as pipeline:
+                for legislation_id in legislation_ids:
+                    await pipeline.hsetnx(self.reservation_times_key, str(legislation_id), reservation)
+                await pipeline.execute()
+
         if legislation_ids is not None:
             existing_ids_json = await self.redis.get(self.legislation_ids_key)
 
@@ -122,28 +192,35 @@ class RedisService:
                 combined_ids_json
             )
 
-        key = f"{self.worker_prefix}{ip}:{worker_id}"
-        current_time = datetime.now().isoformat()
-
         if await self.redis.exists(key):
+            throughput_fields = await self._get_throughput_fields(
+                key=key,
+                now=now,
+                processed_data=processed_data
+            )
+
             async with self.redis.pipeline() as pipeline:
                 await pipeline.hincrby(key, 'total_processed_data', processed_data)
                 await pipeline.hset(key, 'last_connection_time', current_time)
 
-                if legislation_ids is not None:
-                    legislation_ids_json = json.dumps(legislation_ids)
-                    await pipeline.hset(key, 'legislation_ids', legislation_ids_json)
+                if throughput_fields:
+                    await pipeline.hset(key, mapping=throughput_fields)
 
                 await pipeline.expire(key, expire_seconds)
                 await pipeline.execute()
 
+            if legislation_ids:
+                await self._update_worker_legislation_ids(key=key, added_ids=legislation_ids)
+
         else:
             worker_data = {
                 'ip': ip,
                 'worker_id': worker_id,
                 'first_connection_time': current_time,
                 'last_connection_time': current_time,
-                'total_processed_data': processed_data
+                'total_processed_data': processed_data,
+                'rate_window_start': now,
+                'rate_window_processed': processed_data
             }
 
             if legislation_ids is not None:
@@ -155,6 +232,139 @@ class RedisService:
                 await pipeline.expire(key, expire_seconds)
                 await pipeline.execute()
 
+    async def _update_worker_legislation_ids(
+        self,
+        key: str,
+        added_ids: Optional[List[int]] = None,
+        removed_ids: Optional[List[int]] = None
+    ):
+        """Брони обработчика: с упреждением у него на руках несколько пачек одновременно"""
+        removed = set(removed_ids or [])
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+
+                    # Снятый или истекший обработчик не воссоздаем
+                    if not await pipe.exists(key):
+                        return
+
+                    legislation_ids_json = await pipe.hget(key, 'legislation_ids')
+                    legislation_ids = json.loads(legislation_ids_json) if legislation_ids_json else []
+                    legislation_ids = [
+                        id_ for id_ in dict.fromkeys(legislation_ids + (added_ids or []))
+                        if id_ not in removed
+                    ]
+
+                    pipe.multi()
+                    await pipe.hset(key, 'legislation_ids', json.dumps(legislation_ids))
+                    await pipe.execute()
+                    return
+
+                except redis.WatchError:
+                    continue
+
+    async def drop_worker_legislation(self, ip: str, worker_id: int, legislation_ids: List[int]):
+        """Сданные документы больше не на руках у обработчика и не освобождаются при его снятии"""
+        if legislation_ids:
+            await self._update_worker_legislation_ids(
+                key=self.worker_key(ip=ip, worker_id=worker_id),
+                removed_ids=legislation_ids
+            )
+
+    async def _get_throughput_fields(
+        self,
+        key: str,
+        now: float,
+        processed_data: int
+    ) -> Dict[str, float]:
+        """Обновление скользящей скорости обработчика по окну замера"""
+        window_start, window_processed, throughput = await self.redis.hmget(
+            key,
+            'rate_window_start',
+            'rate_window_processed',
+            'throughput'
+        )
+        window_processed = int(window_processed or 0) + processed_data
+
+        if processed_data == 0:
+            # Выдача новой партии: простой между партиями в замер не попадает
+            if window_processed == 0:
+                return {'rate_window_start': now, 'rate_window_processed': 0}
+            return {}
+
+        elapsed = now - float(window_start) if window_start else 0
+        if elapsed < MIN_SAMPLE_SECONDS:
+            return {'rate_window_processed': window_processed}
+
+        throughput = update_throughput(
+            previous=float(throughput) if throughput else None,
+            processed=window_processed,
+            elapsed=elapsed,
+            alpha=config.BATCH_EWMA_ALPHA
+        )
+
+        return {'throughput': throughput, 'rate_window_start': now, 'rate_window_processed': 0}
+
+    @staticmethod
+    def _suggest_batch_size(throughput: Optional[str], default: int) -> int:
+        return suggest_batch_size(
+            throughput=float(throughput) if throughput else None,
+            lease_seconds=config.BATCH_LEASE_SECONDS,
+            min_size=config.BATCH_MIN_SIZE,
+            max_size=config.BATCH_MAX_SIZE,
+            default=default
+        )
+
+    async def get_suggested_batch_size(self, ip: str, worker_id: int, default: int) -> int:
+        """Рекомендуемый размер выдачи для обработчика по его скорости"""
+        throughput = await self.redis.hget(f"{self.worker_prefix}{ip}:{worker_id}", 'throughput')
+        return self._suggest_batch_size(throughput=throughput, default=default)
+
+    async def _split_hedged(
+        self,
+        pipe,
+        key: str,
+        legislation_ids: List[int]
+    ) -> Tuple[List[int], List[str], Dict[str, str]]:
+        """Документы к освобождению, снимаемые отметки переиздания и передаваемые брони.
+
+        Переизданный документ держат два обработчика: пока второй жив, документ не освобождается.
+        Снимается исходный держатель - бронь переходит к получившему копию, снимается
+        получивший копию - бронь остается у исходного держателя.
+        """
+        fields = [str(id_) for id_ in legislation_ids]
+        hedged_workers = await self.redis.hmget(self.hedged_legislation_key, *fields)
+        reservations = await self.redis.hmget(self.reservation_times_key, *fields)
+
+        other_holders = {}
+        for field_id, hedged_worker, reservation in zip(fields, hedged_workers, reservations):
+            if hedged_worker is None:
+                continue
+            if hedged_worker != key:
+                other_holders[field_id] = hedged_worker
+            elif reservation and decode_reservation(reservation)[1] != key:
+                other_holders[field_id] = decode_reservation(reservation)[1]
+
+        if not other_holders:
+            return legislation_ids, [], {}
+
+        # Второй держатель может быть снят параллельно: тогда транзакция повторится
+        holder_keys = set(other_holders.values())
+        await pipe.watch(*holder_keys)
+        live_holders = {holder for holder in holder_keys if await self.redis.exists(holder)}
+
+        kept_fields = [field_id for field_id, holder in other_holders.items() if holder in live_holders]
+        transferred = {
+            field_id: encode_reservation(reserved_at=time.time(), owner=other_holders[field_id])
+            for field_id, hedged_worker in zip(fields, hedged_workers)
+            if field_id in kept_fields and hedged_worker != key
+        }
+        released_ids = [id_ for id_ in legislation_ids if str(id_) not in kept_fields]
+
+        return released_ids, kept_fields, transferred
+
     async def delete_worker(self, ip: str, worker_id: int) -> str:
         """Удаление обработчика по IP с обновлением списка legislation_ids"""
         key = f"{self.worker_prefix}{ip}:{worker_id}"
@@ -180,28 +390,46 @@ class RedisService:
         async with self.redis.pipeline(transaction=True) as pipe:
             try:
                 # Начинаем наблюдение за ключами
-                await pipe.watch(key, self.legislation_ids_key)
+                await pipe.watch(key, self.legislation_ids_key, self.hedged_legislation_key)
 
                 # Проверяем, что воркер все еще существует
                 if not await self.redis.exists(key):
                     return f"Worker {ip} not found for deletion"
 
+                released_ids, kept_fields, transferred = [], [], {}
+                if valid_legislation_ids:
+                    released_ids, kept_fields, transferred = await self._split_hedged(
+                        pipe=pipe,
+                        key=key,
+                        legislation_ids=valid_legislation_ids
+                    )
+                existing_ids_json = await self.redis.get(self.legislation_ids_key) if released_ids else None
+
                 # Начинаем транзакцию
                 pipe.multi()
 
                 # Обновляем общий список
-                if valid_legislation_ids:
-                    existing_ids_json = await self.redis.get(self.legislation_ids_key)
-
+                if released_ids:
                     if existing_ids_json:
                         existing_ids = json.loads(existing_ids_json)
                         updated_ids = [
                             id_ for id_ in existing_ids
-                            if id_ not in valid_legislation_ids
+                            if id_ not in released_ids
                         ]
                         updated_ids_json = json.dumps(updated_ids)
                         await pipe.set(self.legislation_ids_key, updated_ids_json)
 
+                    # Освобожденные документы больше не считаются зависшими
+                    released_fields = [str(id_) for id_ in released_ids]
+                    await pipe.hdel(self.reservation_times_key, *released_fields)
+                    await pipe.hdel(self.hedged_legislation_key, *released_fields)
+
+                # Документ остается у второго держателя как обычная бронь
+                if kept_fields:
+                    await pipe.hdel(self.hedged_legislation_key, *kept_fields)
+                if transferred:
+                    await pipe.hset(self.reservation_times_key, mapping=transferred)
+
                 # Удаляем воркера
                 await pipe.delete(key)
 
@@ -217,15 +445,113 @@ class RedisService:
                 await pipe.reset()
 
         message = f"Worker {ip} deleted successfully"
-        if valid_legislation_ids:
+        if released_ids:
             config.logger.info(
                 f"Updated legislation_ids after removing worker {ip}. "
-                f"Removed {len(valid_legislation_ids)} valid IDs"
+                f"Removed {len(released_ids)} valid IDs"
             )
+        if kept_fields:
+            config.logger.info(f"Kept {len(kept_fields)} hedged legislation held by another worker after removing {ip}")
 
         config.logger.info(message)
         return message
 
+    async def get_straggling_legislation_ids(self, ip: str, worker_id: int, limit: int) -> List[int]:
+        """Документы, которые держатся дольше заданного перцентиля времени обработки"""
+        if not config.HEDGE_ENABLED or limit <= 0:
+            return []
+
+        samples = await self.redis.lrange(self.completion_times_key, 0, -1)
+        if len(samples) < config.HEDGE_MIN_SAMPLES:
+            return []
+
+        threshold = max(
+            percentile([float(sample) for sample in samples], config.HEDGE_PERCENTILE),
+            config.HEDGE_MIN_AGE_SECONDS
+        )
+
+        return select_straggling(
+            reservations=await self.redis.hgetall(self.reservation_times_key),
+            hedged=await self.redis.hkeys(self.hedged_legislation_key),
+            now=time.time(),
+            threshold=threshold,
+            exclude_owner=self.worker_key(ip=ip, worker_id=worker_id),
+            limit=limit
+        )
+
+    async def mark_hedged(self, ip: str, worker_id: int, legislation_ids: List[int]):
+        """Отмечаем документы, переизданные свободному обработчику"""
+        if not legislation_ids:
+            return
+
+        key = self.worker_key(ip=ip, worker_id=worker_id)
+
+        async with self.redis.pipeline() as pipeline:
+            await pipeline.hset(
+                self.hedged_legislation_key,
+                mapping={str(legislation_id): key for legislation_id in legislation_ids}
+            )
+            await pipeline.incrby(self.hedge_issued_key, len(legislation_ids))
+            await pipeline.execute()
+
+        config.logger.info(f"Hedged {len(legislation_ids)} straggling legislation to worker {key}")
+
+    async def complete_legislation(self, ip: str, worker_id: int, legislation_id: int, applied: bool):
+        """Учет завершения обработки документа: время обработки и исход переиздания"""
+        key = self.worker_key(ip=ip, worker_id=worker_id)
+        field_id = str(legislation_id)
+
+        reservation, hedged_worker = await asyncio.gather(
+            self.redis.hget(self.reservation_times_key, field_id),
+            self.redis.hget(self.hedged_legislation_key, field_id)
+        )
+
+        async with self.redis.pipeline() as pipeline:
+            if not applied:
+                # Текст уже записан другим обработчиком: ответ проигравшего отброшен
+                await pipeline.incr(self.duplicates_dropped_key)
+
+            else:
+                if reservation:
+                    reserved_at, _ = decode_reservation(reservation)
+                    await pipeline.lpush(self.completion_times_key, time.time() - reserved_at)
+                    await pipeline.ltrim(self.completion_times_key, 0, config.HEDGE_SAMPLE_SIZE - 1)
+
+                if hedged_worker == key:
+                    await pipeline.incr(self.hedge_wins_key)
+
+                await pipeline.hdel(self.reservation_times_key, field_id)
+                await pipeline.hdel(self.hedged_legislation_key, field_id)
+
+            await pipeline.execute()
+
+    async def get_hedge_stats(self) -> dict:
+        """Статистика переиздания зависших документов"""
+        issued, wins, duplicates_dropped = await self.redis.mget(
+            self.hedge_issued_key,
+            self.hedge_wins_key,
+            self.duplicates_dropped_key
+        )
+        samples = await self.redis.lrange(self.completion_times_key, 0, -1)
+
+        threshold = None
+        if len(samples) >= config.HEDGE_MIN_SAMPLES:
+            threshold = max(
+                percentile([float(sample) for sample in samples], config.HEDGE_PERCENTILE),
+                config.HEDGE_MIN_AGE_SECONDS
+            )
+
+        return {
+            "enabled": config.HEDGE_ENABLED,
+            "hedged_issued": int(issued or 0),
+            "hedged_wins": int(wins or 0),
+            "duplicates_dropped": int(duplicates_dropped or 0),
+            "hedged_in_flight": await self.redis.hlen(self.hedged_legislation_key),
+            "reservations_in_flight": await self.redis.hlen(self.reservation_times_key),
+            "completion_samples": len(samples),
+            "threshold_seconds": threshold
+        }
+
     async def get_legislation_ids(self) -> List[int]:
         """Получение списка законодательных актов для обработки из Redis legislation_ids"""
         try:
@@ -246,14 +572,23 @@ class RedisService:
             config.logger.error(f"Error getting legislation_ids from Redis: {e}")
             return []
 
+    async def _get_workers_data(self) -> List[dict]:
+        """Данные всех обработчиков: SCAN вместо KEYS и HGETALL одним пайплайном"""
+        worker_keys = [key async for key in self.redis.scan_iter(match=f"{self.worker_prefix}*", count=1000)]
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for key in worker_keys:
+                await pipeline.hgetall(key)
+            workers_data = await pipeline.execute()
+
+        # Ключ мог истечь между SCAN и HGETALL
+        return [worker_data for worker_data in workers_data if worker_data]
+
     async def get_workers(self) -> List[InfoWorkerResponse]:
         """Получаем информацию по обработчикам"""
-        worker_keys = await self.redis.keys(f"{self.worker_prefix}*")
-
         workers_info = []
 
-        for key in worker_keys:
-            worker_data = await self.redis.hgetall(key)
+        for worker_data in await self._get_workers_data():
 
             first_connection_time = datetime.fromisoformat(worker_data['first_connection_time'])
             last_connection_time = datetime.fromisoformat(worker_data['last_connection_time'])
@@ -264,7 +599,12 @@ class RedisService:
                 first_connection_time=first_connection_time.strftime("%d %B %Y %H:%M:%S"),
                 last_connection_time=last_connection_time.strftime("%d %B %Y %H:%M:%S"),
                 active_time=(datetime.min + (last_connection_time - first_connection_time)).strftime("%H:%M:%S"),
-                total_processed_data=worker_data["total_processed_data"]
+                total_processed_data=worker_data["total_processed_data"],
+                throughput=worker_data.get("throughput"),
+                suggested_batch_size=self._suggest_batch_size(
+                    throughput=worker_data.get("throughput"),
+                    default=DEFAULT_BATCH_SIZE
+                )
             )
 
             workers_info.append(info)
@@ -273,13 +613,10 @@ class RedisService:
 
     async def get_stats(self) -> dict:
         """Статистика обработчиков"""
-        worker_keys = await self.redis.keys(f"{self.worker_prefix}*")
-
         workers_info = []
         total_processed = 0
 
-        for key in worker_keys:
-            worker_data = await self.redis.hgetall(key)
+        for worker_data in await self._get_workers_data():
             dt_first_connection_time = datetime.fromisoformat(worker_data["first_connection_time"])
             dt_last_connection_time = datetime.fromisoformat(worker_data["last_connection_time"])
             worker_data["first_connection_time"] = dt_first_connection_time.strftime("%d %B %Y %H:%M:%S")
@@ -289,7 +626,7 @@ class RedisService:
             total_processed += int(worker_data.get('total_processed_data', 0))
 
         return {
-            "total_workers": len(worker_keys),
+            "total_workers": len(workers_info),
             "total_processed_data": total_processed,
             "workers": workers_info,
             "memory_usage": await self.redis.info('memory')
@@ -0,0 +1,323 @@
+# Внешние зависимости
+from typing import BinaryIO, Dict, List, Optional, Tuple
+import asyncio
+import fcntl
+import glob
+import os
+import socket
+import struct
+import time
+import zlib
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.crud import sql_update_binaries
+from web_app.src.utils.metrics import get_process_metrics
+from web_app.src.utils.text_layer import get_text_layer_extractor
+
+
+process_metrics = get_process_metrics()
+text_layer_extractor = get_text_layer_extractor()
+
+# Запись сегмента: заголовок (магия, id, время добавления, длина, crc32) и PDF
+RECORD_HEADER = struct.Struct("<IQdII")
+RECORD_MAGIC = 0x4C475350
+
+
+def encode_record(legislation_id: int, data: bytes, appended_at: float) -> bytes:
+    return RECORD_HEADER.pack(RECORD_MAGIC, legislation_id, appended_at, len(data), zlib.crc32(data)) + data
+
+
+def read_records(file: BinaryIO, limit: int) -> List[Tuple[int, bytes, float]]:
+    """Следующие limit записей сегмента; недописанный хвост (сбой до fsync) отбрасывается"""
+    records = []
+
+    while len(records) < limit:
+        offset = file.tell()
+        header = file.read(RECORD_HEADER.size)
+        if not header:
+            break
+
+        if len(header) == RECORD_HEADER.size:
+            magic, legislation_id, appended_at, length, checksum = RECORD_HEADER.unpack(header)
+            data = file.read(length) if magic == RECORD_MAGIC else b""
+
+            if magic == RECORD_MAGIC and len(data) == length and zlib.crc32(data) == checksum:
+                records.append((legislation_id, data, appended_at))
+                continue
+
+        # Такая запись не была подтверждена клиенту: дальше в сегменте ничего нет
+        config.logger.warning(f"Discarding torn spool record at offset {offset} of {file.name}")
+        file.seek(0, os.SEEK_END)
+        break
+
+    return records
+
+
+class BinarySpool:
+    """Журнал загруженных PDF: подтверждение после fsync, запись в БД фоновыми пакетами.
+
+    Каждый процесс пишет в свои сегменты и держит flock на открытом сегменте. Сегменты без
+    блокировки (закрытые или оставшиеся после падения процесса) сбрасывает в БД любой процесс;
+    из нескольких загрузок одного документа в БД попадает последняя по времени добавления.
+    """
+    def __init__(self, directory: str, segment_bytes: int, flush_interval: float, flush_batch: int):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+
+        self._file: Optional[BinaryIO] = None
+        self._path: Optional[str] = None
+        self._file_records = 0
+        self._pending: List[Tuple[Tuple[int, bytes, float], asyncio.Future]] = []
+        self._writer_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._segment_lock = asyncio.Lock()
+
+        # Неотправленные в БД записи этого процесса: сегмент -> (записей, байт, время первой записи)
+        self._unflushed: Dict[str, Tuple[int, int, float]] = {}
+
+        process_metrics.register_gauge("spool_depth_records", lambda: sum(s[0] for s in self._unflushed.values()))
+        process_metrics.register_gauge("spool_depth_bytes", lambda: sum(s[1] for s in self._unflushed.values()))
+        process_metrics.register_gauge("spool_flush_lag_seconds", self.flush_lag)
+
+    def flush_lag(self) -> float:
+        """Возраст самой старой записи процесса, еще не попавшей в БД"""
+        if not self._unflushed:
+            return 0.0
+        return time.time() - min(s[2] for s in self._unflushed.values())
+
+    # --- запись ---
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Время создания первым и фиксированной ширины: порядок имен хронологический для всех процессов
+        name = f"{time.time_ns():020d}-{socket.gethostname()}-{os.getpid()}"
+        temp_path = os.path.join(self.directory, f".{name}.tmp")
+        path = os.path.join(self.directory, f"{name}.seg")
+
+        # Сегмент получает имя *.seg уже заблокированным: иначе flush() другого процесса успел бы
+        # заблокировать и удалить пустой файл, а подтвержденные записи ушли бы в удаленный inode
+        file = open(temp_path, "ab")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.rename(temp_path, path)
+
+            # Имя нового файла тоже должно пережить сбой
+            directory_fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+
+        except Exception:
+            file.close()
+            raise
+
+        self._file = file
+        self._path = path
+        self._file_records = 0
+
+    def _seal_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._path = None
+
+    def _write(self, records: List[Tuple[int, bytes, float]]):
+        # crc32 и склейка больших документов тоже выполняются здесь, вне event loop
+        data = b"".join(
+            encode_record(legislation_id=legislation_id, data=content, appended_at=appended_at)
+            for legislation_id, content, appended_at in records
+        )
+
+        if self._file is None or self._file.tell() >= self.segment_bytes:
+            self._seal_segment()
+            self._open_segment()
+
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        path = self._path
+        count, size, first_appended_at = self._unflushed.get(path, (0, 0, records[0][2]))
+        self._unflushed[path] = (count + len(records), size + len(data), first_appended_at)
+        self._file_records += len(records)
+
+    async def _write_pending(self):
+        loop = asyncio.get_running_loop()
+
+        # Групповая фиксация: все записи, пришедшие во время fsync, уходят следующим одним fsync
+        while self._pending:
+            batch, self._pending = self._pending, []
+
+            try:
+                async with self._segment_lock:
+                    await loop.run_in_executor(None, self._write, [record for record, _ in batch])
+
+            except Exception as e:
+                config.logger.error(f"Error writing {len(batch)} records to spool: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    async def append(self, legislation_id: int, data: bytes):
+        """Возвращается, когда запись надежно на диске"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((legislation_id, data, time.time()), future))
+
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._write_pending())
+
+        await future
+        process_metrics.incr("spool_appended")
+
+    # --- сброс в БД ---
+
+    def _lock_segment(self, path: str) -> Optional[BinaryIO]:
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # Пока ждали, сегмент мог сбросить и удалить другой процесс
+            if os.fstat(file.fileno()).st_ino != os.stat(path).st_ino:
+                raise FileNotFoundError(path)
+            return file
+
+        except (BlockingIOError, FileNotFoundError):
+            file.close()
+            return None
+
+    async def _latest_appended_at(self, files: List[BinaryIO]) -> Dict[int, float]:
+        """Время последней загрузки каждого документа по всем сбрасываемым сегментам"""
+        loop = asyncio.get_running_loop()
+        latest = {}
+
+        for file in files:
+            while True:
+                records = await loop.run_in_executor(None, read_records, file, self.flush_batch)
+                if not records:
+                    break
+                for legislation_id, _, appended_at in records:
+                    latest[legislation_id] = max(latest.get(legislation_id, appended_at), appended_at)
+
+            file.seek(0)
+
+        return latest
+
+    async def _flush_segments(self, paths: List[str]):
+        loop = asyncio.get_running_loop()
+        files = [
+            file for file in [await loop.run_in_executor(None, self._lock_segment, path) for path in paths]
+            if file is not None
+        ]
+        if not files:
+            return
+
+        try:
+            # Документ мог быть загружен повторно через другой процесс: время берем из записей,
+            # а не из порядка сегментов, и более старые версии в БД не пишем
+            latest = await self._latest_appended_at(files)
+
+            for file in files:
+                while True:
+                    records = await loop.run_in_executor(None, read_records, file, self.flush_batch)
+                    if not records:
+                        break
+
+                    binaries = {
+                        legislation_id: data
+                        for legislation_id, data, appended_at in records
+                        if appended_at >= latest[legislation_id]
+                    }
+                    updated_ids = await sql_update_binaries(binaries=binaries) if binaries else []
+
+                    missing_ids = set(binaries) - set(updated_ids)
+                    if missing_ids:
+                        config.logger.warning(f"Spooled legislation not found, dropped: {sorted(missing_ids)}")
+                        process_metrics.incr("spool_missing", len(missing_ids))
+
+                    process_metrics.incr("spool_flushed", len(records))
+                    if config.TEXT_LAYER_ENABLED and updated_ids:
+                        text_layer_extractor.wake()
+
+            # Сегменты удаляются только после записи всех: повтор после сбоя дает тот же результат
+            for file in files:
+                await loop.run_in_executor(None, os.unlink, file.name)
+                self._unflushed.pop(file.name, None)
+
+        finally:
+            for file in files:
+                file.close()
+
+    async def flush(self):
+        """Закрываем текущий сегмент и сбрасываем в БД все незаблокированные сегменты"""
+        async with self._segment_lock:
+            if self._file is not None and self._file_records:
+                self._seal_segment()
+            active_path = self._path
+
+        await self._flush_segments([
+            path for path in sorted(glob.glob(os.path.join(self.directory, "*.seg")))
+            if path != active_path
+        ])
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                process_metrics.incr("spool_flush_errors")
+                config.logger.error(f"Error flushing spool: {e}")
+
+    async def start(self):
+        # Восстановление после сбоя: сегменты упавших процессов попадают в БД до приема запросов
+        try:
+            await self.flush()
+        except Exception as e:
+            config.logger.error(f"Error replaying spool at startup: {e}")
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        if self._writer_task is not None:
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+
+        # Что не удалось сбросить, останется на диске до следующего запуска
+        try:
+            await self.flush()
+        except Exception as e:
+            config.logger.error(f"Error flushing spool at shutdown: {e}")
+
+        async with self._segment_lock:
+            self._seal_segment()
+
+
+_instance = None
+
+
+def get_binary_spool() -> BinarySpool:
+    global _instance
+    if _instance is None:
+        _instance = BinarySpool(
+            directory=config.SPOOL_DIR,
+            segment_bytes=config.SPOOL_SEGMENT_BYTES,
+            flush_interval=config.SPOOL_FLUSH_INTERVAL,
+            flush_batch=config.SPOOL_FLUSH_BATCH
+        )
+
+    return _instance
@@ -0,0 +1,236 @@
+# Внешние зависимости
+from typing import List, Optional, Tuple
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+import asyncio
+import io
+import multiprocessing
+import unicodedata
+# Внутренние модули
+from web_app.src.core import config
+from web_app.src.crud import sql_claim_text_layer_batch, sql_update_texts
+from web_app.src.utils.metrics import get_process_metrics
+
+# Необязательная зависимость: без нее извлечение текстового слоя недоступно
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+
+process_metrics = get_process_metrics()
+
+# Доля страниц, на которых должен быть текст (скан с текстовой обложкой не проходит)
+MIN_TEXT_PAGE_SHARE = 0.8
+# Доля букв среди непробельных символов и предельная доля мусорных символов
+MIN_LETTER_SHARE = 0.5
+MAX_GARBAGE_SHARE = 0.02
+GARBAGE_CATEGORIES = ("Co", "Cc", "Cn", "Cs")
+# Корпус русскоязычный: среди букв должна преобладать кириллица. Буквы Latin-1 Supplement (À-ÿ)
+# в таком тексте - cp1251, прочитанная как latin-1, и isalpha() их не отличает от настоящих
+MIN_CYRILLIC_SHARE = 0.5
+MAX_LATIN1_SHARE = 0.05
+
+
+def assess_text_layer(pages: List[str], min_chars_per_page: int) -> Optional[str]:
+    """Причина отказа или None, если текстовый слой пригоден вместо OCR"""
+    if not pages:
+        return "empty"
+
+    page_chars = [sum(not char.isspace() for char in page) for page in pages]
+    total_chars = sum(page_chars)
+
+    if total_chars / len(pages) < min_chars_per_page:
+        return "too_short"
+
+    text_pages = sum(chars >= min_chars_per_page / 4 for chars in page_chars)
+    if text_pages / len(pages) < MIN_TEXT_PAGE_SHARE:
+        return "partial"
+
+    letters = 0
+    cyrillic = 0
+    latin1 = 0
+    garbage = 0
+    for page in pages:
+        for char in page:
+            if char.isalpha():
+                letters += 1
+                if "\u0400" <= char <= "\u04ff":
+                    cyrillic += 1
+                elif "\u00c0" <= char <= "\u00ff":
+                    latin1 += 1
+            # Символ замены, private use и управляющие символы - признак сломанной кодировки шрифта
+            elif char == "\ufffd" or (not char.isspace() and unicodedata.category(char) in GARBAGE_CATEGORIES):
+                garbage += 1
+
+    if garbage / total_chars > MAX_GARBAGE_SHARE:
+        return "garbled"
+
+    if letters / total_chars < MIN_LETTER_SHARE:
+        return "not_text"
+
+    if latin1 / letters > MAX_LATIN1_SHARE:
+        return "mojibake"
+
+    if cyrillic / letters < MIN_CYRILLIC_SHARE:
+        return "not_cyrillic"
+
+    return None
+
+
+# Выполняется в пуле процессов: pypdf написан на Python и держит GIL
+def extract_text_layer(pdf: bytes, min_chars_per_page: int) -> Tuple[Optional[str], str]:
+    """(текст, "accepted") или (None, причина отказа)"""
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(pdf))
+        if reader.is_encrypted:
+            reader.decrypt("")
+        pages = [page.extract_text() or "" for page in reader.pages]
+
+    except Exception:
+        return None, "unreadable"
+
+    reason = assess_text_layer(pages=pages, min_chars_per_page=min_chars_per_page)
+    if reason is not None:
+        return None, reason
+
+    # NUL недопустим в text PostgreSQL
+    text = "\n\n".join(page.strip() for page in pages).replace("\x00", "").strip()
+    return text, "accepted"
+
+
+class TextLayerExtractor:
+    """Проверка текстового слоя загруженных PDF до OCR.
+
+    Документы забираются из БД пачками через SKIP LOCKED, поэтому процессы приложения
+    не проверяют один документ дважды. Пригодный текст записывается сразу,
+    остальные документы после отметки попадают в очередь OCR.
+    """
+    def __init__(self, pool_size: int, min_chars_per_page: int, sweep_interval: float, timeout: float):
+        self.pool_size = pool_size
+        self.min_chars_per_page = min_chars_per_page
+        self.sweep_interval = sweep_interval
+        self.timeout = timeout
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def wake(self):
+        """Новый PDF загружен: проверить, не дожидаясь следующего прохода"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, terminate: bool = False):
+        if self._pool is pool:
+            self._pool = None
+        if terminate:
+            # Зависший процесс сам не завершится: shutdown() только перестает выдавать ему задачи
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _extract(self, legislation_id: int, pdf: bytes) -> Tuple[int, Optional[str], str]:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        try:
+            text, outcome = await asyncio.wait_for(
+                loop.run_in_executor(pool, extract_text_layer, pdf, self.min_chars_per_page),
+                timeout=self.timeout
+            )
+
+        except asyncio.TimeoutError:
+            # pypdf зацикливается на некоторых поврежденных потоках содержимого: пул пересоздается,
+            # иначе проверка текстового слоя в процессе остановится, а без нее OCR не получит документов
+            config.logger.error(f"Text layer extraction of legislation {legislation_id} timed out")
+            self._discard_pool(pool, terminate=True)
+            return legislation_id, None, "timeout"
+
+        except BrokenExecutor as e:
+            # Процесс пула упал на документе (например, OOM) или пул пересоздан: документ уходит в OCR
+            config.logger.error(f"Text layer extraction of legislation {legislation_id} crashed: {e}")
+            self._discard_pool(pool)
+            return legislation_id, None, "crashed"
+
+        return legislation_id, text, outcome
+
+    async def run_once(self) -> int:
+        """Одна пачка: возвращает число проверенных документов"""
+        claimed = await sql_claim_text_layer_batch(limit=self.pool_size)
+        if not claimed:
+            return 0
+
+        results = await asyncio.gather(*(
+            self._extract(legislation_id=legislation_id, pdf=pdf) for legislation_id, pdf in claimed
+        ))
+
+        texts = {}
+        for legislation_id, text, outcome in results:
+            process_metrics.incr(f"text_layer:{outcome}")
+            if text is not None:
+                texts[legislation_id] = text
+
+        if texts:
+            # Побеждает первый записавший: текст от OCR, если он успел раньше, не перезаписывается
+            applied_ids, _ = await sql_update_texts(texts=texts)
+            process_metrics.incr("text_layer_applied", len(applied_ids))
+
+        return len(claimed)
+
+    async def _run(self):
+        while True:
+            try:
+                checked = await self.run_once()
+            except Exception as e:
+                config.logger.error(f"Error in text layer extraction: {e}")
+                checked = 0
+
+            # Пока есть непроверенные документы, разбираем их без пауз
+            if checked == 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.sweep_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self):
+        if pypdf is None:
+            config.logger.critical("TEXT_LAYER_ENABLED requires the pypdf package")
+            raise RuntimeError("pypdf is not installed")
+
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_instance = None
+
+
+def get_text_layer_extractor() -> TextLayerExtractor:
+    global _instance
+    if _instance is None:
+        _instance = TextLayerExtractor(
+            pool_size=config.TEXT_LAYER_POOL_SIZE,
+            min_chars_per_page=config.TEXT_LAYER_MIN_CHARS_PER_PAGE,
+            sweep_interval=config.TEXT_LAYER_SWEEP_SECONDS,
+            timeout=config.TEXT_LAYER_TIMEOUT
+        )
+
+    return _instance
\ No newline at end of file
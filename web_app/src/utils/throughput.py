@@ -0,0 +1,38 @@
+# Внешние зависимости
+from typing import Optional
+import math
+
+
+# Минимальное окно замера, чтобы серия быстрых ответов не давала выбросов скорости
+MIN_SAMPLE_SECONDS = 1.0
+# Размер выдачи по умолчанию (limit в /legislation/free), пока скорость обработчика не замерена
+DEFAULT_BATCH_SIZE = 10
+
+
+def update_throughput(
+    previous: Optional[float],
+    processed: int,
+    elapsed: float,
+    alpha: float
+) -> float:
+    """Скользящее среднее скорости обработчика (документов в секунду)"""
+    sample = processed / elapsed
+    if previous is None:
+        return sample
+
+    return alpha * sample + (1 - alpha) * previous
+
+
+def suggest_batch_size(
+    throughput: Optional[float],
+    lease_seconds: int,
+    min_size: int,
+    max_size: int,
+    default: int
+) -> int:
+    """Размер выдачи, который обработчик успеет закончить за время аренды"""
+    if throughput is None:
+        return max(min_size, min(default, max_size))
+
+    size = math.floor(throughput * lease_seconds)
+    return max(min_size, min(size, max_size))